@@ -1,176 +1,96 @@
-from flask import Flask, render_template, request, redirect, url_for, session, jsonify, send_file, flash
+from flask import Flask, Response, g, get_template_attribute, render_template, request, redirect, url_for, session, jsonify, send_file, flash
 from werkzeug.utils import secure_filename
-import sqlite3, os, json
-from modules.placement_engine import get_eligible_students, get_eligible_drives
-from modules.resume_engine import generate_resume_pdf
-from modules.analytics import get_skill_gap, get_placement_stats
-from modules.notifications import create_notification, get_notifications
+from markupsafe import Markup
+import os, json, queue, re
+from modules.placement_engine import (get_eligible_students, get_ranked_drives, invalidate_eligibility_index,
+    invalidate_drive_features, invalidate_shortlists, shortlist_candidates, SHORTLIST_WEIGHTS)
+from modules.resume_engine import generate_resume_pdf, enqueue_resume_batch, BATCH_DIR, resume_content_hash, cached_resume_path
+from modules.analytics import (get_skill_gap, cohort_skill_gap, score_resume, refresh_resume_scores,
+    student_directory, STUDENT_SORTS, student_skill_gaps, get_placement_stats, get_stat_counters, rebuild_stats_snapshot, verify_stats_snapshot,
+    data_version, profile_version)
+from modules.skills import sync_student_skills, students_with_skills, canonical_skills
+from modules.scheduler import (auto_schedule, find_conflicts, insert_bookings, panel_conflict, slot_bounds,
+    DEFAULT_SLOT_MINUTES, DAY_START, DAY_END)
+from modules.notifications import (create_notification, get_notifications, enqueue_broadcast,
+    get_notifications_since, unread_notification_count, mark_notifications_read, mark_all_notifications_read)
+from modules import jobs, db, events, profiler, metrics, fragments
+from modules.migrations import migrate
+from modules.db import get_db
 
 app = Flask(__name__)
 app.secret_key = 'placementpro_secret_2024'
-DB = 'placementpro.db'
+
+@app.context_processor
+def notification_badge():
+    # The nav bell's count, one primary-key lookup per page.
+    return {'unread_notifications': unread_notification_count(session['user_id']) if 'user_id' in session else 0}
 
 @app.template_filter('from_json')
 def from_json_filter(s):
     try: return json.loads(s)
     except: return []
 
-def get_db():
-    conn = sqlite3.connect(DB)
-    conn.row_factory = sqlite3.Row
-    return conn
+def _rows(sql, *params):
+    conn = get_db()
+    rows = [dict(r) for r in conn.execute(sql, params)]
+    conn.close()
+    return rows
+
+def _block(key, tags, template, **context):
+    # A template block rendered once per fragment generation; it may read only
+    # `context`, so anything else it depends on (the viewer's role) goes in the key.
+    return Markup(fragments.cached(key, tags, lambda: render_template(template, **context)))
+
+# HTTP validators. JSON endpoints tag their response with the version of the
+# data it was computed from (see migrations._data_versions) and answer 304
+# without computing anything when the client already holds that version.
+API_CACHE_VERSION = 1                 # bump when a validated endpoint's output changes for the same data
+RESUME_MAX_AGE    = 365 * 24 * 3600   # resume PDFs are served at content-addressed URLs
+
+def _validated(etag, build):
+    # The version is read before build() runs, so a body is never older than its tag.
+    etag = f'{etag}-v{API_CACHE_VERSION}'
+    response = Response(status=304) if request.if_none_match.contains_weak(etag) else build()
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.vary.add('Cookie')
+    return response
+
+_ready = False
+
+@app.before_request
+def prepare_process():
+    # Once per worker process: bring the schema up to date, then start the job
+    # workers, which resume anything a previous process left unfinished.
+    global _ready
+    if _ready: return
+    migrate()
+    jobs.start_workers()
+    _ready = True
+
+@app.before_request
+def start_profile():
+    g.profile = profiler.start(request.endpoint or request.path, request.method, request.path,
+                               force=request.args.get('profile') == '1')
+
+@app.after_request
+def finish_profile(response):
+    prof = g.pop('profile', None)
+    if prof is not None:
+        rec = profiler.finish(prof, response.status_code)
+        response.headers['Server-Timing'] = (f'db;dur={rec["sql_ms"]};desc="{rec["queries"]} queries", '
+                                             f'app;dur={rec["ms"]}')
+    return response
+
+@app.teardown_request
+def release_db(exc=None):
+    profiler.stop()
+    db.release()
 
 def init_db():
     conn = get_db()
     c = conn.cursor()
-    c.executescript('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            email TEXT UNIQUE NOT NULL,
-            password TEXT NOT NULL,
-            role TEXT NOT NULL CHECK(role IN ('student','tpo','alumni'))
-        );
-        CREATE TABLE IF NOT EXISTS student_profiles (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER UNIQUE REFERENCES users(id),
-            cgpa REAL DEFAULT 0,
-            backlogs INTEGER DEFAULT 0,
-            branch TEXT DEFAULT '',
-            skills TEXT DEFAULT '[]',
-            projects TEXT DEFAULT '[]',
-            certificates TEXT DEFAULT '[]',
-            phone TEXT DEFAULT '',
-            dob TEXT DEFAULT '',
-            linkedin TEXT DEFAULT ''
-        );
-        CREATE TABLE IF NOT EXISTS alumni_profiles (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER UNIQUE REFERENCES users(id),
-            company TEXT DEFAULT '',
-            role TEXT DEFAULT '',
-            batch_year TEXT DEFAULT '',
-            branch TEXT DEFAULT '',
-            linkedin TEXT DEFAULT '',
-            bio TEXT DEFAULT '',
-            open_to_mentor INTEGER DEFAULT 1,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-        CREATE TABLE IF NOT EXISTS alumni_jobs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            alumni_id INTEGER REFERENCES users(id),
-            company TEXT NOT NULL,
-            role TEXT NOT NULL,
-            location TEXT DEFAULT '',
-            description TEXT DEFAULT '',
-            apply_link TEXT DEFAULT '',
-            posted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-        CREATE TABLE IF NOT EXISTS mentorship_requests (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            student_id INTEGER REFERENCES users(id),
-            alumni_id INTEGER REFERENCES users(id),
-            message TEXT DEFAULT '',
-            status TEXT DEFAULT 'pending',
-            requested_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(student_id, alumni_id)
-        );
-        CREATE TABLE IF NOT EXISTS drives (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            company TEXT NOT NULL,
-            role TEXT NOT NULL,
-            min_cgpa REAL NOT NULL,
-            max_backlogs INTEGER NOT NULL,
-            allowed_branches TEXT NOT NULL,
-            description TEXT DEFAULT '',
-            deadline TEXT,
-            status TEXT DEFAULT 'active',
-            package_lpa REAL DEFAULT 0,
-            location TEXT DEFAULT '',
-            job_type TEXT DEFAULT 'Full-Time',
-            created_by INTEGER REFERENCES users(id),
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-        CREATE TABLE IF NOT EXISTS applications (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            student_id INTEGER REFERENCES users(id),
-            drive_id INTEGER REFERENCES drives(id),
-            status TEXT DEFAULT 'applied',
-            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(student_id, drive_id)
-        );
-        CREATE TABLE IF NOT EXISTS notifications (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER REFERENCES users(id),
-            message TEXT NOT NULL,
-            is_read INTEGER DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-        CREATE TABLE IF NOT EXISTS resume_meta (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            student_id INTEGER REFERENCES users(id),
-            file_path TEXT,
-            generated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-        CREATE TABLE IF NOT EXISTS interview_schedule (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            drive_id INTEGER REFERENCES drives(id),
-            student_id INTEGER REFERENCES users(id),
-            interview_date TEXT NOT NULL,
-            time_slot TEXT NOT NULL,
-            notes TEXT DEFAULT '',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(drive_id, interview_date, time_slot)
-        );
-        CREATE TABLE IF NOT EXISTS referral_requests (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            student_id INTEGER REFERENCES users(id),
-            referral_post_id INTEGER REFERENCES alumni_referral_posts(id),
-            alumni_id INTEGER REFERENCES users(id),
-            message TEXT DEFAULT '',
-            status TEXT DEFAULT 'requested',
-            alumni_note TEXT DEFAULT '',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(student_id, referral_post_id)
-        );
-        CREATE TABLE IF NOT EXISTS alumni_mentorship_slots (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            alumni_id INTEGER REFERENCES users(id),
-            topic TEXT NOT NULL,
-            slot_date TEXT NOT NULL,
-            slot_time TEXT NOT NULL,
-            meet_link TEXT DEFAULT '',
-            status TEXT DEFAULT 'available',
-            booked_by INTEGER REFERENCES users(id),
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-        CREATE TABLE IF NOT EXISTS alumni_referral_posts (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            alumni_id INTEGER REFERENCES users(id),
-            company TEXT NOT NULL,
-            role TEXT NOT NULL,
-            description TEXT DEFAULT '',
-            jd_link TEXT DEFAULT '',
-            deadline TEXT DEFAULT '',
-            package_lpa REAL DEFAULT 0,
-            location TEXT DEFAULT '',
-            job_type TEXT DEFAULT 'Full-Time',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-    ''')
-    for col in [
-        ("student_profiles","linkedin","TEXT DEFAULT ''"),
-        ("student_profiles","photo_url","TEXT DEFAULT ''"),
-        ("drives","status","TEXT DEFAULT 'active'"),
-        ("drives","package_lpa","REAL DEFAULT 0"),
-        ("drives","location","TEXT DEFAULT ''"),
-        ("drives","job_type","TEXT DEFAULT 'Full-Time'"),
-        ("alumni_referral_posts","package_lpa","REAL DEFAULT 0"),
-        ("alumni_referral_posts","location","TEXT DEFAULT ''"),
-        ("alumni_referral_posts","job_type","TEXT DEFAULT 'Full-Time'"),
-    ]:
-        try: c.execute(f"ALTER TABLE {col[0]} ADD COLUMN {col[1]} {col[2]}"); conn.commit()
-        except: pass
+    migrate(conn)
 
     # Seed data
     try:
@@ -248,8 +168,10 @@ def register():
             role = request.form['role']
             if role == 'student':
                 conn.execute('INSERT INTO student_profiles(user_id) VALUES(?)', (uid,)); conn.commit()
+                invalidate_eligibility_index()
             elif role == 'alumni':
                 conn.execute('INSERT INTO alumni_profiles(user_id) VALUES(?)', (uid,)); conn.commit()
+                fragments.invalidate('alumni')
             flash('Account created! Please login.', 'success')
         except: flash('Email already registered.', 'error')
         conn.close()
@@ -272,17 +194,19 @@ def dashboard():
 @app.route('/tpo')
 def tpo_dashboard():
     if session.get('role') != 'tpo': return redirect(url_for('index'))
+    active_drives   = fragments.cached('tpo_active_drives', ['drives'],
+        lambda: _rows("SELECT * FROM drives WHERE status='active' ORDER BY created_at DESC"))
+    completed_drives= fragments.cached('tpo_completed_drives', ['drives'],
+        lambda: _rows("SELECT * FROM drives WHERE status='completed' ORDER BY created_at DESC"))
     conn = get_db()
-    active_drives   = conn.execute("SELECT * FROM drives WHERE status='active' ORDER BY created_at DESC").fetchall()
-    completed_drives= conn.execute("SELECT * FROM drives WHERE status='completed' ORDER BY created_at DESC").fetchall()
-    total_students  = conn.execute("SELECT COUNT(*) as c FROM users WHERE role='student'").fetchone()['c']
-    total_apps      = conn.execute('SELECT COUNT(*) as c FROM applications').fetchone()['c']
-    placed_count    = conn.execute("SELECT COUNT(DISTINCT student_id) as c FROM applications WHERE status='selected'").fetchone()['c']
+    counters        = get_stat_counters(conn)
     notifs = get_notifications(session['user_id'])
     conn.close()
     return render_template('tpo_dashboard.html', active_drives=active_drives,
-        completed_drives=completed_drives, total_students=total_students,
-        total_apps=total_apps, placed_count=placed_count, notifs=notifs)
+        drive_tables=_block('tpo_drive_tables', ['drives'], 'fragments/tpo_drives.html',
+                            active_drives=active_drives, completed_drives=completed_drives),
+        total_students=counters['students'],
+        total_apps=counters['apps'], placed_count=counters['placed'], notifs=notifs, jobs=jobs.recent_jobs(5))
 
 @app.route('/tpo/drive/create', methods=['GET','POST'])
 def create_drive():
@@ -301,12 +225,10 @@ def create_drive():
             request.form.get('job_type','Full-Time'),
             session['user_id']))
         drive_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
-        conn.commit()
-        eligible = get_eligible_students(drive_id)
-        for s in eligible:
-            create_notification(s['user_id'], f"🎯 New drive: {request.form['company']} ({request.form['role']}) — you're eligible!")
-        flash(f'Drive created! {len(eligible)} eligible students notified.', 'success')
-        conn.close()
+        conn.commit(); conn.close(); invalidate_drive_features(); fragments.invalidate('drives')
+        enqueue_broadcast('eligible', drive_id,
+            f"🎯 New drive: {request.form['company']} ({request.form['role']}) — you're eligible!", session['user_id'])
+        flash('Drive created! Eligible students are being notified in the background.', 'success')
         return redirect(url_for('tpo_dashboard'))
     return render_template('create_drive.html')
 
@@ -315,9 +237,10 @@ def complete_drive(drive_id):
     if session.get('role') != 'tpo': return redirect(url_for('index'))
     conn = get_db()
     conn.execute("UPDATE drives SET status='completed' WHERE id=?", (drive_id,)); conn.commit()
-    apps = conn.execute('SELECT a.student_id, d.company FROM applications a JOIN drives d ON a.drive_id=d.id WHERE a.drive_id=?', (drive_id,)).fetchall()
-    for a in apps: create_notification(a['student_id'], f"🏁 The {a['company']} drive has been closed.")
+    invalidate_drive_features(); fragments.invalidate('drives')
+    drive = conn.execute('SELECT company FROM drives WHERE id=?', (drive_id,)).fetchone()
     conn.close()
+    if drive: enqueue_broadcast('applicants', drive_id, f"🏁 The {drive['company']} drive has been closed.", session['user_id'])
     flash('Drive marked as completed.', 'success')
     return redirect(url_for('tpo_dashboard'))
 
@@ -334,7 +257,7 @@ def drive_detail(drive_id):
         JOIN student_profiles sp ON u.id=sp.user_id WHERE a.drive_id=?''', (drive_id,)).fetchall()
     schedules = conn.execute('''SELECT isch.*, u.name as student_name
         FROM interview_schedule isch JOIN users u ON isch.student_id=u.id
-        WHERE isch.drive_id=?''', (drive_id,)).fetchall()
+        WHERE isch.drive_id=? ORDER BY isch.interview_date, isch.time_slot, isch.panel''', (drive_id,)).fetchall()
     all_students = conn.execute("SELECT u.id, u.name FROM users u WHERE u.role='student' ORDER BY u.name").fetchall()
     selected_students = conn.execute('''SELECT u.name, u.email, sp.cgpa, sp.branch
         FROM applications a JOIN users u ON a.student_id=u.id
@@ -343,7 +266,8 @@ def drive_detail(drive_id):
     conn.close()
     return render_template('drive_detail.html', drive=drive, eligible=eligible,
         applications=raw_apps, branch_breakdown=branch_breakdown,
-        schedules=schedules, all_students=all_students, selected_students=selected_students)
+        schedules=schedules, all_students=all_students, selected_students=selected_students,
+        shortlist_weights=SHORTLIST_WEIGHTS, slot_defaults=(DEFAULT_SLOT_MINUTES, DAY_START, DAY_END))
 
 @app.route('/tpo/drive/<int:drive_id>/schedule', methods=['POST'])
 def schedule_interview(drive_id):
@@ -352,32 +276,71 @@ def schedule_interview(drive_id):
     interview_date = request.form['interview_date']
     time_slot = request.form['time_slot']
     notes = request.form.get('notes','')
+    venue = request.form.get('venue','').strip()
+    starts_at, ends_at = slot_bounds(interview_date, time_slot)
+    if starts_at is None:
+        flash('⚠️ Could not read that date and time.', 'error')
+        return redirect(url_for('drive_detail', drive_id=drive_id))
     conn = get_db()
-    existing = conn.execute('SELECT * FROM interview_schedule WHERE drive_id=? AND interview_date=? AND time_slot=?',
-        (drive_id, interview_date, time_slot)).fetchone()
+    existing = panel_conflict(conn, drive_id, 1, starts_at, ends_at)   # the form books panel 1
     if existing:
-        flash('⚠️ Conflict! That slot is already booked.', 'error')
+        flash(f"⚠️ Conflict! Panel 1 already has an interview on {existing['interview_date']} at {existing['time_slot']}.", 'error')
+        conn.close(); return redirect(url_for('drive_detail', drive_id=drive_id))
+    clashes = find_conflicts([{'student_id': student_id, 'interview_date': interview_date,
+                               'time_slot': time_slot, 'venue': venue}], conn)
+    if clashes:
+        c = clashes[0]['with']
+        who = 'The student already has' if clashes[0]['kind'] == 'student' else f'{venue} already has'
+        flash(f"⚠️ Conflict! {who} an interview on {c['interview_date']} at {c['time_slot']}.", 'error')
         conn.close(); return redirect(url_for('drive_detail', drive_id=drive_id))
     try:
-        conn.execute('INSERT INTO interview_schedule(drive_id,student_id,interview_date,time_slot,notes) VALUES(?,?,?,?,?)',
-            (drive_id, student_id, interview_date, time_slot, notes)); conn.commit()
+        insert_bookings(conn, drive_id, [(student_id, interview_date, time_slot, 1, venue)], notes); conn.commit()
         student = conn.execute('SELECT * FROM users WHERE id=?', (student_id,)).fetchone()
         drive   = conn.execute('SELECT * FROM drives WHERE id=?', (drive_id,)).fetchone()
         create_notification(student_id, f"📅 Interview scheduled for {drive['company']} on {interview_date} at {time_slot}")
         conn.execute('UPDATE applications SET status=? WHERE student_id=? AND drive_id=?', ('interview_scheduled', student_id, drive_id)); conn.commit()
+        invalidate_shortlists(drive_id)
         flash(f'Interview scheduled for {student["name"]} on {interview_date} at {time_slot}', 'success')
     except Exception as e: flash(f'Error: {str(e)}', 'error')
     conn.close(); return redirect(url_for('drive_detail', drive_id=drive_id))
 
+@app.route('/api/interviews/conflicts', methods=['POST'])
+def interview_conflicts_api():
+    if session.get('role') != 'tpo': return jsonify({'error':'unauth'}), 401
+    bookings = (request.get_json(silent=True) or {}).get('bookings', [])
+    if not isinstance(bookings, list) or not all(isinstance(b, dict) and str(b.get('student_id', '')).strip().isdigit()
+                                                 and isinstance(b.get('venue') or '', str) for b in bookings):
+        return jsonify({'error': 'bookings must be a list of {student_id, interview_date, time_slot, venue}'}), 400
+    return jsonify({'conflicts': find_conflicts(bookings)})
+
+@app.route('/tpo/drive/<int:drive_id>/auto-schedule', methods=['POST'])
+def auto_schedule_interviews(drive_id):
+    if session.get('role') != 'tpo': return redirect(url_for('index'))
+    dates = [d for d in request.form.get('dates', '').replace(',', ' ').split() if d]
+    try:
+        result = auto_schedule(drive_id, dates,
+            slot_minutes=max(5, int(request.form.get('slot_minutes') or DEFAULT_SLOT_MINUTES)),
+            panels=max(1, int(request.form.get('panels') or 1)),
+            notes=request.form.get('notes', ''),
+            day_start=request.form.get('day_start') or DAY_START, day_end=request.form.get('day_end') or DAY_END,
+            venues=[v for v in request.form.get('venues', '').split(',') if v.strip()])
+    except ValueError as e:
+        flash(f'Error: {e}', 'error'); return redirect(url_for('drive_detail', drive_id=drive_id))
+    invalidate_shortlists(drive_id)
+    if result['unplaced']:
+        flash(f"Scheduled {result['scheduled']} interviews; {len(result['unplaced'])} applicants did not fit — add dates or panels.", 'error')
+    else:
+        flash(f"Scheduled {result['scheduled']} interviews.", 'success')
+    return redirect(url_for('drive_detail', drive_id=drive_id))
+
 @app.route('/tpo/notify/<int:drive_id>', methods=['POST'])
 def notify_eligible(drive_id):
     if session.get('role') != 'tpo': return redirect(url_for('index'))
-    eligible = get_eligible_students(drive_id)
     conn = get_db()
     drive = conn.execute('SELECT * FROM drives WHERE id=?', (drive_id,)).fetchone()
     conn.close()
-    for s in eligible: create_notification(s['user_id'], f"📢 Reminder: Apply to {drive['company']} ({drive['role']}) before {drive['deadline']}!")
-    flash(f'Notified {len(eligible)} eligible students!', 'success')
+    enqueue_broadcast('eligible', drive_id, f"📢 Reminder: Apply to {drive['company']} ({drive['role']}) before {drive['deadline']}!", session['user_id'])
+    flash('Reminder queued — eligible students are being notified.', 'success')
     return redirect(url_for('drive_detail', drive_id=drive_id))
 
 @app.route('/tpo/notify-applicants/<int:drive_id>', methods=['POST'])
@@ -387,12 +350,35 @@ def notify_applicants(drive_id):
     if not message: flash('Message cannot be empty.', 'error'); return redirect(url_for('drive_detail', drive_id=drive_id))
     conn = get_db()
     drive = conn.execute('SELECT * FROM drives WHERE id=?', (drive_id,)).fetchone()
-    applicants = conn.execute('SELECT student_id FROM applications WHERE drive_id=?', (drive_id,)).fetchall()
     conn.close()
-    for a in applicants: create_notification(a['student_id'], f"📣 [{drive['company']}] {message}")
-    flash(f'Message sent to {len(applicants)} applicant(s)!', 'success')
+    enqueue_broadcast('applicants', drive_id, f"📣 [{drive['company']}] {message}", session['user_id'])
+    flash('Message queued — applicants are being notified.', 'success')
+    return redirect(url_for('drive_detail', drive_id=drive_id))
+
+@app.route('/tpo/drive/<int:drive_id>/resumes', methods=['POST'])
+def drive_resumes(drive_id):
+    if session.get('role') != 'tpo': return redirect(url_for('index'))
+    enqueue_resume_batch(drive_id=drive_id, created_by=session['user_id'])
+    flash('Resume pack queued — download it from the dashboard once it is ready.', 'success')
     return redirect(url_for('drive_detail', drive_id=drive_id))
 
+@app.route('/tpo/jobs/<int:job_id>/download')
+def job_download(job_id):
+    if session.get('role') != 'tpo': return redirect(url_for('index'))
+    job = jobs.get_job(job_id)
+    result = json.loads(job['result'] or '{}') if job and job['status'] == 'done' else {}
+    path = os.path.realpath(result.get('path') or '')
+    if os.path.dirname(path) != os.path.realpath(BATCH_DIR) or not os.path.exists(path):
+        flash('That file is not available.', 'error'); return redirect(url_for('tpo_dashboard'))
+    return send_file(path, as_attachment=True, download_name=os.path.basename(path))
+
+@app.route('/tpo/maintenance/notifications', methods=['POST'])
+def notification_cleanup():
+    if session.get('role') != 'tpo': return redirect(url_for('index'))
+    jobs.enqueue('notification_retention', {}, session['user_id'])
+    flash('Notification clean-up queued — its report appears under Background Jobs.', 'success')
+    return redirect(url_for('tpo_dashboard'))
+
 @app.route('/tpo/application/<int:app_id>/status', methods=['POST'])
 def update_status(app_id):
     if session.get('role') != 'tpo': return redirect(url_for('index'))
@@ -400,6 +386,7 @@ def update_status(app_id):
     conn = get_db()
     app_row = conn.execute('SELECT a.*, d.company FROM applications a JOIN drives d ON a.drive_id=d.id WHERE a.id=?', (app_id,)).fetchone()
     conn.execute('UPDATE applications SET status=? WHERE id=?', (new_status, app_id)); conn.commit()
+    invalidate_shortlists(app_row['drive_id'])
     labels = {'applied':'Applied','aptitude':'Aptitude Round 📝','technical':'Technical Interview 💻','hr':'HR Round 🤝','interview_scheduled':'Interview Scheduled 📅','selected':'🎉 SELECTED! Congratulations!','rejected':'❌ Not Selected'}
     create_notification(app_row['student_id'], f"📋 [{app_row['company']}] Status: {labels.get(new_status, new_status)}")
     conn.close(); flash('Status updated!', 'success')
@@ -411,6 +398,40 @@ def tpo_stats():
     stats = get_placement_stats()
     return render_template('tpo_stats.html', stats=stats)
 
+STUDENTS_PER_PAGE = 50
+
+def _directory_filters():
+    def score(key):
+        v = request.args.get(key, '')
+        return int(v) if v.strip().lstrip('-').isdigit() else None
+    return {'branch': request.args.get('branch') or None, 'min_score': score('min_score'),
+            'max_score': score('max_score'), 'sort': request.args.get('sort', 'score')}
+
+@app.route('/tpo/students')
+def tpo_students():
+    if session.get('role') != 'tpo': return redirect(url_for('index'))
+    f = _directory_filters()
+    page = max(1, int(request.args.get('page', 1)))
+    result = student_directory(**f, limit=STUDENTS_PER_PAGE, offset=(page - 1) * STUDENTS_PER_PAGE)
+    conn = get_db()
+    branches = [r['branch'] for r in conn.execute("SELECT DISTINCT branch FROM student_profiles WHERE branch!='' ORDER BY branch")]
+    conn.close()
+    pages = max(1, -(-result['total'] // STUDENTS_PER_PAGE))
+    return render_template('tpo_students.html', students=result['students'], total=result['total'],
+        page=page, pages=pages, filters=f, branches=branches, sorts=STUDENT_SORTS)
+
+@app.route('/tpo/skill-gap')
+def tpo_skill_gap():
+    if session.get('role') != 'tpo': return redirect(url_for('index'))
+    branch = request.args.get('branch') or None
+    conn = get_db()
+    branches = [r['branch'] for r in conn.execute("SELECT DISTINCT branch FROM student_profiles WHERE branch!='' ORDER BY branch")]
+    conn.close()
+    wanted = [s for s in request.args.get('skills', '').split(',') if s.strip()]
+    matches = students_with_skills(wanted, limit=50) if wanted else None
+    return render_template('tpo_skill_gap.html', gap=cohort_skill_gap(branch), branch=branch, branches=branches,
+        wanted=', '.join(wanted), matches=matches)
+
 # ── STUDENT ROUTES ────────────────────────────────────────────────────
 @app.route('/student')
 def student_dashboard():
@@ -422,7 +443,10 @@ def student_dashboard():
         WHERE a.student_id=? ORDER BY a.applied_at DESC''', (session['user_id'],)).fetchall()
     conn.close()
     notifs = get_notifications(session['user_id'])
-    eligible_drives = get_eligible_drives(session['user_id']) if profile else []
+    uid = session['user_id']
+    # Depends only on the student's profile and the active drives: cached until either changes.
+    eligible_drives = fragments.cached(f'student_drives:{uid}', ['drives', f'student:{uid}'],
+        lambda: get_ranked_drives(uid, from_json_filter(profile['skills']))) if profile else []
     return render_template('student_dashboard.html', profile=profile,
         applications=my_apps, notifs=notifs, eligible_drives=eligible_drives)
 
@@ -463,8 +487,11 @@ def student_profile():
             WHERE user_id=?''', (cgpa_val, backlogs_val,
             request.form.get('branch',''), json.dumps(skills), json.dumps(projects), json.dumps(certs),
             request.form.get('phone',''), request.form.get('dob',''), request.form.get('linkedin','').strip(), photo_url, uid))
+        sync_student_skills(conn, uid, skills)
+        refresh_resume_scores(conn, [uid])
         conn.commit(); flash('Profile updated successfully!', 'success')
-        conn.close(); return redirect(url_for('student_dashboard'))
+        conn.close(); invalidate_eligibility_index(); invalidate_shortlists(); fragments.invalidate(f'student:{uid}')
+        return redirect(url_for('student_dashboard'))
     profile = conn.execute('SELECT * FROM student_profiles WHERE user_id=?', (session['user_id'],)).fetchone()
     user    = conn.execute('SELECT * FROM users WHERE id=?', (session['user_id'],)).fetchone()
     conn.close()
@@ -494,10 +521,22 @@ def generate_resume():
         profile = conn.execute('SELECT * FROM student_profiles WHERE user_id=?', (session['user_id'],)).fetchone()
     conn.close()
     pdf_path = generate_resume_pdf(user, profile)
-    conn = get_db()
-    conn.execute('INSERT OR REPLACE INTO resume_meta(student_id, file_path) VALUES(?,?)', (session['user_id'], pdf_path))
-    conn.commit(); conn.close()
-    return send_file(pdf_path, as_attachment=True, download_name=f"Resume_{user['name'].replace(' ','_')}.pdf")
+    # The PDF itself lives at a URL named by its content hash, which the browser may keep.
+    return redirect(url_for('resume_file', content_hash=resume_content_hash(pdf_path)))
+
+@app.route('/student/resume/<content_hash>.pdf')
+def resume_file(content_hash):
+    if session.get('role') != 'student': return redirect(url_for('index'))
+    path = cached_resume_path(session['user_id'], content_hash)
+    if path is None: return redirect(url_for('generate_resume'))     # outdated or evicted: render again
+    # conditional=True answers If-None-Match / If-Modified-Since with 304 and Range with 206.
+    try:
+        response = send_file(os.path.abspath(path), mimetype='application/pdf', as_attachment=True,
+            download_name=f"Resume_{session.get('name', 'student').replace(' ','_')}.pdf", etag=content_hash, conditional=True)
+    except FileNotFoundError:                          # evicted since the lookup
+        return redirect(url_for('generate_resume'))
+    response.headers['Cache-Control'] = f'private, max-age={RESUME_MAX_AGE}, immutable'
+    return response
 
 @app.route('/student/apply/<int:drive_id>', methods=['POST'])
 def apply_drive(drive_id):
@@ -508,6 +547,7 @@ def apply_drive(drive_id):
         flash('This drive is already closed.', 'error'); conn.close(); return redirect(url_for('student_dashboard'))
     try:
         conn.execute('INSERT INTO applications(student_id,drive_id) VALUES(?,?)', (session['user_id'], drive_id)); conn.commit()
+        invalidate_shortlists(drive_id)
         flash(f'Applied to {drive["company"]} successfully!', 'success')
     except: flash('Already applied!', 'error')
     conn.close(); return redirect(url_for('student_dashboard'))
@@ -537,11 +577,9 @@ def chatbot():
 @app.route('/alumni')
 def alumni_dashboard():
     if session.get('role') != 'alumni': return redirect(url_for('index'))
+    own = fragments.cached(f'alumni_own:{session["user_id"]}', [f'alumni:{session["user_id"]}'],
+                           lambda: _alumni_own(session['user_id']))
     conn = get_db()
-    ap = conn.execute('SELECT * FROM alumni_profiles WHERE user_id=?', (session['user_id'],)).fetchone()
-    my_jobs = conn.execute('SELECT * FROM alumni_jobs WHERE alumni_id=? ORDER BY posted_at DESC', (session['user_id'],)).fetchall()
-    my_referral_posts = conn.execute('SELECT * FROM alumni_referral_posts WHERE alumni_id=? ORDER BY created_at DESC', (session['user_id'],)).fetchall()
-    my_slots = conn.execute('SELECT * FROM alumni_mentorship_slots WHERE alumni_id=? ORDER BY slot_date ASC', (session['user_id'],)).fetchall()
     referral_reqs = conn.execute('''SELECT rr.*, u.name as student_name, u.email as student_email, sp.cgpa, sp.branch,
         arp.company as ref_company, arp.role as ref_role FROM referral_requests rr
         JOIN users u ON rr.student_id=u.id JOIN student_profiles sp ON u.id=sp.user_id
@@ -553,8 +591,19 @@ def alumni_dashboard():
         WHERE mr.alumni_id=? ORDER BY mr.requested_at DESC''', (session['user_id'],)).fetchall()
     notifs = get_notifications(session['user_id'])
     conn.close()
-    return render_template('alumni_dashboard.html', ap=ap, my_jobs=my_jobs, my_referral_posts=my_referral_posts,
-        my_slots=my_slots, mentor_reqs=mentor_reqs, referral_reqs=referral_reqs, notifs=notifs)
+    return render_template('alumni_dashboard.html', **own, mentor_reqs=mentor_reqs, referral_reqs=referral_reqs, notifs=notifs)
+
+def _alumni_own(uid):
+    # The alumnus's own profile, posts and slots. Requests from students stay
+    # live: they are the actionable part of the page.
+    conn = get_db()
+    ap = conn.execute('SELECT * FROM alumni_profiles WHERE user_id=?', (uid,)).fetchone()
+    own = {'ap': dict(ap) if ap else None,
+        'my_jobs': [dict(r) for r in conn.execute('SELECT * FROM alumni_jobs WHERE alumni_id=? ORDER BY posted_at DESC', (uid,))],
+        'my_referral_posts': [dict(r) for r in conn.execute('SELECT * FROM alumni_referral_posts WHERE alumni_id=? ORDER BY created_at DESC', (uid,))],
+        'my_slots': [dict(r) for r in conn.execute('SELECT * FROM alumni_mentorship_slots WHERE alumni_id=? ORDER BY slot_date ASC', (uid,))]}
+    conn.close()
+    return own
 
 @app.route('/alumni/profile', methods=['GET','POST'])
 def alumni_profile():
@@ -565,7 +614,8 @@ def alumni_profile():
             WHERE user_id=?''', (request.form['company'], request.form['role'], request.form['batch_year'],
             request.form['branch'], request.form['linkedin'], request.form['bio'],
             1 if request.form.get('open_to_mentor') else 0, session['user_id']))
-        conn.commit(); flash('Profile updated!', 'success')
+        conn.commit(); fragments.invalidate('alumni', f'alumni:{session["user_id"]}')
+        flash('Profile updated!', 'success')
         conn.close(); return redirect(url_for('alumni_dashboard'))
     ap = conn.execute('SELECT * FROM alumni_profiles WHERE user_id=?', (session['user_id'],)).fetchone()
     conn.close()
@@ -578,7 +628,7 @@ def alumni_post_job():
     conn.execute('INSERT INTO alumni_jobs(alumni_id,company,role,location,description,apply_link) VALUES(?,?,?,?,?,?)',
         (session['user_id'], request.form['company'], request.form['role'],
          request.form['location'], request.form['description'], request.form['apply_link']))
-    conn.commit(); conn.close()
+    conn.commit(); conn.close(); fragments.invalidate(f'alumni:{session["user_id"]}')
     flash('Job referral posted!', 'success')
     return redirect(url_for('alumni_dashboard'))
 
@@ -622,7 +672,7 @@ def alumni_add_slot():
         conn.execute('INSERT INTO alumni_mentorship_slots(alumni_id,topic,slot_date,slot_time,meet_link,status) VALUES(?,?,?,?,?,?)',
             (session['user_id'], request.form['topic'], request.form['slot_date'], request.form['slot_time'],
              request.form.get('meet_link',''), 'available'))
-        conn.commit(); conn.close()
+        conn.commit(); conn.close(); fragments.invalidate('slots', f'alumni:{session["user_id"]}')
         flash('Mentorship slot added!', 'success')
         return redirect(url_for('alumni_dashboard'))
     return render_template('alumni_add_slot.html')
@@ -637,7 +687,7 @@ def alumni_post_referral():
             (session['user_id'], request.form['company'], request.form['role'],
              request.form.get('description',''), request.form.get('jd_link',''), request.form.get('deadline',''),
              float(request.form.get('package_lpa') or 0), request.form.get('location',''), request.form.get('job_type','Full-Time')))
-        conn.commit(); conn.close()
+        conn.commit(); conn.close(); fragments.invalidate('referral_posts', f'alumni:{session["user_id"]}')
         flash('Referral post published!', 'success')
         return redirect(url_for('alumni_dashboard'))
     conn.close()
@@ -646,30 +696,52 @@ def alumni_post_referral():
 @app.route('/connect')
 def alumni_connect_board():
     if 'user_id' not in session: return redirect(url_for('index'))
-    conn = get_db()
-    referrals = conn.execute('''SELECT arp.*, u.name as alumni_name, ap.role as alumni_role, ap.batch_year, ap.branch
+    role = session.get('role')
+    # The three lists and their panes are the same for everyone with the same
+    # role; a student's own referral requests are filled into the cached pane.
+    referrals = fragments.cached('connect_referrals', ['referral_posts', 'alumni'], lambda: _rows('''
+        SELECT arp.*, u.name as alumni_name, ap.role as alumni_role, ap.batch_year, ap.branch
         FROM alumni_referral_posts arp
         JOIN users u ON arp.alumni_id=u.id
         JOIN alumni_profiles ap ON u.id=ap.user_id
-        ORDER BY arp.created_at DESC''').fetchall()
-    # student's referral request statuses
-    my_req_map = {}
-    if session.get('role') == 'student':
-        reqs = conn.execute('SELECT referral_post_id, status FROM referral_requests WHERE student_id=?', (session['user_id'],)).fetchall()
-        my_req_map = {r['referral_post_id']: r['status'] for r in reqs}
-    slots = conn.execute('''SELECT ams.*, u.name as alumni_name, ap.role as alumni_role, ap.company as alumni_company
+        ORDER BY arp.created_at DESC'''))
+    slots = fragments.cached('connect_slots', ['slots', 'alumni'], lambda: _rows('''
+        SELECT ams.*, u.name as alumni_name, ap.role as alumni_role, ap.company as alumni_company
         FROM alumni_mentorship_slots ams
         JOIN users u ON ams.alumni_id=u.id
         JOIN alumni_profiles ap ON u.id=ap.user_id
         WHERE ams.status='available'
-        ORDER BY ams.slot_date ASC''').fetchall()
-    alumni_list = conn.execute('''SELECT u.id, u.name, ap.company, ap.role, ap.batch_year, ap.branch, ap.bio, ap.open_to_mentor
+        ORDER BY ams.slot_date ASC'''))
+    alumni_list = fragments.cached('connect_alumni', ['alumni'], lambda: _rows('''
+        SELECT u.id, u.name, ap.company, ap.role, ap.batch_year, ap.branch, ap.bio, ap.open_to_mentor
         FROM users u JOIN alumni_profiles ap ON u.id=ap.user_id
         WHERE u.role='alumni'
-        ORDER BY ap.batch_year DESC''').fetchall()
-    notifs = get_notifications(session['user_id']) if session.get('role') != 'tpo' else []
+        ORDER BY ap.batch_year DESC'''))
+    conn = get_db()
+    # student's referral request statuses
+    my_req_map = {}
+    if role == 'student':
+        reqs = conn.execute('SELECT referral_post_id, status FROM referral_requests WHERE student_id=?', (session['user_id'],)).fetchall()
+        my_req_map = {r['referral_post_id']: r['status'] for r in reqs}
+    notifs = get_notifications(session['user_id']) if role != 'tpo' else []
     conn.close()
-    return render_template('alumni_connect_board.html', referrals=referrals, slots=slots, alumni_list=alumni_list, notifs=notifs, my_req_map=my_req_map)
+    referrals_html = _block(f'connect_referrals_html:{role}', ['referral_posts', 'alumni'],
+                            'fragments/connect_referrals.html', referrals=referrals, role=role)
+    return render_template('alumni_connect_board.html', notifs=notifs,
+        referral_count=len(referrals), slot_count=len(slots), alumni_count=len(alumni_list),
+        referrals_html=_with_referral_status(referrals_html, my_req_map),
+        slots_html=_block(f'connect_slots_html:{role}', ['slots', 'alumni'], 'fragments/connect_slots.html', slots=slots, role=role),
+        network_html=_block('connect_network_html', ['alumni'], 'fragments/connect_network.html', alumni_list=alumni_list))
+
+_REF_STATUS = re.compile(r'<!--ref-status:(\d+)-->')
+_REF_ACTION = re.compile(r'<!--ref-action:(\d+)-->.*?<!--/ref-action-->', re.S)
+
+def _with_referral_status(html, my_req_map):
+    # Badge each post the student already asked about and drop its request button.
+    if not my_req_map: return html
+    badge = get_template_attribute('fragments/connect_referrals.html', 'status_badge')
+    html = _REF_STATUS.sub(lambda m: str(badge(my_req_map[int(m[1])])) if int(m[1]) in my_req_map else '', html)
+    return Markup(_REF_ACTION.sub(lambda m: '' if int(m[1]) in my_req_map else m[0], html))
 
 @app.route('/connect/book/<int:slot_id>', methods=['POST'])
 def book_slot(slot_id):
@@ -678,7 +750,7 @@ def book_slot(slot_id):
     slot = conn.execute('SELECT * FROM alumni_mentorship_slots WHERE id=? AND status=?', (slot_id,'available')).fetchone()
     if slot:
         conn.execute('UPDATE alumni_mentorship_slots SET status=?, booked_by=? WHERE id=?', ('booked', session['user_id'], slot_id))
-        conn.commit()
+        conn.commit(); fragments.invalidate('slots', f'alumni:{slot["alumni_id"]}')
         create_notification(slot['alumni_id'], f"📅 {session['name']} booked your '{slot['topic']}' slot on {slot['slot_date']} at {slot['slot_time']}!")
         create_notification(session['user_id'], f"✅ Slot booked: {slot['topic']} on {slot['slot_date']} at {slot['slot_time']}. Meeting link shared by mentor.")
         flash('Slot booked successfully!', 'success')
@@ -719,55 +791,188 @@ def respond_referral_request(req_id):
     conn.close(); flash(f'Request {action}!', 'success')
     return redirect(url_for('alumni_dashboard'))
 
+@app.route('/api/notifications')
+def notifications_feed():
+    if 'user_id' not in session: return jsonify({'error':'unauth'}), 401
+    before_id = request.args.get('before_id', type=int)
+    notifs = get_notifications(session['user_id'], request.args.get('limit', 20, type=int), before_id)
+    return jsonify({'notifications': notifs, 'unread': unread_notification_count(session['user_id']),
+                    'next_before_id': notifs[-1]['id'] if notifs else None})
+
+STREAM_HEARTBEAT = 15      # seconds between keep-alive comments on an idle stream
+STREAM_RETRY_MS  = 5000
+
+def _sse(n):
+    return f"id: {n['id']}\nevent: notification\ndata: {json.dumps(n, default=str)}\n\n"
+
+@app.route('/api/notifications/stream')
+def notifications_stream():
+    # Server-sent events. Subscribe first, then replay anything after the
+    # client's last id (Last-Event-ID on reconnect), then drop the DB
+    # connection: from here on the stream only waits on its queue.
+    if 'user_id' not in session: return jsonify({'error':'unauth'}), 401
+    uid = session['user_id']
+    last_id = request.headers.get('Last-Event-ID', type=int)
+    if last_id is None: last_id = request.args.get('last_id', type=int)
+    sub = events.subscribe(uid)
+    backlog = get_notifications_since(uid, last_id) if last_id is not None else []
+    unread = unread_notification_count(uid) if backlog else 0
+    db.detach()
+    def stream(seen=max([n['id'] for n in backlog] + [last_id or 0])):
+        try:
+            yield f'retry: {STREAM_RETRY_MS}\n\n'
+            for n in backlog: yield _sse({**n, 'unread': unread})
+            while True:
+                try: n = sub.get(timeout=STREAM_HEARTBEAT)
+                except queue.Empty:
+                    yield ': ping\n\n'; continue
+                if n['id'] > seen:
+                    seen = n['id']; yield _sse(n)
+        finally:
+            events.unsubscribe(uid, sub)
+    return Response(stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/notifications/read', methods=['POST'])
 @app.route('/api/notifications/read/<int:nid>', methods=['POST'])
-def mark_read(nid):
-    conn = get_db()
-    conn.execute('UPDATE notifications SET is_read=1 WHERE id=? AND user_id=?', (nid, session['user_id']))
-    conn.commit(); conn.close(); return jsonify({'ok': True})
+def mark_read(nid=None):
+    if 'user_id' not in session: return jsonify({'error':'unauth'}), 401
+    ids = [nid] if nid is not None else (request.get_json(silent=True) or {}).get('ids', [])
+    try: changed = mark_notifications_read(session['user_id'], ids)
+    except (TypeError, ValueError): return jsonify({'error': 'ids must be a list of notification ids'}), 400
+    return jsonify({'ok': True, 'marked': changed, 'unread': unread_notification_count(session['user_id'])})
+
+@app.route('/api/notifications/read-all', methods=['POST'])
+def mark_all_read():
+    if 'user_id' not in session: return jsonify({'error':'unauth'}), 401
+    changed = mark_all_notifications_read(session['user_id'])
+    return jsonify({'ok': True, 'marked': changed, 'unread': 0})
+
+METRICS_TOKEN = os.environ.get('PLACEMENTPRO_METRICS_TOKEN', '')
+
+@app.route('/metrics')
+def metrics_endpoint():
+    # Scrapers carry no session; set PLACEMENTPRO_METRICS_TOKEN to require a bearer token.
+    if METRICS_TOKEN and request.headers.get('Authorization') != f'Bearer {METRICS_TOKEN}':
+        return Response('unauthorized\n', 401, mimetype='text/plain')
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+@app.route('/debug/perf')
+def debug_perf():
+    if session.get('role') != 'tpo': return jsonify({'error':'unauth'}), 401
+    return jsonify(profiler.report(request.args.get('recent', 50, type=int)))
+
+@app.route('/api/jobs')
+def list_jobs():
+    if session.get('role') != 'tpo': return jsonify({'error':'unauth'}), 401
+    return jsonify({'jobs': jobs.recent_jobs(int(request.args.get('limit', 10)))})
+
+@app.route('/api/jobs/<int:job_id>')
+def job_status(job_id):
+    if session.get('role') != 'tpo': return jsonify({'error':'unauth'}), 401
+    job = jobs.get_job(job_id)
+    if not job: return jsonify({'error':'not found'}), 404
+    return jsonify(job)
+
+@app.route('/api/drives/<int:drive_id>/shortlist')
+def drive_shortlist(drive_id):
+    if session.get('role') != 'tpo': return jsonify({'error':'unauth'}), 401
+    limit, offset = min(int(request.args.get('limit', 20)), 200), max(0, int(request.args.get('offset', 0)))
+    weights = {k: float(request.args[f'w_{k}']) for k in ('cgpa', 'skills', 'resume', 'status') if f'w_{k}' in request.args}
+    return jsonify(shortlist_candidates(drive_id, limit, offset, weights))
+
+@app.route('/api/students')
+def students_api():
+    if session.get('role') != 'tpo': return jsonify({'error':'unauth'}), 401
+    limit, offset = min(int(request.args.get('limit', 50)), 1000), max(0, int(request.args.get('offset', 0)))
+    return jsonify(student_directory(**_directory_filters(), limit=limit, offset=offset))
 
 @app.route('/api/resume-quality')
 def resume_quality():
     if 'user_id' not in session: return jsonify({'error':'unauth'}), 401
-    conn = get_db()
-    profile = conn.execute('SELECT * FROM student_profiles WHERE user_id=?', (session['user_id'],)).fetchone()
-    conn.close()
-    if not profile: return jsonify({'score':0,'tips':['Complete your profile first']})
-    score = 0; tips = []
-    try: skills = json.loads(profile['skills']) if profile['skills'] else []
-    except: skills = []
-    try: projects = json.loads(profile['projects']) if profile['projects'] else []
-    except: projects = []
-    try: certs = json.loads(profile['certificates']) if profile['certificates'] else []
-    except: certs = []
-    try: linkedin = profile['linkedin'] or ''
-    except: linkedin = ''
-    if profile['cgpa'] and float(profile['cgpa']) > 0: score += 20
-    else: tips.append('Add your CGPA')
-    if profile['branch']: score += 5
-    else: tips.append('Add your branch')
-    if profile['phone']: score += 5
-    else: tips.append('Add phone number')
-    if profile['dob']: score += 5
-    else: tips.append('Add date of birth')
-    if linkedin: score += 5
-    else: tips.append('Add your LinkedIn URL')
-    if len(skills) >= 5: score += 20
-    elif len(skills) >= 3: score += 12; tips.append('Add 2 more skills')
-    elif skills: score += 5; tips.append('Add at least 5 skills')
-    else: tips.append('Add your technical skills')
-    if len(projects) >= 2: score += 25
-    elif len(projects) == 1: score += 15; tips.append('Add one more project to reach 90%+')
-    else: tips.append('Add at least 1 project')
-    if len(certs) >= 2: score += 15
-    elif len(certs) == 1: score += 8; tips.append('Add one more certificate')
-    else: tips.append('Add a certificate (Coursera, NPTEL)')
-    return jsonify({'score': score, 'tips': tips})
-
-@app.route('/api/eligible-count', methods=['POST'])
+    uid = session['user_id']
+    def build():
+        conn = get_db()
+        profile = conn.execute('SELECT * FROM student_profiles WHERE user_id=?', (uid,)).fetchone()
+        conn.close()
+        return jsonify(score_resume(profile))
+    return _validated(f'resume-quality-{uid}-{profile_version(uid)}', build)
+
+@app.route('/api/eligible-count', methods=['GET', 'POST'])
 def eligible_count():
-    data = request.json
     from modules.placement_engine import count_eligible_preview
-    return jsonify({'count': count_eligible_preview(data.get('min_cgpa',0), data.get('max_backlogs',10), data.get('branches',[]))})
+    if request.method == 'POST':
+        data = request.json
+        return jsonify({'count': count_eligible_preview(data.get('min_cgpa',0), data.get('max_backlogs',10), data.get('branches',[]))})
+    # GET, so the browser caches it per query: the count depends only on the
+    # query string and the cohort's eligibility fields.
+    min_cgpa = request.args.get('min_cgpa', 0, type=float)
+    max_backlogs = request.args.get('max_backlogs', 10, type=int)
+    branches = request.args.getlist('branches')
+    return _validated(f'eligible-{data_version("profiles")}',
+                      lambda: jsonify({'count': count_eligible_preview(min_cgpa, max_backlogs, branches)}))
+
+@app.route('/api/cohort-skill-gap')
+def cohort_skill_gap_api():
+    if session.get('role') != 'tpo': return jsonify({'error':'unauth'}), 401
+    branch = request.args.get('branch') or None
+    role = request.args.get('role')
+    if not role: return jsonify(cohort_skill_gap(branch, int(request.args.get('top', 5))))
+    limit, offset = min(int(request.args.get('limit', 100)), 1000), int(request.args.get('offset', 0))
+    students = student_skill_gaps(role, branch)
+    return jsonify({'role': role, 'branch': branch, 'total': len(students),
+                    'students': students[offset:offset + limit]})
+
+@app.route('/api/students-with-skills')
+def students_with_skills_api():
+    if session.get('role') != 'tpo': return jsonify({'error':'unauth'}), 401
+    wanted = [s for s in request.args.get('skills', '').split(',') if s.strip()]
+    students = students_with_skills(wanted, limit=min(int(request.args.get('limit', 100)), 1000))
+    return jsonify({'skills': canonical_skills(wanted), 'students': students})
+
+HISTOGRAM_MAX_THRESHOLDS = 101      # the default 0.0, 0.1, ... 10.0
+
+def _is_number(x):
+    return isinstance(x, (int, float)) and not isinstance(x, bool)
+
+@app.route('/api/eligible-histogram', methods=['POST'])
+def eligible_histogram():
+    if session.get('role') != 'tpo': return jsonify({'error':'unauth'}), 401
+    data = request.get_json(silent=True) or {}
+    from modules.placement_engine import eligible_histogram as histogram
+    thresholds = data.get('thresholds') or [i / 10 for i in range(101)]
+    max_backlogs, branches = data.get('max_backlogs', 10), data.get('branches') or []
+    if (not isinstance(thresholds, list) or len(thresholds) > HISTOGRAM_MAX_THRESHOLDS
+            or not all(_is_number(t) and 0 <= t <= 10 for t in thresholds)):
+        return jsonify({'error': f'thresholds must be a list of at most {HISTOGRAM_MAX_THRESHOLDS} numbers in [0, 10]'}), 400
+    if not _is_number(max_backlogs) or not isinstance(branches, list) or not all(isinstance(b, str) for b in branches):
+        return jsonify({'error': 'max_backlogs must be a number and branches a list of names'}), 400
+    per_branch = histogram(max_backlogs, branches, [float(t) for t in thresholds])
+    total = [sum(col) for col in zip(*per_branch.values())] if per_branch else [0] * len(thresholds)
+    return jsonify({'thresholds': thresholds, 'branches': per_branch, 'total': total})
+
+@app.cli.command('rebuild-stats')
+def rebuild_stats_command():
+    """Rebuild the placement stats counters from scratch and verify them."""
+    migrate()
+    rebuild_stats_snapshot()
+    mismatches = verify_stats_snapshot()
+    for field, (snapshot, fresh) in mismatches.items():
+        print(f'MISMATCH {field}: snapshot={snapshot!r} fresh={fresh!r}')
+    print('stats snapshot rebuilt and verified' if not mismatches else 'stats snapshot verification FAILED')
+    if mismatches: raise SystemExit(1)
+
+@app.cli.command('enable-incremental-vacuum')
+def enable_incremental_vacuum_command():
+    """Convert the database to auto_vacuum=INCREMENTAL so notification retention can free pages.
+    Runs one full VACUUM that blocks writers until it finishes: stop the app or pick a quiet hour."""
+    conn = get_db()
+    before = db.database_bytes(conn)
+    if not db.enable_incremental_vacuum(conn):
+        print('already using auto_vacuum=INCREMENTAL')
+    else:
+        print(f'converted: {before / 1048576:.1f} MiB -> {db.database_bytes(conn) / 1048576:.1f} MiB')
+    conn.close()
 
 if __name__ == '__main__':
     os.makedirs('static/resumes', exist_ok=True)
@@ -0,0 +1,78 @@
+"""Interview scheduling: one form post per applicant vs scheduler.auto_schedule.
+
+A target drive gets `applicants` open applications; a third of those students
+already hold interviews for other drives on the same days. The "per booking"
+run replays what schedule_interview did for each student (conflict SELECT,
+INSERT, notification, status UPDATE, each committed), walking the slots in
+order and ignoring other drives. The auto run books everyone in one
+transaction and is checked for cross-drive clashes.
+
+    python -m benchmarks.bench_auto_schedule 300 1000
+"""
+import random, sys
+from benchmarks.common import temp_db, seed_students, seed_drives, timeit, fmt_ms
+from modules import scheduler
+from modules.db import get_db
+from modules.notifications import create_notification
+
+DATES = ['2026-03-02', '2026-03-03', '2026-03-04']
+SLOT, PANELS = 20, 14
+
+def seed(applicants, seed=3):
+    rnd = random.Random(seed)
+    path = temp_db()
+    seed_students(path, applicants)
+    seed_drives(path, 4)
+    conn = get_db()
+    students = [r[0] for r in conn.execute("SELECT id FROM users WHERE role='student' ORDER BY id LIMIT ?", (applicants,))]
+    target, *others = [r[0] for r in conn.execute('SELECT id FROM drives ORDER BY id DESC LIMIT 4')]
+    conn.executemany("INSERT INTO applications(student_id, drive_id, status) VALUES(?,?,'applied')",
+                     [(s, target) for s in students])
+    busy = []
+    for panel, s in enumerate(rnd.sample(students, len(students) // 3), 1):
+        start = rnd.randrange(9 * 60 + 30, 17 * 60, 15)
+        busy.append((rnd.choice(others), s, rnd.choice(DATES), f'{start // 60:02d}:{start % 60:02d}', panel))
+    conn.executemany('''INSERT INTO interview_schedule(drive_id, student_id, interview_date, time_slot, panel, starts_at, ends_at)
+        VALUES(?,?,?,?,?,?,?)''', [(*b, *scheduler.slot_bounds(b[2], b[3])) for b in busy])
+    conn.commit(); conn.close()
+    return path, target, students
+
+def per_booking(drive_id, students):
+    slots = [(s, p) for s in scheduler.slot_grid(DATES, SLOT) for p in range(1, PANELS + 1)]
+    conn = get_db()
+    for sid, ((start, end), panel) in zip(students, slots):
+        day, slot = start.strftime('%Y-%m-%d'), scheduler.format_slot(start, end)
+        conn.execute('SELECT * FROM interview_schedule WHERE drive_id=? AND interview_date=? AND time_slot=? AND panel=?',
+                     (drive_id, day, slot, panel)).fetchone()
+        conn.execute('INSERT INTO interview_schedule(drive_id,student_id,interview_date,time_slot,panel) VALUES(?,?,?,?,?)',
+                     (drive_id, sid, day, slot, panel)); conn.commit()
+        create_notification(sid, f'Interview scheduled on {day} at {slot}')
+        conn.execute("UPDATE applications SET status='interview_scheduled' WHERE student_id=? AND drive_id=?", (sid, drive_id))
+        conn.commit()
+    conn.close()
+
+def clashes():
+    conn = get_db()
+    rows = conn.execute('SELECT student_id, interview_date, time_slot FROM interview_schedule').fetchall()
+    conn.close()
+    index, n = scheduler.IntervalIndex(), 0
+    for r in rows:
+        span = scheduler.parse_slot(r['interview_date'], r['time_slot'])
+        n += index.overlaps(r['student_id'], *span)
+        index.add(r['student_id'], *span)
+    return n
+
+def run(sizes):
+    print(f"{'applicants':>10} {'per booking':>12} {'clashes':>8} {'auto':>12} {'clashes':>8} {'unplaced':>9}")
+    for n in sizes:
+        _, drive_id, students = seed(n)
+        t_old, _ = timeit(lambda: per_booking(drive_id, students), repeat=1)
+        old_clashes = clashes()
+        _, drive_id, students = seed(n)
+        t_new, result = timeit(lambda: scheduler.auto_schedule(drive_id, DATES, SLOT, PANELS), repeat=1)
+        new_clashes = clashes()
+        assert new_clashes == 0, 'auto_schedule double-booked a student'
+        print(f"{n:>10} {fmt_ms(t_old)} {old_clashes:>8} {fmt_ms(t_new)} {new_clashes:>8} {len(result['unplaced']):>9}")
+
+if __name__ == '__main__':
+    run([int(a) for a in sys.argv[1:]] or [300, 1000])
@@ -0,0 +1,52 @@
+"""Dashboard read latency while a large notification fan-out is being written.
+
+Compares the old connection settings (rollback journal, default pragmas) with
+the shared WAL connection layer in modules/db.py. Readers and the writer share
+one process here, so under WAL the write also competes with the (now
+unblocked) readers for the GIL; in production they are separate workers.
+
+    python -m benchmarks.bench_db_concurrency [recipients] [readers]
+"""
+import sys, threading, time, statistics
+from benchmarks.common import temp_db, seed_students, fmt_ms
+from modules import db, notifications, analytics, placement_engine
+
+MODES = {
+    'rollback journal': ('DELETE', ['PRAGMA busy_timeout=30000']),
+    'shared WAL':       (db.JOURNAL_MODE, list(db.PRAGMAS)),
+}
+
+def dashboard_read(uid):
+    notifications.get_notifications(uid)
+    placement_engine.get_eligible_drives(uid)
+    analytics.get_placement_stats()
+
+def run(recipients, readers):
+    print(f"{'mode':<18} {'reads':>6} {'p50':>12} {'p99':>12} {'max':>12} {'write':>12}")
+    for mode, (journal, pragmas) in MODES.items():
+        db.JOURNAL_MODE, db.PRAGMAS = journal, pragmas
+        path = temp_db()
+        seed_students(path, 5000)
+        latencies, done = [], threading.Event()
+
+        def reader(uid):
+            while not done.is_set():
+                t = time.perf_counter(); dashboard_read(uid); latencies.append(time.perf_counter() - t)
+                db.release()
+
+        threads = [threading.Thread(target=reader, args=(6 + i,)) for i in range(readers)]
+        for t in threads: t.start()
+        time.sleep(0.2)
+        t0 = time.perf_counter()
+        for _ in range(3):
+            notifications.create_notifications_bulk(range(6, 6 + recipients), 'x' * 200)
+        t_write = time.perf_counter() - t0
+        done.set()
+        for t in threads: t.join()
+        latencies.sort()
+        print(f'{mode:<18} {len(latencies):>6} {fmt_ms(statistics.median(latencies))} '
+              f'{fmt_ms(latencies[int(len(latencies) * 0.99)])} {fmt_ms(latencies[-1])} {fmt_ms(t_write)}')
+
+if __name__ == '__main__':
+    args = [int(a) for a in sys.argv[1:]]
+    run(args[0] if args else 100000, max(1, args[1]) if len(args) > 1 else 4)
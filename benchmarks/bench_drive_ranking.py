@@ -0,0 +1,54 @@
+"""Student feed ranking: rank every student's eligible drives.
+
+Seeds 10k students and 500 active drives, builds the per-drive feature rows
+once, then ranks each student's eligible drives (computed up front, so only
+ranking is timed). A sample of students is also timed end to end through
+get_ranked_drives, which adds the eligibility query.
+
+    python -m benchmarks.bench_drive_ranking [students] [drives]
+"""
+import sys, json, time, statistics
+from benchmarks.common import temp_db, seed_students, seed_drives, fmt_ms
+from modules import placement_engine
+from modules.db import get_db
+
+def run(students, drives):
+    path = temp_db()
+    seed_students(path, students)
+    seed_drives(path, drives)
+    placement_engine.invalidate_drive_features()
+    conn = get_db()
+    profiles = [dict(r) for r in conn.execute(
+        "SELECT sp.* FROM student_profiles sp JOIN users u ON u.id=sp.user_id WHERE u.role='student'")]
+    active = [dict(r) for r in conn.execute("SELECT * FROM drives WHERE status='active'")]
+    conn.close()
+
+    t = time.perf_counter(); placement_engine._load_features(); t_build = time.perf_counter() - t
+
+    branches = {d['id']: json.loads(d['allowed_branches']) for d in active}
+    def eligible(p):
+        return [d for d in active if d['min_cgpa'] <= p['cgpa'] and d['max_backlogs'] >= p['backlogs']
+                and (not branches[d['id']] or p['branch'] in branches[d['id']])]
+    feeds = [(json.loads(p['skills']), eligible(p)) for p in profiles]
+
+    times = []
+    for skills, feed in feeds:
+        t = time.perf_counter(); placement_engine.rank_drives(skills, feed); times.append(time.perf_counter() - t)
+    times.sort()
+    sizes = sorted(len(f) for _, f in feeds)
+
+    e2e = []
+    for p in profiles[:200]:
+        t = time.perf_counter(); placement_engine.get_ranked_drives(p['user_id']); e2e.append(time.perf_counter() - t)
+    e2e.sort()
+
+    print(f'{len(profiles)} students x {len(active)} drives; feed size p50 {sizes[len(sizes) // 2]}, max {sizes[-1]}')
+    print(f'feature build      {fmt_ms(t_build)}')
+    print(f'rank p50           {fmt_ms(statistics.median(times))}')
+    print(f'rank p99           {fmt_ms(times[int(len(times) * 0.99)])}')
+    print(f'rank all students  {fmt_ms(sum(times))}')
+    print(f'end-to-end p50     {fmt_ms(statistics.median(e2e))}   (eligibility query + rank, 200 students)')
+
+if __name__ == '__main__':
+    args = [int(a) for a in sys.argv[1:]]
+    run(args[0] if args else 10000, args[1] if len(args) > 1 else 500)
@@ -0,0 +1,80 @@
+"""Eligibility engine scaling: legacy Python-loop filter vs SQL predicates,
+and the in-memory preview index behind /api/eligible-count.
+
+    python -m benchmarks.bench_eligibility [sizes...]
+"""
+import sys, json, sqlite3
+from benchmarks.common import temp_db, seed_students, seed_drives, timeit, fmt_ms
+from modules import placement_engine
+
+def legacy_eligible_students(path, drive_id):
+    conn = sqlite3.connect(path); conn.row_factory = sqlite3.Row
+    drive = conn.execute('SELECT * FROM drives WHERE id=?', (drive_id,)).fetchone()
+    allowed = json.loads(drive['allowed_branches'])
+    students = conn.execute('''SELECT u.id as user_id, u.name, u.email, sp.cgpa, sp.backlogs, sp.branch, sp.skills
+        FROM users u JOIN student_profiles sp ON u.id = sp.user_id WHERE u.role = 'student' ''').fetchall()
+    conn.close()
+    return [dict(s) for s in students if s['cgpa'] >= drive['min_cgpa'] and
+        s['backlogs'] <= drive['max_backlogs'] and (not allowed or s['branch'] in allowed)]
+
+def legacy_count_preview(path, min_cgpa, max_backlogs, branches):
+    conn = sqlite3.connect(path); conn.row_factory = sqlite3.Row
+    students = conn.execute('SELECT sp.cgpa, sp.backlogs, sp.branch FROM student_profiles sp').fetchall()
+    conn.close()
+    return sum(1 for s in students if s['cgpa'] >= min_cgpa and s['backlogs'] <= max_backlogs
+        and (not branches or s['branch'] in branches))
+
+def sql_count_preview(path, min_cgpa, max_backlogs, branches):
+    conn = sqlite3.connect(path)
+    count = conn.execute('SELECT COUNT(*) FROM student_profiles WHERE cgpa >= ? AND backlogs <= ? AND branch IN (%s)'
+        % ','.join('?' * len(branches)), [min_cgpa, max_backlogs] + branches).fetchone()[0]
+    conn.close()
+    return count
+
+def legacy_eligible_drives(path, student_id):
+    conn = sqlite3.connect(path); conn.row_factory = sqlite3.Row
+    profile = conn.execute('SELECT * FROM student_profiles WHERE user_id=?', (student_id,)).fetchone()
+    drives = conn.execute("SELECT * FROM drives WHERE status='active' ORDER BY created_at DESC").fetchall()
+    conn.close()
+    out = []
+    for d in drives:
+        allowed = json.loads(d['allowed_branches'])
+        if profile['cgpa'] >= d['min_cgpa'] and profile['backlogs'] <= d['max_backlogs'] and \
+           (not allowed or profile['branch'] in allowed):
+            out.append(dict(d))
+    return out
+
+def run(sizes):
+    print(f"{'students':>9} {'case':<22} {'before':>12} {'after':>12} {'speedup':>8}  rows")
+    for n in sizes:
+        path = temp_db()
+        seed_students(path, n)
+        seed_drives(path, 500)
+        placement_engine.invalidate_eligibility_index()
+        # drive 1 (TCS, CS/MCA/IT, cgpa >= 7) comes from the init_db seed rows
+        cases = [
+            ('eligible_students', lambda: legacy_eligible_students(path, 1),
+                                  lambda: placement_engine.get_eligible_students(1)),
+            ('count_preview',     lambda: legacy_count_preview(path, 8.0, 0, ['CS', 'IT']),
+                                  lambda: placement_engine.count_eligible_preview(8.0, 0, ['CS', 'IT'])),
+            ('eligible_drives',   lambda: legacy_eligible_drives(path, 2),
+                                  lambda: placement_engine.get_eligible_drives(2)),
+        ]
+        for name, old, new in cases:
+            t_old, r_old = timeit(old)
+            t_new, r_new = timeit(new)
+            size = r_new if isinstance(r_new, int) else len(r_new)
+            assert (r_old if isinstance(r_old, int) else len(r_old)) == size, name
+            print(f'{n:>9} {name:<22} {fmt_ms(t_old)} {fmt_ms(t_new)} {t_old / t_new:7.1f}x  {size}')
+        # Preview index: one-off build cost, then a 101-point cgpa curve for 3 branches
+        # against one indexed SQL COUNT per threshold.
+        thresholds = [i / 10 for i in range(101)]
+        placement_engine.invalidate_eligibility_index()
+        t_build, _ = timeit(lambda: placement_engine.count_eligible_preview(0, 0, []), repeat=1)
+        t_old, _ = timeit(lambda: [sql_count_preview(path, t, 0, ['CS', 'IT', 'MCA']) for t in thresholds], repeat=1)
+        t_new, _ = timeit(lambda: placement_engine.eligible_histogram(0, ['CS', 'IT', 'MCA'], thresholds))
+        print(f'{n:>9} {"index_build":<22} {"":>12} {fmt_ms(t_build)}')
+        print(f'{n:>9} {"histogram_101":<22} {fmt_ms(t_old)} {fmt_ms(t_new)} {t_old / t_new:7.1f}x')
+
+if __name__ == '__main__':
+    run([int(a) for a in sys.argv[1:]] or [1000, 10000, 100000])
@@ -0,0 +1,53 @@
+"""Dashboard fragment cache: page times with every fragment rebuilt vs served from the cache.
+
+Builds a synthetic campus, then times the four dashboards for a busy user of
+each role three ways: with the fragment cache cleared before every request
+(the old behaviour, every section recomputed), warm, and right after a write
+that invalidates the page's shared fragments. The last column is what the
+first visitor after a write pays. Pages must render the same HTML cold and
+warm.
+
+    python -m benchmarks.bench_fragments 10000 200 500
+"""
+import sys
+from benchmarks.common import temp_db, timeit, fmt_ms
+from benchmarks.synthetic import generate
+from modules import fragments
+from modules.db import get_db
+
+def run(students, drives, alumni):
+    generate(temp_db(), students, drives, alumni)
+    import app
+    conn = get_db()
+    tpo = conn.execute("SELECT id FROM users WHERE role='tpo'").fetchone()[0]
+    student = conn.execute('SELECT student_id FROM applications GROUP BY student_id ORDER BY COUNT(*) DESC LIMIT 1').fetchone()[0]
+    alumnus = conn.execute('SELECT alumni_id FROM alumni_mentorship_slots GROUP BY alumni_id ORDER BY COUNT(*) DESC LIMIT 1').fetchone()[0]
+    conn.close()
+
+    def client(uid, role):
+        c = app.app.test_client()
+        with c.session_transaction() as s: s.update(user_id=uid, role=role, name=role)
+        return c
+    t, s, a = client(tpo, 'tpo'), client(student, 'student'), client(alumnus, 'alumni')
+    pages = [('/tpo', t, 'drives'), ('/student', s, 'drives'), ('/alumni', a, f'alumni:{alumnus}'),
+             ('/connect', s, 'slots')]
+
+    print(f'{students} students, {drives} drives, {alumni} alumni')
+    print(f"  {'page':<10} {'uncached':>12} {'cached':>12} {'after write':>12}")
+    for url, c, tag in pages:
+        def cold():
+            fragments.clear()
+            return c.get(url).get_data(as_text=True)
+        def after_write():
+            fragments.invalidate(tag)
+            return c.get(url).get_data(as_text=True)
+        warm = lambda: c.get(url).get_data(as_text=True)
+        t_cold, html_cold = timeit(cold, repeat=10)
+        t_warm, html_warm = timeit(warm, repeat=10)
+        t_write, _ = timeit(after_write, repeat=10)
+        assert html_cold == html_warm, f'{url} renders differently from the cache'
+        print(f'  {url:<10} {fmt_ms(t_cold)} {fmt_ms(t_warm)} {fmt_ms(t_write)}')
+
+if __name__ == '__main__':
+    args = [int(x) for x in sys.argv[1:]]
+    run(*(args + [10000, 200, 500][len(args):]))
@@ -0,0 +1,45 @@
+"""HTTP validators: a full response vs a 304 revalidation, per endpoint.
+
+Seeds `students` students, then for one of them times each validated
+endpoint twice: a plain GET (what every request cost before), and a GET
+carrying the ETag from the first response, which must come back 304 with no
+body. For the resume it also times a 64 KiB Range request. Bytes are the
+response body sizes.
+
+    python -m benchmarks.bench_http_cache 10000
+"""
+import os, sys, tempfile
+from benchmarks.common import temp_db, seed_students, timeit, fmt_ms
+from modules import resume_engine
+from modules.db import get_db
+
+def run(students):
+    seed_students(temp_db(), students)
+    import app
+    resume_engine.CACHE_DIR = os.path.join(tempfile.mkdtemp(prefix='ppbench_resumes_'), 'cache')
+    conn = get_db()
+    uid, name = conn.execute("SELECT id, name FROM users WHERE role='student' ORDER BY id LIMIT 1").fetchone()
+    conn.close()
+    client = app.app.test_client()
+    with client.session_transaction() as s: s.update(user_id=uid, role='student', name=name)
+    pdf_url = client.get('/student/resume/generate').headers['Location']
+    urls = [('resume quality', '/api/resume-quality'),
+            ('eligible count', '/api/eligible-count?min_cgpa=7&max_backlogs=1&branches=CS&branches=IT'),
+            ('resume PDF', pdf_url)]
+
+    print(f'{students} students')
+    print(f"  {'endpoint':<16} {'full':>12} {'bytes':>7} {'304':>12} {'bytes':>7}")
+    for label, url in urls:
+        full = lambda: client.get(url)
+        t_full, r = timeit(full, repeat=20)
+        assert r.status_code == 200, (url, r.status_code)
+        etag = r.headers['ETag']
+        t_304, r304 = timeit(lambda: client.get(url, headers={'If-None-Match': etag}), repeat=20)
+        assert r304.status_code == 304 and not r304.data, (url, r304.status_code)
+        print(f'  {label:<16} {fmt_ms(t_full)} {len(r.data):>7} {fmt_ms(t_304)} {len(r304.data):>7}')
+    t_range, r = timeit(lambda: client.get(pdf_url, headers={'Range': 'bytes=0-65535'}), repeat=20)
+    assert r.status_code in (200, 206), r.status_code      # 200 when the PDF is smaller than the range
+    print(f"  {'PDF first 64K':<16} {fmt_ms(t_range)} {len(r.data):>7}  ({r.status_code}, {r.headers.get('Content-Range', 'whole file')})")
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
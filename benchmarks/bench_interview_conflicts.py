@@ -0,0 +1,66 @@
+"""Interview conflict checks: parsing time_slot text vs the starts_at interval indexes.
+
+`bookings` existing interviews are spread over 60 days, 40 venues and a
+fifth as many students; a batch of 300 proposals is then checked for
+student and venue clashes. The text run is what detection cost before the
+parsed columns: fetch the student's and the venue's bookings for that date
+(no venue index) and parse every time_slot. The indexed run is
+scheduler.find_conflicts. Both must report the same clashes.
+
+    python -m benchmarks.bench_interview_conflicts 10000 100000
+"""
+import random, sys
+from datetime import date, timedelta
+from benchmarks.common import temp_db, seed_students, seed_drives, timeit, fmt_ms
+from modules import scheduler
+from modules.db import get_db
+
+VENUES = [f'Room {i}' for i in range(40)]
+DAYS = [(date(2026, 1, 5) + timedelta(days=d)).isoformat() for d in range(60)]
+
+def _booking(rnd, students):
+    start = rnd.randrange(9 * 60, 17 * 60, 15)
+    slot = f'{start // 60:02d}:{start % 60:02d}' + (f'-{(start + 45) // 60:02d}:{(start + 45) % 60:02d}' if rnd.random() < 0.5 else '')
+    return rnd.choice(students), rnd.choice(DAYS), slot, rnd.choice(VENUES)
+
+def seed(n, seed=11):
+    rnd = random.Random(seed)
+    path = temp_db()
+    seed_students(path, max(100, n // 5))
+    seed_drives(path, 50)
+    conn = get_db()
+    students = [r[0] for r in conn.execute("SELECT id FROM users WHERE role='student'")]
+    drives = [r[0] for r in conn.execute('SELECT id FROM drives')]
+    rows = [(drives[i % len(drives)], i, *_booking(rnd, students)) for i in range(n)]
+    conn.executemany('''INSERT INTO interview_schedule(drive_id, panel, student_id, interview_date, time_slot, venue, starts_at, ends_at)
+        VALUES(?,?,?,?,?,?,?,?)''', [(*r, *scheduler.slot_bounds(r[3], r[4])) for r in rows])
+    conn.commit(); conn.close()
+    return [dict(zip(('student_id', 'interview_date', 'time_slot', 'venue'), _booking(rnd, students))) for _ in range(300)]
+
+def text_scan(proposals):
+    conn = get_db()
+    found = set()
+    for i, p in enumerate(proposals):
+        start, end = scheduler.parse_slot(p['interview_date'], p['time_slot'])
+        for kind, column in (('student', 'student_id'), ('venue', 'venue')):
+            for r in conn.execute(f'SELECT id, interview_date, time_slot FROM interview_schedule WHERE {column}=? AND interview_date=?',
+                                  (p[column], p['interview_date'])):
+                s, e = scheduler.parse_slot(r['interview_date'], r['time_slot'])
+                if s < end and e > start: found.add((i, kind, r['id']))
+    conn.close()
+    return found
+
+def indexed(proposals):
+    return {(c['index'], c['kind'], c['with']['id']) for c in scheduler.find_conflicts(proposals) if 'id' in (c['with'] or {})}
+
+def run(sizes):
+    print(f"{'bookings':>9} {'clashes':>8} {'text scan':>12} {'indexed':>12} {'speedup':>8}")
+    for n in sizes:
+        proposals = seed(n)
+        t_old, old = timeit(lambda: text_scan(proposals))
+        t_new, new = timeit(lambda: indexed(proposals))
+        assert old == new, 'indexed conflict check disagrees with the text scan'
+        print(f'{n:>9} {len(new):>8} {fmt_ms(t_old)} {fmt_ms(t_new)} {t_old / t_new:>7.1f}x')
+
+if __name__ == '__main__':
+    run([int(a) for a in sys.argv[1:]] or [10000, 100000])
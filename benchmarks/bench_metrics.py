@@ -0,0 +1,29 @@
+"""Cost of the engine metrics: one observe(), one timed block, and a /metrics scrape.
+
+    python -m benchmarks.bench_metrics 100000
+"""
+import sys
+from benchmarks.common import timeit
+from modules import metrics
+
+def run(n):
+    hist = metrics.Histogram('bench_seconds', 'Benchmark histogram.', ['query'])
+    counter = metrics.Counter('bench_total', 'Benchmark counter.', ['path'])
+    def observe():
+        for i in range(n): hist.observe(i * 1e-6, query='students')
+    def timed():
+        for _ in range(n):
+            with hist.time(query='drives'): pass
+    def inc():
+        for _ in range(n): counter.inc(path='bulk')
+    for name, fn in (('observe', observe), ('time() block', timed), ('counter inc', inc)):
+        t, _ = timeit(fn, repeat=3)
+        print(f'{name:<14} {t / n * 1e9:8.0f} ns/op')
+    t, text = timeit(metrics.render)
+    print(f'{"scrape":<14} {fmt(t)}  ({len(text.splitlines())} lines)')
+
+def fmt(seconds):
+    return f'{seconds * 1e6:8.0f} us'
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,64 @@
+"""Notification retention: what compact_notifications reclaims and what it costs.
+
+`students` students each receive `announcements` broadcast messages, written
+the way fan-outs were before bodies were deduplicated (full text inline on
+every row). The older two thirds are backdated past the retention window and
+most of those are read. The run reports rows deduplicated and archived, the
+archive's compression, the database size before and after, and the feed page
+time before and after (the page now joins notification_messages).
+
+    python -m benchmarks.bench_notification_retention 2000 50
+"""
+import random, sys
+from benchmarks.common import temp_db, seed_students, timeit, fmt_ms
+from modules import notifications
+from modules.db import get_db, database_bytes
+
+BODY = ('📣 [Company {i}] Registration for the {i} campus drive is open. Eligible branches, '
+        'the CTC breakdown, the aptitude syllabus and the interview schedule are on the drive page. '
+        'Apply before the deadline; late applications are not accepted.')
+
+def seed(students, announcements, seed=5):
+    rnd = random.Random(seed)
+    path = temp_db()
+    seed_students(path, students)
+    conn = get_db()
+    ids = [r[0] for r in conn.execute("SELECT id FROM users WHERE role='student'")]
+    old = announcements * 2 // 3
+    for i in range(announcements):
+        age = f'-{200 - i} days' if i < old else f'-{announcements - i} days'
+        conn.executemany("INSERT INTO notifications(user_id, message, is_read, created_at) VALUES(?,?,?,datetime('now', ?))",
+                         [(u, BODY.format(i=i), int(rnd.random() < 0.9), age) for u in ids])
+    conn.commit(); conn.close()
+    return ids[0]
+
+def mib(n):
+    return f'{n / 1048576:8.1f} MiB'
+
+def run(students, announcements):
+    uid = seed(students, announcements)
+    page = lambda: notifications.get_notifications(uid, 20)
+    conn = get_db()
+    rows = conn.execute('SELECT COUNT(*) FROM notifications').fetchone()[0]
+    conn.close()
+    t_before, before = timeit(page)
+    t_run, report = timeit(lambda: notifications.compact_notifications(days=90), repeat=1)
+    t_after, after = timeit(page)
+    kept = {n['id']: n['message'] for n in before}
+    assert all(kept.get(n['id'], n['message']) == n['message'] for n in after), 'feed text changed after compaction'
+    conn = get_db()
+    left = conn.execute('SELECT COUNT(*) FROM notifications').fetchone()[0]
+    size = database_bytes(conn)
+    conn.close()
+    print(f'{rows} notifications ({students} students x {announcements} announcements)')
+    print(f"  deduplicated     {report['deduplicated']:>9} rows  {mib(report['dedupe_bytes'])} of repeated text")
+    print(f"  archived         {report['archived']:>9} rows  {mib(report['archive_raw_bytes'])} -> "
+          f"{mib(report['archive_bytes']).strip()} compressed")
+    print(f"  database         {mib(report['db_bytes_before'])} -> {mib(size).strip()}  "
+          f"({mib(report['reclaimed_bytes']).strip()} reclaimed, {left} rows left)")
+    print(f'  compaction run   {fmt_ms(t_run)}')
+    print(f'  feed page        {fmt_ms(t_before)} before, {fmt_ms(t_after).strip()} after')
+
+if __name__ == '__main__':
+    args = [int(a) for a in sys.argv[1:]]
+    run(*(args + [2000, 50][len(args):]))
@@ -0,0 +1,83 @@
+"""Notification feed: OFFSET vs keyset paging, COUNT vs the unread counter,
+per-click vs batched mark-read, and what the counter triggers add to a bulk
+fan-out.
+
+One student holds `n` notifications (half unread); the feed is read 20 at a
+time at the given depth.
+
+    python -m benchmarks.bench_notifications 10000 100000
+"""
+import sys
+from benchmarks.common import temp_db, seed_students, timeit, fmt_ms
+from modules import notifications
+from modules.db import get_db
+
+PAGE, CLICKS = 20, 50
+
+def seed(n):
+    temp_db()
+    conn = get_db()
+    uid = conn.execute("SELECT MIN(id) FROM users WHERE role='student'").fetchone()[0]
+    conn.executemany('INSERT INTO notifications(user_id, message, is_read) VALUES(?,?,?)',
+                     ((uid, f'Notification {i}', i % 2) for i in range(n)))
+    conn.commit(); conn.close()
+    return uid
+
+def offset_page(uid, depth):
+    conn = get_db()
+    rows = conn.execute('SELECT * FROM notifications WHERE user_id=? ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?',
+                        (uid, PAGE, depth)).fetchall()
+    conn.close()
+    return [r['id'] for r in rows]
+
+def count_unread(uid):
+    conn = get_db()
+    n = conn.execute('SELECT COUNT(*) FROM notifications WHERE user_id=? AND is_read=0', (uid,)).fetchone()[0]
+    conn.close()
+    return n
+
+def per_click(uid, ids):
+    conn = get_db()
+    for i in ids:
+        conn.execute('UPDATE notifications SET is_read=1 WHERE id=? AND user_id=?', (i, uid)); conn.commit()
+    conn.close()
+
+def fanout(n, with_triggers):
+    seed_path = temp_db()
+    seed_students(seed_path, n)
+    conn = get_db()
+    ids = [r[0] for r in conn.execute("SELECT id FROM users WHERE role='student'")]
+    if not with_triggers:
+        for t in ('trg_notif_unread_ins', 'trg_notif_unread_del', 'trg_notif_unread_upd'):
+            conn.execute(f'DROP TRIGGER {t}')
+    conn.close()
+    return timeit(lambda: notifications.create_notifications_bulk(ids, 'Drive announced'), repeat=1)[0]
+
+def run(sizes):
+    print(f"{'rows':>8} {'offset pg':>12} {'keyset pg':>12} {'COUNT(*)':>12} {'counter':>12} {'50 clicks':>12} {'1 batch':>12}")
+    for n in sizes:
+        uid = seed(n)
+        depth = n // 2
+        conn = get_db()   # the id a client paging 20 at a time would hold at this depth
+        before = conn.execute('SELECT id FROM notifications WHERE user_id=? ORDER BY id DESC LIMIT 1 OFFSET ?',
+                              (uid, depth - 1)).fetchone()[0]
+        conn.close()
+        t_off, a = timeit(lambda: offset_page(uid, depth))
+        t_key, b = timeit(lambda: [r['id'] for r in notifications.get_notifications(uid, PAGE, before)])
+        assert a == b, 'keyset page differs from OFFSET page'
+        t_cnt, c1 = timeit(lambda: count_unread(uid))
+        t_ctr, c2 = timeit(lambda: notifications.unread_notification_count(uid))
+        assert c1 == c2, 'unread counter drifted'
+        conn = get_db()
+        unread = [r[0] for r in conn.execute('SELECT id FROM notifications WHERE user_id=? AND is_read=0 LIMIT ?', (uid, 2 * CLICKS))]
+        conn.close()
+        t_click, _ = timeit(lambda: per_click(uid, unread[:CLICKS]), repeat=1)
+        t_batch, _ = timeit(lambda: notifications.mark_notifications_read(uid, unread[CLICKS:]), repeat=1)
+        assert count_unread(uid) == notifications.unread_notification_count(uid)
+        print(f'{n:>8} {fmt_ms(t_off)} {fmt_ms(t_key)} {fmt_ms(t_cnt)} {fmt_ms(t_ctr)} {fmt_ms(t_click)} {fmt_ms(t_batch)}')
+    n = max(sizes)
+    print(f'\nfan-out of one message to {n} students: {fmt_ms(fanout(n, False)).strip()} without counter triggers, '
+          f'{fmt_ms(fanout(n, True)).strip()} with')
+
+if __name__ == '__main__':
+    run([int(a) for a in sys.argv[1:]] or [10000, 100000])
@@ -0,0 +1,39 @@
+"""Query profiler overhead: the same route with profiling off, sampled and on.
+
+Requests /tpo/drive/<id> (eligibility scan plus five queries) and
+/api/notifications through Flask's test client with
+profiler.SAMPLE_RATE at 0, 0.01 and 1, and reports the median per-request
+time of each and what a fully profiled request looks like.
+
+    python -m benchmarks.bench_profiler 5000 300
+"""
+import sys
+from benchmarks.common import temp_db, seed_students, seed_drives, timeit, fmt_ms
+from modules import profiler
+
+RATES = [0, 0.01, 1]
+
+def run(students, requests):
+    path = temp_db()
+    seed_students(path, students)
+    seed_drives(path, 20)
+    import app
+    client = app.app.test_client()
+    with client.session_transaction() as s: s.update(user_id=1, role='tpo', name='TPO')
+    routes = ['/tpo/drive/20', '/api/notifications']
+    for r in routes: client.get(r)   # warm caches and run migrations
+    print(f"{'route':<22}" + ''.join(f'{f"sample {r:g}":>14}' for r in RATES))
+    for route in routes:
+        times = []
+        for rate in RATES:
+            profiler.SAMPLE_RATE = rate
+            t, _ = timeit(lambda: [client.get(route) for _ in range(requests)], repeat=3)
+            times.append(t / requests)
+        print(f'{route:<22}' + ''.join(f'{fmt_ms(t):>14}' for t in times))
+    profiler.SAMPLE_RATE = 0
+    rec = profiler.report(1)['recent'][0]
+    print(f"\nlast profiled request: {rec['route']}  {rec['ms']} ms, {rec['queries']} queries, {rec['sql_ms']} ms in SQL")
+
+if __name__ == '__main__':
+    args = [int(a) for a in sys.argv[1:]]
+    run(*(args + [5000, 300][len(args):]))
@@ -0,0 +1,35 @@
+"""Batch resume rendering throughput: resumes/sec against process-pool size.
+
+Renders the same synthetic students into a zip with 1, 2, 4 ... workers up
+to the machine's core count. Worker processes are spawned, so the first
+batch at each size includes interpreter + ReportLab start-up.
+
+    python -m benchmarks.bench_resume_batch [students]
+"""
+import os, sys, time, tempfile
+from benchmarks.common import temp_db, seed_students
+from modules import resume_engine
+
+def worker_counts():
+    cores, n, counts = os.cpu_count() or 1, 1, []
+    while n < cores: counts.append(n); n *= 2
+    return counts + [cores]
+
+def run(students):
+    path = temp_db()
+    seed_students(path, students)
+    inputs = resume_engine.load_resume_inputs(list(range(6, 6 + students)))
+    out = os.path.join(tempfile.mkdtemp(prefix='ppbench_'), 'batch.zip')
+    print(f'{len(inputs)} resumes, {os.cpu_count()} cores')
+    print(f"{'workers':>8} {'seconds':>10} {'resumes/s':>10} {'speedup':>8}")
+    base = None
+    for workers in worker_counts():
+        t = time.perf_counter()
+        count = resume_engine.generate_resumes_batch(inputs, out, workers=workers)
+        elapsed = time.perf_counter() - t
+        assert count == len(inputs)
+        base = base or elapsed
+        print(f'{workers:>8} {elapsed:>10.2f} {count / elapsed:>10.1f} {base / elapsed:>7.2f}x')
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,64 @@
+"""Per-section resume rendering cost, shared vs per-paragraph styles.
+
+Times each entry of resume_engine.SECTIONS (story construction) and the final
+doc.build (layout + PDF serialisation) for a fully populated profile. The
+"fresh styles" run reproduces the old behaviour of constructing a new
+ParagraphStyle / TableStyle for every paragraph and table.
+
+    python -m benchmarks.bench_resume_render [renders]
+"""
+import io, json, sys, time
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, TableStyle
+from benchmarks.common import fmt_ms
+from modules import resume_engine as engine
+
+USER = {'id': 1, 'name': 'Benchmark Student', 'email': 'bench@student.edu'}
+PROFILE = {
+    'branch': 'CS', 'cgpa': 8.4, 'phone': '+91 98765 43210', 'linkedin': 'linkedin.com/in/bench', 'dob': '2003-01-01',
+    'skills': json.dumps(['Python', 'SQL', 'React', 'Docker', 'AWS', 'Pandas', 'Git', 'Linux']),
+    'projects': json.dumps([{'name': f'Project {i}', 'desc': 'Built a service with a REST API and a dashboard. ' * 3,
+                             'url': f'github.com/bench/p{i}'} for i in range(6)]),
+    'certificates': json.dumps([{'title': f'Certificate {i}', 'issuer': 'Coursera', 'year': '2023'} for i in range(6)]),
+}
+
+class FreshStyles(dict):
+    """STYLES stand-in that builds a new ParagraphStyle on every lookup."""
+    def __getitem__(self, key):
+        s = dict.__getitem__(self, key)
+        return ParagraphStyle(s.name, **{k: v for k, v in s.__dict__.items() if k not in ('name', 'parent')})
+
+def fresh_table_style(style):
+    class Fresh(TableStyle):
+        def getCommands(self): return TableStyle(style.getCommands()).getCommands()
+    return Fresh(style.getCommands())
+
+def measure(renders):
+    totals = {name: 0.0 for name, _ in engine.SECTIONS}
+    totals['doc.build'] = 0.0
+    for _ in range(renders):
+        r = engine.resume_fields(USER, PROFILE)
+        story = []
+        for name, section in engine.SECTIONS:
+            t = time.perf_counter(); story += section(r); totals[name] += time.perf_counter() - t
+        doc = SimpleDocTemplate(io.BytesIO(), pagesize=A4, leftMargin=engine.LM, rightMargin=engine.RM,
+            topMargin=engine.TM, bottomMargin=engine.BM, invariant=1)
+        t = time.perf_counter(); doc.build(story); totals['doc.build'] += time.perf_counter() - t
+    return {k: v / renders for k, v in totals.items()}
+
+def run(renders):
+    shared = measure(renders)
+    saved = engine.STYLES, engine.ROW_STYLE, engine.SIGNATURE_STYLE
+    engine.STYLES = FreshStyles(saved[0])
+    engine.ROW_STYLE, engine.SIGNATURE_STYLE = fresh_table_style(saved[1]), fresh_table_style(saved[2])
+    try: fresh = measure(renders)
+    finally: engine.STYLES, engine.ROW_STYLE, engine.SIGNATURE_STYLE = saved
+    print(f'{renders} renders, mean per resume')
+    print(f"{'section':<16} {'fresh styles':>12} {'shared':>12}")
+    for name in shared:
+        print(f'{name:<16} {fmt_ms(fresh[name])} {fmt_ms(shared[name])}')
+    print(f"{'total':<16} {fmt_ms(sum(fresh.values()))} {fmt_ms(sum(shared.values()))}")
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
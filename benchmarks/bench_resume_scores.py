@@ -0,0 +1,45 @@
+"""TPO student list sorted by resume score: recompute per request vs the stored column.
+
+"recompute" is what sorting by score cost without resume_score: decode and
+score every profile, sort in Python, slice one page. "stored" is
+analytics.student_directory, an indexed ORDER BY on the cached column. The
+one-off backfill (refresh_resume_scores over a fresh seed) is shown
+separately, by clearing every stored score and refreshing.
+
+    python -m benchmarks.bench_resume_scores 1000 10000 100000
+"""
+import sys
+from benchmarks.common import temp_db, seed_students, timeit, fmt_ms
+from modules import analytics
+from modules.db import get_db
+
+PAGE = 50
+
+def recompute(min_score):
+    conn = get_db()
+    rows = conn.execute('''SELECT u.id as user_id, u.name, sp.* FROM student_profiles sp
+        JOIN users u ON u.id=sp.user_id WHERE u.role='student' ''').fetchall()
+    conn.close()
+    scored = [(analytics.score_resume(r)['score'], r['user_id']) for r in rows]
+    scored = sorted((s for s in scored if s[0] >= min_score), key=lambda s: (-s[0], -s[1]))
+    return scored[:PAGE]
+
+def stored(min_score):
+    page = analytics.student_directory(min_score=min_score, limit=PAGE)['students']
+    return [(s['resume_score'], s['user_id']) for s in page]
+
+def run(sizes):
+    print(f"{'students':>9} {'backfill':>12} {'recompute':>12} {'stored':>12} {'speedup':>8}")
+    for n in sizes:
+        path = temp_db()
+        seed_students(path, n)
+        conn = get_db()
+        conn.execute('UPDATE student_profiles SET resume_score=NULL'); conn.commit(); conn.close()
+        t_fill, _ = timeit(analytics.refresh_resume_scores, repeat=1)
+        t_old, old = timeit(lambda: recompute(50), repeat=1)
+        t_new, new = timeit(lambda: stored(50))
+        assert old == new, 'stored scores differ from recomputed ones'
+        print(f'{n:>9} {fmt_ms(t_fill)} {fmt_ms(t_old)} {fmt_ms(t_new)} {t_old / t_new:>7.0f}x')
+
+if __name__ == '__main__':
+    run([int(a) for a in sys.argv[1:]] or [1000, 10000, 100000])
@@ -0,0 +1,41 @@
+"""Drive shortlist: heapq top-K vs sorting the whole eligible cohort.
+
+Feature arrays are built once per drive (timed separately); each request then
+scores the cohort and selects one page.
+
+    python -m benchmarks.bench_shortlist 10000 100000
+"""
+import sys
+from benchmarks.common import temp_db, seed_students, seed_drives, timeit, fmt_ms
+from modules import placement_engine
+from modules.db import get_db
+
+def full_sort(drive_id, limit, offset):
+    f = placement_engine._shortlist_features(drive_id)
+    w = placement_engine.SHORTLIST_WEIGHTS
+    scores = (w['cgpa'] * f['cgpa'] + w['skills'] * f['skills'] + w['resume'] * f['resume']
+              + w['status'] * f['status']).astype(float).tolist()
+    return sorted(range(len(scores)), key=scores.__getitem__, reverse=True)[offset:offset + limit]
+
+def run(sizes):
+    print(f"{'students':>9} {'eligible':>9} {'build':>12} {'top20':>12} {'page 50':>12} {'full sort':>12}")
+    for n in sizes:
+        path = temp_db()
+        seed_students(path, n)
+        seed_drives(path, 1)
+        conn = get_db()
+        drive_id = conn.execute('SELECT MAX(id) FROM drives').fetchone()[0]
+        conn.execute("UPDATE drives SET min_cgpa=0, allowed_branches='[]', max_backlogs=10 WHERE id=?", (drive_id,))
+        conn.commit(); conn.close()
+        placement_engine.invalidate_shortlists()
+        t_build, _ = timeit(lambda: (placement_engine.invalidate_shortlists(drive_id),
+                                     placement_engine._shortlist_features(drive_id)), repeat=1)
+        t_top, page = timeit(lambda: placement_engine.shortlist_candidates(drive_id, 20))
+        t_deep, _ = timeit(lambda: placement_engine.shortlist_candidates(drive_id, 20, offset=49 * 20))
+        t_sort, ids = timeit(lambda: full_sort(drive_id, 20, 0))
+        assert [c['user_id'] for c in page['candidates']] == \
+            [placement_engine._shortlist_features(drive_id)['students'][i]['user_id'] for i in ids]
+        print(f"{n:>9} {page['total']:>9} {fmt_ms(t_build)} {fmt_ms(t_top)} {fmt_ms(t_deep)} {fmt_ms(t_sort)}")
+
+if __name__ == '__main__':
+    run([int(a) for a in sys.argv[1:]] or [10000, 100000])
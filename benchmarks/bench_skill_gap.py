@@ -0,0 +1,38 @@
+"""Cohort skill gap: per-student get_skill_gap calls vs one vectorized pass.
+
+The loop is what a cohort report cost before: one query and one JSON decode
+per student per role. The matrix pass loads every profile once and scores all
+roles together; the results are checked against each other.
+
+    python -m benchmarks.bench_skill_gap 1000 15000
+"""
+import sys
+from benchmarks.common import temp_db, seed_students, timeit, fmt_ms
+from modules import analytics
+from modules.db import get_db
+
+def per_student(ids):
+    return {sid: {role: analytics.get_skill_gap(sid, role)['match_pct'] for role in analytics.ROLES} for sid in ids}
+
+def vectorized():
+    ids, matrix = analytics.cohort_skill_matrix()
+    pct = analytics.match_percentages(matrix)
+    return {int(sid): dict(zip(analytics.ROLES, row)) for sid, row in zip(ids.tolist(), pct.tolist())}
+
+def run(sizes):
+    print(f"{'students':>9} {'per-student':>14} {'matrix':>12} {'summary':>12} {'speedup':>8}")
+    for n in sizes:
+        path = temp_db()
+        seed_students(path, n)
+        conn = get_db()
+        ids = [r['user_id'] for r in conn.execute(
+            "SELECT sp.user_id FROM student_profiles sp JOIN users u ON u.id=sp.user_id WHERE u.role='student'")]
+        conn.close()
+        t_loop, loop = timeit(lambda: per_student(ids), repeat=1)
+        t_vec, vec = timeit(vectorized)
+        t_sum, _ = timeit(analytics.cohort_skill_gap)
+        assert loop == vec, 'vectorized match % differs from get_skill_gap'
+        print(f'{n:>9} {fmt_ms(t_loop)}  {fmt_ms(t_vec)} {fmt_ms(t_sum)} {t_loop / t_vec:>7.0f}x')
+
+if __name__ == '__main__':
+    run([int(a) for a in sys.argv[1:]] or [1000, 15000])
@@ -0,0 +1,37 @@
+"""Skill search: json_each over every profile vs the student_skills index.
+
+The query is "students with Docker and Kubernetes".
+
+    python -m benchmarks.bench_skill_index 1000 10000 100000
+"""
+import sys
+from benchmarks.common import temp_db, seed_students, timeit, fmt_ms
+from modules import skills
+from modules.db import get_db
+
+WANTED = ['Docker', 'Kubernetes']
+
+def legacy(wanted):
+    conn = get_db()
+    rows = conn.execute(f'''SELECT u.id as user_id FROM student_profiles sp JOIN users u ON u.id=sp.user_id
+        WHERE u.role='student' AND {' AND '.join(
+            "EXISTS (SELECT 1 FROM json_each(sp.skills) j WHERE lower(j.value)=lower(?))" for _ in wanted)}''',
+        wanted).fetchall()
+    conn.close()
+    return sorted(r['user_id'] for r in rows)
+
+def indexed(wanted):
+    return sorted(s['user_id'] for s in skills.students_with_skills(wanted))
+
+def run(sizes):
+    print(f"{'students':>9} {'matches':>8} {'json_each':>12} {'index':>12} {'speedup':>8}")
+    for n in sizes:
+        path = temp_db()
+        seed_students(path, n)
+        t_old, old = timeit(lambda: legacy(WANTED))
+        t_new, new = timeit(lambda: indexed(WANTED))
+        assert old == new, 'index and json_each disagree'
+        print(f'{n:>9} {len(new):>8} {fmt_ms(t_old)} {fmt_ms(t_new)} {t_old / t_new:>7.1f}x')
+
+if __name__ == '__main__':
+    run([int(a) for a in sys.argv[1:]] or [1000, 10000, 100000])
@@ -0,0 +1,155 @@
+"""Query-plan regression check for the SQL the routes issue, directly or through modules/.
+
+Every SELECT (or WITH) passed to .execute(), .executemany() or _rows() in
+app.py and in the modules the routes call is run through EXPLAIN QUERY PLAN
+against a freshly migrated database. f-strings are resolved when each
+interpolation is a module-level string constant (FEED_SQL,
+ELIGIBLE_STUDENTS) or a `",".join("?" * n)` placeholder list, directly or
+through a local variable; queries assembled from other runtime values are
+counted as dynamic and skipped. migrations.py is left out (its backfills read
+whole tables once, on purpose), and so is fragments.py, whose entry SQL
+runs against its own cache file.
+
+The check fails (exit 1) if a plan does a full `SCAN` of a table, unless
+that query is listed in ALLOWED_SCANS with the reason the full read is
+intended. Queries in PINNED_PLANS must also keep a specific step: a plan
+can avoid every SCAN and still walk the wrong table first.
+
+    python -m benchmarks.check_query_plans [source.py ...]
+"""
+import ast, glob, importlib, os, re, sys
+from benchmarks.common import temp_db
+from modules import placement_engine
+from modules.db import get_db
+
+SKIP_MODULES = {'migrations.py', 'fragments.py'}
+
+# (table, substring identifying the query) -> why a full scan is expected
+ALLOWED_SCANS = {
+    ('arp', 'FROM alumni_referral_posts arp'):
+        'the connect board lists every referral post, newest first, via idx_referral_posts_created',
+    ('student_profiles', 'SELECT DISTINCT branch FROM student_profiles'):
+        'branch filter options; walks idx_sp_branch_cgpa, which is already in branch order',
+    ('jobs', 'SELECT * FROM jobs ORDER BY id DESC LIMIT ?'):
+        'recent jobs: reads the rowid b-tree backwards and stops at the limit',
+    ('stats_counters', 'FROM stats_counters'):
+        'one row per metric and key (a few per drive); the whole table is a handful of pages',
+    # compute_placement_stats is the slow path behind `flask rebuild-stats` and the
+    # snapshot verification; routes read stats_counters instead.
+    ('drives', 'SELECT COUNT(*) as c FROM drives'): 'rebuild-stats: count over the smallest covering index',
+    ('applications', 'SELECT COUNT(*) as c FROM applications'): 'rebuild-stats: count over the smallest covering index',
+    ('sp', 'SELECT sp.branch, COUNT(*) as count FROM student_profiles sp GROUP BY sp.branch'):
+        'rebuild-stats: per-branch counts over idx_sp_branch_cgpa',
+    ('d', 'FROM drives d LEFT JOIN applications a ON d.id=a.drive_id GROUP BY d.id'):
+        'rebuild-stats: applicants per drive',
+    ('applications', 'SELECT status, COUNT(*) as count FROM applications GROUP BY status'):
+        'rebuild-stats: status distribution over idx_applications_status_student',
+    ('student_profiles', 'SELECT branch, backlogs, cgpa FROM student_profiles ORDER BY cgpa'):
+        'builds the in-memory eligibility index from every profile, in cgpa order via idx_sp_cgpa',
+    ('student_profiles', 'SELECT user_id, skills FROM student_profiles'):
+        'rebuild_skill_index re-derives student_skills from every profile',
+    ('skills', 'SELECT id, name FROM skills'): 'rebuild_skill_index maps every skill name to its id',
+    ('notifications', 'SELECT message FROM notifications WHERE message_id IS NULL GROUP BY message'):
+        'retention job: finds repeated inline bodies across the whole table, in the background',
+}
+
+# (name, SQL, plan step that must appear)
+PINNED_PLANS = [
+    ('placement_engine.ELIGIBLE_STUDENTS_SQL', placement_engine.ELIGIBLE_STUDENTS_SQL,
+     'SEARCH sp USING INDEX idx_sp_cgpa'),
+    ('placement_engine.SHORTLIST_SQL', placement_engine.SHORTLIST_SQL,
+     'SEARCH sp USING INDEX idx_sp_cgpa'),
+]
+
+SCAN = re.compile(r'^SCAN (\w+)')
+
+class Dynamic(Exception):
+    """The SQL depends on a value only known at run time."""
+
+def default_sources():
+    return ['app.py'] + [p for p in sorted(glob.glob('modules/*.py')) if os.path.basename(p) not in SKIP_MODULES]
+
+def _module_globals(source_path):
+    name = os.path.splitext(os.path.normpath(source_path))[0].replace(os.sep, '.')
+    try: return vars(importlib.import_module(name))
+    except ImportError: return {}
+
+def _is_placeholders(node):
+    # ",".join("?" * len(x))
+    return (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == 'join'
+            and isinstance(node.func.value, ast.Constant) and node.func.value.value == ','
+            and len(node.args) == 1 and isinstance(node.args[0], ast.BinOp)
+            and isinstance(node.args[0].left, ast.Constant) and node.args[0].left.value == '?')
+
+def _resolve(node, local, module):
+    if isinstance(node, ast.Constant) and isinstance(node.value, str): return node.value
+    if _is_placeholders(node): return '?'
+    if isinstance(node, ast.Name):
+        if node.id in local: return _resolve(local[node.id], {}, module)
+        if isinstance(module.get(node.id), str): return module[node.id]
+    if isinstance(node, ast.JoinedStr):
+        return ''.join(_resolve(v.value if isinstance(v, ast.FormattedValue) else v, local, module) for v in node.values)
+    raise Dynamic(ast.unparse(node))
+
+def _assignments(fn):
+    # name -> value for names assigned exactly once in the function
+    seen = {}
+    for node in ast.walk(fn):
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            seen.setdefault(node.targets[0].id, []).append(node.value)
+    return {k: v[0] for k, v in seen.items() if len(v) == 1}
+
+def _is_query_call(node):
+    return (isinstance(node, ast.Call) and node.args
+            and (isinstance(node.func, ast.Attribute) and node.func.attr in ('execute', 'executemany')
+                 or isinstance(node.func, ast.Name) and node.func.id == '_rows'))
+
+def source_queries(source_path, dynamic=None):
+    """(lineno, sql) for every resolvable SELECT in the file; unresolvable ones go to `dynamic`."""
+    tree = ast.parse(open(source_path, encoding='utf-8').read())
+    module = _module_globals(source_path)
+    scopes = [(tree, {})] + [(fn, _assignments(fn)) for fn in ast.walk(tree)
+                             if isinstance(fn, (ast.FunctionDef, ast.AsyncFunctionDef))]
+    seen = set()
+    for scope, local in reversed(scopes):          # innermost function first
+        for node in ast.walk(scope):
+            if not _is_query_call(node) or id(node) in seen: continue
+            seen.add(id(node))
+            try: sql = ' '.join(_resolve(node.args[0], local, module).split())
+            except Dynamic:
+                if dynamic is not None: dynamic.append((source_path, node.lineno))
+                continue
+            if sql.upper().startswith(('SELECT', 'WITH')):
+                yield node.lineno, sql
+
+def full_scans(conn, sql):
+    params = [None] * sql.count('?')
+    for row in conn.execute('EXPLAIN QUERY PLAN ' + sql, params):
+        detail = row[3]
+        m = SCAN.match(detail)
+        if m and 'VIRTUAL TABLE' not in detail and 'CONSTANT ROW' not in detail:
+            yield m.group(1), detail
+
+def check(*sources):
+    temp_db()
+    conn = get_db()
+    failures, checked, dynamic = 0, 0, []
+    for source_path in sources or default_sources():
+        for lineno, sql in source_queries(source_path, dynamic):
+            checked += 1
+            for table, detail in full_scans(conn, sql):
+                if any(t == table and key in sql for t, key in ALLOWED_SCANS): continue
+                failures += 1
+                print(f'{source_path}:{lineno}: full scan ({detail})\n    {sql}')
+    for name, sql, step in PINNED_PLANS:
+        plan = [row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql, [None] * sql.count('?'))]
+        if not any(step in detail for detail in plan):
+            failures += 1
+            print(f'{name}: plan lost {step!r}\n    ' + '\n    '.join(plan))
+    conn.close()
+    print(f'{checked} queries checked, {len(dynamic)} dynamic skipped')
+    print('query plans OK' if not failures else f'{failures} full scan(s) found')
+    return failures
+
+if __name__ == '__main__':
+    sys.exit(1 if check(*sys.argv[1:]) else 0)
@@ -0,0 +1,74 @@
+import os, random, json, tempfile, time, statistics, sqlite3
+from modules.skills import rebuild_skill_index
+from modules.analytics import refresh_resume_scores
+
+BRANCHES = ['CS', 'MCA', 'IT', 'ECE', 'EEE', 'Mech', 'Civil']
+BRANCH_WEIGHTS = [30, 10, 18, 16, 10, 10, 6]     # CS/IT-heavy intake, as on a typical campus
+SKILLS   = ['Python', 'SQL', 'Java', 'DSA', 'Git', 'HTML', 'CSS', 'React', 'Node.js', 'Docker',
+            'Kubernetes', 'AWS', 'Linux', 'Pandas', 'NumPy', 'Machine Learning', 'Excel', 'Tableau']
+SKILL_WEIGHTS  = [9, 8, 6, 7, 7, 6, 5, 4, 3, 3, 1, 2, 4, 3, 3, 3, 4, 1]
+
+def weighted_sample(rnd, items, weights, k):
+    """k distinct items, each drawn with probability proportional to its weight."""
+    keyed = sorted(zip(items, weights), key=lambda iw: -rnd.random() ** (1 / iw[1]))
+    return [item for item, _ in keyed[:k]]
+
+def use_db(path):
+    """Point the shared database layer at the file `path`."""
+    from modules import db
+    db.DB = path
+
+def temp_db():
+    """Create an empty, schema-initialised database in a temp dir and select it."""
+    import app
+    path = os.path.join(tempfile.mkdtemp(prefix='ppbench_'), 'bench.db')
+    use_db(path)
+    app.init_db()
+    return path
+
+def seed_students(path, n, seed=42):
+    rnd = random.Random(seed)
+    conn = sqlite3.connect(path)
+    start = conn.execute('SELECT COALESCE(MAX(id), 0) FROM users').fetchone()[0] + 1
+    users, profiles = [], []
+    for uid in range(start, start + n):
+        users.append((uid, f'Student {uid}', f's{uid}@bench.edu', 'x', 'student'))
+        profiles.append((uid, round(min(10, max(4, rnd.gauss(7.4, 1.0))), 2),
+            rnd.choices([0, 1, 2, 3], weights=[70, 15, 10, 5])[0],
+            rnd.choices(BRANCHES, BRANCH_WEIGHTS)[0], json.dumps(weighted_sample(rnd, SKILLS, SKILL_WEIGHTS, rnd.randint(2, 8))),
+            f'+91 9{uid:09d}' if rnd.random() < 0.7 else '',
+            f'linkedin.com/in/s{uid}' if rnd.random() < 0.5 else '',
+            json.dumps([{'name': f'Project {i}', 'desc': 'A web app.', 'url': ''} for i in range(rnd.randint(0, 4))]),
+            json.dumps([{'title': f'Cert {i}', 'issuer': 'Coursera', 'year': '2024'} for i in range(rnd.randint(0, 3))])))
+    conn.executemany('INSERT INTO users(id,name,email,password,role) VALUES(?,?,?,?,?)', users)
+    conn.executemany('''INSERT INTO student_profiles(user_id,cgpa,backlogs,branch,skills,phone,linkedin,projects,certificates)
+        VALUES(?,?,?,?,?,?,?,?,?)''', profiles)
+    rebuild_skill_index(conn)
+    refresh_resume_scores(conn)
+    conn.commit(); conn.close()
+
+ROLES = ['Software Engineer', 'Data Analyst', 'Full Stack Developer', 'DevOps Engineer', 'ML Engineer', 'Graduate Trainee']
+
+def seed_drives(path, n, seed=7):
+    rnd = random.Random(seed)
+    conn = sqlite3.connect(path)
+    rows = []
+    for i in range(n):
+        row = (f'Company {i}', rnd.choice(ROLES), round(rnd.uniform(6, 8.5), 1), rnd.choice([0, 0, 1, 2]),
+               json.dumps(rnd.sample(BRANCHES, rnd.randint(0, 4))), 'active', 1)
+        extra = ('Looking for ' + ', '.join(rnd.sample(SKILLS, rnd.randint(0, 4))),
+                 round(rnd.uniform(3, 30), 1), f'2026-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}')
+        rows.append(row + extra)
+    conn.executemany('''INSERT INTO drives(company,role,min_cgpa,max_backlogs,allowed_branches,status,created_by,
+        description,package_lpa,deadline) VALUES(?,?,?,?,?,?,?,?,?,?)''', rows)
+    conn.commit(); conn.close()
+
+def timeit(fn, repeat=5):
+    """Run fn `repeat` times; return (median seconds, last result)."""
+    times, result = [], None
+    for _ in range(repeat):
+        t = time.perf_counter(); result = fn(); times.append(time.perf_counter() - t)
+    return statistics.median(times), result
+
+def fmt_ms(seconds):
+    return f'{seconds * 1000:9.2f} ms'
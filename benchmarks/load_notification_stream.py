@@ -0,0 +1,133 @@
+"""Load test for /api/notifications/stream: many idle SSE clients, one announcement.
+
+Starts the app in a child process (werkzeug's threaded server, the same
+thread-per-stream model as the gthread workers in gunicorn.conf.py, or a
+gevent WSGIServer for comparison when gevent is installed), opens `clients` streams as
+distinct students with asyncio, then has the TPO post "notify applicants"
+for a drive every one of them applied to, which is what a results
+announcement does. Reports connect time, the server's RSS and thread count
+while idle, idle CPU, and the delivery latency from the POST until each
+client has its event.
+
+    python -m benchmarks.load_notification_stream 1000 [threaded|gevent]
+"""
+import asyncio, multiprocessing, os, socket, sys, time
+from benchmarks.common import temp_db, seed_students, seed_drives, use_db
+from modules.db import get_db
+
+IDLE_SECONDS = 5
+CONNECT_BATCH = 200
+
+def serve(path, port, mode):
+    if mode == 'gevent':
+        from gevent import monkey; monkey.patch_all()
+    use_db(path)
+    import app
+    if mode == 'gevent':
+        from gevent.pywsgi import WSGIServer
+        WSGIServer(('127.0.0.1', port), app.app, log=None).serve_forever()
+    else:
+        import logging
+        from werkzeug.serving import make_server
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)
+        server = make_server('127.0.0.1', port, app.app, threaded=True)
+        server.socket.listen(4096)
+        server.serve_forever()
+
+def proc_stats(pid):
+    with open(f'/proc/{pid}/status') as f:
+        status = dict(line.split(':', 1) for line in f)
+    with open(f'/proc/{pid}/stat') as f:
+        fields = f.read().rsplit(')', 1)[1].split()
+    cpu = (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+    return int(status['VmRSS'].split()[0]) / 1024, int(status['Threads']), cpu
+
+def session_cookie(user_id, role, name):
+    import app
+    return app.app.session_interface.get_signing_serializer(app.app).dumps(
+        {'user_id': user_id, 'role': role, 'name': name})
+
+def seed(clients):
+    path = temp_db()
+    seed_students(path, clients)
+    seed_drives(path, 1)
+    conn = get_db()
+    students = [r[0] for r in conn.execute("SELECT id FROM users WHERE role='student' ORDER BY id DESC LIMIT ?", (clients,))]
+    tpo = conn.execute("SELECT id FROM users WHERE role='tpo'").fetchone()[0]
+    drive = conn.execute('SELECT MAX(id) FROM drives').fetchone()[0]
+    conn.executemany('INSERT INTO applications(student_id, drive_id) VALUES(?,?)', [(s, drive) for s in students])
+    conn.commit(); conn.close()
+    return path, students, tpo, drive
+
+async def open_stream(port, cookie):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(f'GET /api/notifications/stream HTTP/1.1\r\nHost: localhost\r\nCookie: session={cookie}\r\n'
+                 f'Accept: text/event-stream\r\n\r\n'.encode())
+    await writer.drain()
+    while b'retry:' not in await reader.readline(): pass
+    return reader, writer
+
+async def wait_event(reader):
+    while True:
+        line = await reader.readline()
+        if not line: return None
+        if line.startswith(b'event: notification'): return time.perf_counter()
+
+async def post(port, path, cookie):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(f'POST {path} HTTP/1.1\r\nHost: localhost\r\nCookie: session={cookie}\r\n'
+                 f'Content-Type: application/x-www-form-urlencoded\r\nContent-Length: 24\r\nConnection: close\r\n\r\n'
+                 f'message=Results+are+out!'.encode())
+    await writer.drain()
+    status = (await reader.readline()).decode().strip()
+    writer.close()
+    return status
+
+def pct(values, p):
+    return sorted(values)[min(len(values) - 1, int(len(values) * p))]
+
+async def drive_load(port, pid, students, tpo, drive):
+    cookies = [session_cookie(s, 'student', f'Student {s}') for s in students]
+    t = time.perf_counter()
+    streams = []
+    for i in range(0, len(cookies), CONNECT_BATCH):
+        streams += await asyncio.gather(*(open_stream(port, c) for c in cookies[i:i + CONNECT_BATCH]))
+    connect = time.perf_counter() - t
+    rss, threads, cpu0 = proc_stats(pid)
+    await asyncio.sleep(IDLE_SECONDS)
+    idle_cpu = (proc_stats(pid)[2] - cpu0) / IDLE_SECONDS
+    waiters = [asyncio.create_task(wait_event(r)) for r, _ in streams]
+    t0 = time.perf_counter()
+    status = await post(port, f'/tpo/notify-applicants/{drive}', session_cookie(tpo, 'tpo', 'TPO'))
+    arrivals = await asyncio.wait_for(asyncio.gather(*waiters), timeout=120)
+    latencies = [a - t0 for a in arrivals if a is not None]
+    for _, w in streams: w.close()
+    return connect, rss, threads, idle_cpu, status, latencies
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0)); return s.getsockname()[1]
+
+def run(clients, mode):
+    path, students, tpo, drive = seed(clients)
+    port = free_port()
+    server = multiprocessing.get_context('spawn').Process(target=serve, args=(path, port, mode), daemon=True)
+    server.start()
+    for _ in range(100):
+        try: socket.create_connection(('127.0.0.1', port)).close(); break
+        except OSError: time.sleep(0.1)
+    try:
+        connect, rss, threads, idle_cpu, status, lat = asyncio.run(drive_load(port, server.pid, students, tpo, drive))
+    finally:
+        server.terminate()
+    print(f'{mode} server, {clients} streams')
+    print(f'  connect all      {connect * 1000:9.1f} ms')
+    print(f'  server idle      {rss:9.1f} MiB RSS, {threads} threads, {idle_cpu * 100:.1f}% CPU')
+    print(f'  announce         {status}')
+    print(f'  delivered        {len(lat)}/{clients}')
+    if lat:
+        print('  latency          ' + '  '.join(f'{name} {pct(lat, p) * 1000:.0f} ms' for name, p in
+                                            (('p50', .5), ('p95', .95), ('p99', .99), ('max', 1.0))))
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1000, sys.argv[2] if len(sys.argv) > 2 else 'threaded')
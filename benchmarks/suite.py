@@ -0,0 +1,154 @@
+"""End-to-end benchmark suite over a synthetic campus, checked against a stored baseline.
+
+Builds a database with synthetic.generate() at the chosen scale, then times
+two kinds of scenario:
+
+- module functions called directly: get_eligible_students,
+  get_placement_stats, generate_resume_pdf (uncached renders and cache
+  hits) and get_skill_gap;
+- the main routes for TPO, student and alumni sessions, through Flask's
+  test client. Every response must be a 200.
+
+For each scenario it reports p50/p95/p99 latency and the peak Python
+allocation of one extra traced run (tracemalloc), plus the process's peak
+RSS. Results are compared with benchmarks/baseline.json. A scenario
+regresses when its p50 exceeds the baseline's by more than the tolerance
+and by at least MIN_DELTA_MS (with 30 samples p95 is one or two outliers,
+too noisy to gate on); the exit status is 1 if any did. Baselines are
+machine-specific: record one with --save-baseline on the machine that will
+run the comparison.
+
+    python -m benchmarks.suite [--scale small|medium|large] [--save-baseline] [--tolerance 0.5]
+"""
+import argparse, itertools, json, os, resource, sys, tempfile, time, tracemalloc
+from benchmarks.common import temp_db
+from benchmarks.synthetic import generate
+
+SCALES = {   # students, drives, alumni
+    'small':  (1000, 50, 100),
+    'medium': (10000, 200, 500),
+    'large':  (50000, 500, 2000),
+}
+REPEAT        = 30
+RENDER_REPEAT = 10        # uncached PDF renders are ~100x slower than everything else
+MIN_DELTA_MS  = 1.0
+BASELINE      = os.path.join(os.path.dirname(__file__), 'baseline.json')
+ROLES         = ['Software Engineer', 'Data Analyst', 'Full Stack Developer', 'ML Engineer']
+
+def _pct(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+def measure(fn, repeat):
+    fn()                                       # warm caches and lazily built indexes
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter(); fn(); times.append(time.perf_counter() - t)
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    ms = lambda s: round(s * 1000, 3)
+    return {'p50_ms': ms(_pct(times, .5)), 'p95_ms': ms(_pct(times, .95)), 'p99_ms': ms(_pct(times, .99)),
+            'peak_kib': round(peak / 1024)}
+
+def _client(app, user_id, role):
+    client = app.test_client()
+    with client.session_transaction() as s: s.update(user_id=user_id, role=role, name=f'{role} {user_id}')
+    return client
+
+def _get(client, url):
+    def fn():
+        r = client.get(url)
+        assert r.status_code == 200, f'{url} returned {r.status_code}'
+    return fn
+
+def scenarios(app):
+    from modules import placement_engine, analytics, resume_engine
+    from modules.db import get_db
+    conn = get_db()
+    tpo = conn.execute("SELECT id FROM users WHERE role='tpo'").fetchone()[0]
+    students = [r[0] for r in conn.execute("SELECT user_id FROM student_profiles ORDER BY user_id")]
+    # the busiest students and alumni are the worst case for their dashboards
+    student = conn.execute('SELECT student_id FROM applications GROUP BY student_id ORDER BY COUNT(*) DESC, student_id LIMIT 1').fetchone()[0]
+    alumnus = conn.execute('''SELECT alumni_id FROM referral_requests GROUP BY alumni_id
+        ORDER BY COUNT(*) DESC, alumni_id LIMIT 1''').fetchone()[0]
+    drives = [r[0] for r in conn.execute("SELECT id FROM drives WHERE status='active' ORDER BY id")]
+    drive = conn.execute('SELECT drive_id FROM applications GROUP BY drive_id ORDER BY COUNT(*) DESC, drive_id LIMIT 1').fetchone()[0]
+    inputs = {r['id']: dict(r) for r in conn.execute(f'SELECT * FROM users WHERE id IN ({",".join("?" * 200)})', students[:200])}
+    profiles = {r['user_id']: dict(r) for r in conn.execute(
+        f'SELECT * FROM student_profiles WHERE user_id IN ({",".join("?" * 200)})', students[:200])}
+    conn.close()
+
+    drive_cycle = itertools.cycle(drives)
+    render_cycle = itertools.cycle(students[1:200])
+    gap_cycle = itertools.cycle(itertools.product(students[:200], ROLES))
+    def render_uncached():
+        uid = next(render_cycle)
+        profile = dict(profiles[uid], phone=f'+91 {time.perf_counter_ns()}')   # new inputs: always a render
+        resume_engine.generate_resume_pdf(inputs[uid], profile)
+    cached = (inputs[students[0]], profiles[students[0]])
+
+    t, s, a = _client(app, tpo, 'tpo'), _client(app, student, 'student'), _client(app, alumnus, 'alumni')
+    return [
+        ('fn get_eligible_students', lambda: placement_engine.get_eligible_students(next(drive_cycle)), REPEAT),
+        ('fn get_placement_stats', analytics.get_placement_stats, REPEAT),
+        ('fn generate_resume_pdf (render)', render_uncached, RENDER_REPEAT),
+        ('fn generate_resume_pdf (cached)', lambda: resume_engine.generate_resume_pdf(*cached), REPEAT),
+        ('fn get_skill_gap', lambda: analytics.get_skill_gap(*next(gap_cycle)), REPEAT),
+        ('GET /tpo', _get(t, '/tpo'), REPEAT),
+        ('GET /tpo/drive/<busiest>', _get(t, f'/tpo/drive/{drive}'), REPEAT),
+        ('GET /tpo/stats', _get(t, '/tpo/stats'), REPEAT),
+        ('GET /tpo/students', _get(t, '/tpo/students'), REPEAT),
+        ('GET /api/drives/<id>/shortlist', _get(t, f'/api/drives/{drive}/shortlist'), REPEAT),
+        ('GET /student', _get(s, '/student'), REPEAT),
+        ('GET /api/notifications', _get(s, '/api/notifications'), REPEAT),
+        ('GET /connect', _get(s, '/connect'), REPEAT),
+        ('GET /alumni', _get(a, '/alumni'), REPEAT),
+    ]
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    print(f"{'scenario':<34} {'p50':>9} {'p95':>9} {'p99':>9} {'peak KiB':>9} {'base p50':>9} {'base p95':>9} {'ratio':>6}")
+    for name, r in results.items():
+        base = baseline.get(name)
+        line = f"{name:<34} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f} {r['peak_kib']:>9}"
+        if base:
+            ratio = r['p50_ms'] / base['p50_ms'] if base['p50_ms'] else 1.0
+            slow = ratio > 1 + tolerance and r['p50_ms'] - base['p50_ms'] >= MIN_DELTA_MS
+            line += f" {base['p50_ms']:>9.2f} {base['p95_ms']:>9.2f} {ratio:>5.2f}x" + ('  REGRESSION' if slow else '')
+            if slow: regressions.append(name)
+        else:
+            line += f" {'-':>9} {'-':>9} {'-':>6}"
+        print(line)
+    return regressions
+
+def run(scale='small', save=False, tolerance=0.5, baseline_path=BASELINE):
+    students, drives, alumni = SCALES[scale]
+    path = temp_db()
+    t = time.perf_counter()
+    counts = generate(path, students, drives, alumni)
+    print(f"{scale}: {', '.join(f'{n} {k}' for k, n in counts.items())} ({time.perf_counter() - t:.1f} s to generate)\n")
+    import app
+    from modules import resume_engine
+    resume_engine.CACHE_DIR = os.path.join(tempfile.mkdtemp(prefix='ppbench_resumes_'), 'cache')
+    results = {name: measure(fn, repeat) for name, fn, repeat in scenarios(app.app)}
+    stored = json.load(open(baseline_path)) if os.path.exists(baseline_path) else {}
+    regressions = compare(results, stored.get(scale, {}), tolerance)
+    print(f"\npeak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MiB")
+    if save:
+        stored[scale] = results
+        with open(baseline_path, 'w') as f: json.dump(stored, f, indent=1, sort_keys=True)
+        print(f'baseline for {scale} written to {baseline_path}')
+    elif regressions:
+        print(f"{len(regressions)} regression(s) beyond {tolerance:.0%} of the baseline p50")
+    return [] if save else regressions
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description='PlacementPro end-to-end benchmark suite')
+    ap.add_argument('--scale', choices=SCALES, default='small')
+    ap.add_argument('--save-baseline', action='store_true', help='store these results as the baseline for the scale')
+    ap.add_argument('--tolerance', type=float, default=0.5, help='allowed p50 slowdown over the baseline (0.5 = 50%%)')
+    ap.add_argument('--baseline', default=BASELINE)
+    args = ap.parse_args()
+    sys.exit(1 if run(args.scale, args.save_baseline, args.tolerance, args.baseline) else 0)
@@ -0,0 +1,138 @@
+"""Deterministic synthetic campus: students, drives, alumni and everything between them.
+
+generate() fills a freshly initialised database with `students` students
+(common.seed_students: normal cgpa around 7.4, CS/IT-heavy branches,
+popularity-weighted skills) and `drives` drives (common.seed_drives), then
+adds the rest:
+
+- `alumni` alumni with profiles, job posts, referral posts and mentorship
+  slots, some of them booked;
+- applications: each student applies to a few drives they are eligible for,
+  with statuses spread over the hiring funnel;
+- notifications: broadcast announcements and personal updates over the last
+  180 days, mostly read;
+- mentorship and referral requests from a fraction of the students.
+
+The same arguments always produce the same rows.
+
+    python -m benchmarks.synthetic 10000 200 500     # writes a database and prints row counts
+"""
+import json, random, sqlite3, sys
+from benchmarks.common import temp_db, seed_students, seed_drives, BRANCHES, BRANCH_WEIGHTS
+
+COMPANIES = ['Google', 'Microsoft', 'Amazon', 'Infosys', 'TCS', 'Wipro', 'Accenture', 'Deloitte',
+             'Flipkart', 'Zoho', 'Freshworks', 'Adobe', 'Oracle', 'Capgemini', 'Cognizant', 'PayPal']
+ALUMNI_ROLES = ['Software Engineer', 'Senior Software Engineer', 'Data Scientist', 'Product Manager',
+                'DevOps Engineer', 'Data Analyst', 'Engineering Manager']
+TOPICS = ['Mock Interview (DSA)', 'Resume Review', 'System Design Basics', 'Career Guidance', 'Aptitude Prep']
+FUNNEL = {'applied': 50, 'aptitude': 15, 'technical': 10, 'hr': 6, 'interview_scheduled': 5,
+          'selected': 6, 'rejected': 8}
+APPLICATIONS_PER_STUDENT = (0, 8)
+NOTIFICATIONS_PER_STUDENT = 20
+BROADCAST_SHARE = 0.7            # of a student's notifications, the share that are drive announcements
+READ_SHARE = 0.75
+MENTORSHIP_SHARE, REFERRAL_SHARE = 0.10, 0.15
+
+def _ago(rnd, days):
+    return f'-{rnd.randint(0, days * 24 * 60)} minutes'
+
+def _alumni(conn, rnd, n, students):
+    start = conn.execute('SELECT MAX(id) FROM users').fetchone()[0] + 1
+    ids = list(range(start, start + n))
+    conn.executemany('INSERT INTO users(id,name,email,password,role) VALUES(?,?,?,?,?)',
+                     [(i, f'Alumnus {i}', f'a{i}@alumni.edu', 'x', 'alumni') for i in ids])
+    companies = {i: rnd.choice(COMPANIES) for i in ids}
+    conn.executemany('''INSERT INTO alumni_profiles(user_id,company,role,batch_year,branch,linkedin,bio,open_to_mentor)
+        VALUES(?,?,?,?,?,?,?,?)''', [(i, companies[i], rnd.choice(ALUMNI_ROLES), str(rnd.randint(2012, 2024)),
+        rnd.choices(BRANCHES, BRANCH_WEIGHTS)[0], f'linkedin.com/in/a{i}', 'Happy to help juniors with interviews.',
+        int(rnd.random() < 0.7)) for i in ids])
+    jobs, posts, slots = [], [], []
+    for i, company in companies.items():
+        for _ in range(rnd.randint(0, 2)):
+            jobs.append((i, company, rnd.choice(ALUMNI_ROLES), 'Bangalore', 'Referral opening for freshers.', '', _ago(rnd, 120)))
+        for _ in range(rnd.randint(0, 3)):
+            posts.append((i, company, rnd.choice(ALUMNI_ROLES), 'Strong DSA and one solid project.',
+                          f'2026-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}', round(rnd.uniform(4, 40), 1), _ago(rnd, 120)))
+        for _ in range(rnd.randint(0, 4)):
+            booked = rnd.choice(students) if rnd.random() < 0.3 else None
+            slots.append((i, rnd.choice(TOPICS), f'2026-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}',
+                          f'{rnd.randint(9, 18)}:00', 'https://meet.example.com/x', 'booked' if booked else 'available', booked))
+    conn.executemany("""INSERT INTO alumni_jobs(alumni_id,company,role,location,description,apply_link,posted_at)
+        VALUES(?,?,?,?,?,?,datetime('now', ?))""", jobs)
+    conn.executemany("""INSERT INTO alumni_referral_posts(alumni_id,company,role,description,deadline,package_lpa,created_at)
+        VALUES(?,?,?,?,?,?,datetime('now', ?))""", posts)
+    conn.executemany('''INSERT INTO alumni_mentorship_slots(alumni_id,topic,slot_date,slot_time,meet_link,status,booked_by)
+        VALUES(?,?,?,?,?,?,?)''', slots)
+    return ids
+
+def _applications(conn, rnd, students):
+    drives = [(d[0], d[1], d[2], set(json.loads(d[3] or '[]'))) for d in
+              conn.execute("SELECT id, min_cgpa, max_backlogs, allowed_branches FROM drives WHERE status='active'")]
+    profiles = {r[0]: r[1:] for r in conn.execute('SELECT user_id, cgpa, backlogs, branch FROM student_profiles')}
+    statuses, weights = list(FUNNEL), list(FUNNEL.values())
+    rows = []
+    for s in students:
+        cgpa, backlogs, branch = profiles[s]
+        eligible = [d for d, mc, mb, br in drives if cgpa >= mc and backlogs <= mb and (not br or branch in br)]
+        for d in rnd.sample(eligible, min(len(eligible), rnd.randint(*APPLICATIONS_PER_STUDENT))):
+            rows.append((s, d, rnd.choices(statuses, weights)[0], _ago(rnd, 90)))
+    conn.executemany("INSERT INTO applications(student_id,drive_id,status,applied_at) VALUES(?,?,?,datetime('now', ?))", rows)
+
+def _notifications(conn, rnd, students, drives):
+    bodies = [f'📣 New drive: Company {i} is hiring — check eligibility and apply before the deadline.' for i in range(drives)]
+    conn.executemany('INSERT INTO notification_messages(body) VALUES(?) ON CONFLICT(body) DO NOTHING', [(b,) for b in bodies])
+    ids = [r[0] for r in conn.execute('SELECT id FROM notification_messages ORDER BY id')][-len(bodies):] if bodies else []
+    rows = []
+    for s in students:
+        for _ in range(NOTIFICATIONS_PER_STUDENT):
+            read = int(rnd.random() < READ_SHARE)
+            if ids and rnd.random() < BROADCAST_SHARE:
+                rows.append((s, '', rnd.choice(ids), read, _ago(rnd, 180)))
+            else:
+                rows.append((s, f'📋 Status update on application #{rnd.randint(1, 10**6)}', None, read, _ago(rnd, 180)))
+    rows.sort(key=lambda r: int(r[4].split()[0]))   # oldest first, so ids follow created_at
+    conn.executemany("""INSERT INTO notifications(user_id,message,message_id,is_read,created_at)
+        VALUES(?,?,?,?,datetime('now', ?))""", rows)
+
+def _requests(conn, rnd, students, alumni):
+    mentors = [r[0] for r in conn.execute('SELECT user_id FROM alumni_profiles WHERE open_to_mentor=1')] or alumni
+    posts = conn.execute('SELECT id, alumni_id FROM alumni_referral_posts').fetchall()
+    mentorship, referrals = set(), {}
+    for s in students:
+        if mentors and rnd.random() < MENTORSHIP_SHARE:
+            mentorship.add((s, rnd.choice(mentors)))
+        if posts and rnd.random() < REFERRAL_SHARE:
+            post, author = rnd.choice(posts)
+            referrals[(s, post)] = author
+    conn.executemany("""INSERT INTO mentorship_requests(student_id,alumni_id,message,status) VALUES(?,?,?,?)""",
+                     [(s, a, 'Would love your guidance on interview prep.', rnd.choice(['pending', 'accepted', 'declined']))
+                      for s, a in sorted(mentorship)])
+    conn.executemany("""INSERT INTO referral_requests(student_id,referral_post_id,alumni_id,message,status) VALUES(?,?,?,?,?)""",
+                     [(s, p, a, 'Could you refer me for this role?', rnd.choice(['requested', 'referred', 'declined']))
+                      for (s, p), a in sorted(referrals.items())])
+
+TABLES = ['users', 'student_profiles', 'drives', 'applications', 'notifications', 'alumni_profiles', 'alumni_jobs',
+          'alumni_referral_posts', 'alumni_mentorship_slots', 'mentorship_requests', 'referral_requests']
+
+def generate(path, students=1000, drives=50, alumni=100, seed=42):
+    """Fill the database at `path` (already initialised) and return {table: row count}."""
+    rnd = random.Random(seed)
+    seed_students(path, students, seed=seed)
+    seed_drives(path, drives, seed=seed + 1)
+    conn = sqlite3.connect(path)
+    student_ids = [r[0] for r in conn.execute("SELECT id FROM users WHERE role='student' ORDER BY id")]
+    alumni_ids = _alumni(conn, rnd, alumni, student_ids)
+    _applications(conn, rnd, student_ids)
+    _notifications(conn, rnd, student_ids, drives)
+    _requests(conn, rnd, student_ids, alumni_ids)
+    conn.commit()
+    counts = {t: conn.execute(f'SELECT COUNT(*) FROM {t}').fetchone()[0] for t in TABLES}
+    conn.close()
+    return counts
+
+if __name__ == '__main__':
+    args = [int(a) for a in sys.argv[1:]]
+    path = temp_db()
+    for table, n in generate(path, *args).items():
+        print(f'{table:<24} {n:>9}')
+    print(path)
@@ -0,0 +1,13 @@
+# Production server settings; `gunicorn app:app` picks this file up from the
+# working directory. Every dashboard holds a live notification stream open,
+# so workers are gthread rather than the default sync worker, where each open
+# stream would occupy a whole process. Threads, not greenlets: modules/db.py
+# reuses one SQLite connection per thread and sqlite3 calls block, so the app
+# stays on real threads. An idle stream is a thread waiting on its queue.
+import os
+
+worker_class       = 'gthread'
+workers            = int(os.environ.get('WEB_CONCURRENCY', 2))
+threads            = int(os.environ.get('PLACEMENTPRO_THREADS', 64))
+worker_connections = int(os.environ.get('PLACEMENTPRO_WORKER_CONNECTIONS', 1000))
+bind               = os.environ.get('PLACEMENTPRO_BIND', '0.0.0.0:8000')
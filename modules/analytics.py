@@ -1,6 +1,7 @@
-import sqlite3, json
-
-DB = 'placementpro.db'
+import json
+import numpy as np
+from modules.db import get_db
+from modules.metrics import STATS_SECONDS
 
 ROLE_SKILLS = {
     'Data Analyst':        ['Python', 'SQL', 'PowerBI', 'Excel', 'Tableau', 'Statistics', 'Pandas'],
@@ -86,40 +87,37 @@ FALLBACK_URLS = {
     'gcp':             'https://cloud.google.com/learn/training',
 }
 
-def get_db():
-    conn = sqlite3.connect(DB)
-    conn.row_factory = sqlite3.Row
-    return conn
+def learning_resource(skill):
+    # Look up in RESOURCES first, then FALLBACK_URLS, then GeeksforGeeks search
+    resource = RESOURCES.get(skill)
+    if resource: return resource
+    fallback_url = FALLBACK_URLS.get(skill.lower())
+    if fallback_url:
+        return {'platform': 'Official Docs', 'url': fallback_url, 'hours': 10}
+    # GeeksforGeeks search is more reliable than YouTube search
+    search_term = skill.replace(' ', '+')
+    return {
+        'platform': 'GeeksforGeeks',
+        'url': f'https://www.geeksforgeeks.org/search/?q={search_term}',
+        'hours': 10
+    }
 
 def get_skill_gap(student_id, target_role):
     conn = get_db()
     profile = conn.execute('SELECT skills FROM student_profiles WHERE user_id=?', (student_id,)).fetchone()
     conn.close()
 
-    student_skills = set(s.lower() for s in json.loads(profile['skills'])) if profile and profile['skills'] else set()
+    from modules.skills import canonical_skills
+    student_skills = set(canonical_skills(json.loads(profile['skills']))) if profile and profile['skills'] else set()
     required_skills = ROLE_SKILLS.get(target_role, [])
 
     have = []
     missing = []
     for skill in required_skills:
-        if skill.lower() in student_skills:
+        if skill in student_skills:
             have.append(skill)
         else:
-            # Look up in RESOURCES first, then FALLBACK_URLS, then GeeksforGeeks search
-            resource = RESOURCES.get(skill)
-            if not resource:
-                fallback_url = FALLBACK_URLS.get(skill.lower())
-                if fallback_url:
-                    resource = {'platform': 'Official Docs', 'url': fallback_url, 'hours': 10}
-                else:
-                    # GeeksforGeeks search is more reliable than YouTube search
-                    search_term = skill.replace(' ', '+')
-                    resource = {
-                        'platform': 'GeeksforGeeks',
-                        'url': f'https://www.geeksforgeeks.org/search/?q={search_term}',
-                        'hours': 10
-                    }
-            missing.append({'skill': skill, **resource})
+            missing.append({'skill': skill, **learning_resource(skill)})
 
     match_pct = int(len(have) / len(required_skills) * 100) if required_skills else 0
     return {
@@ -129,12 +127,196 @@ def get_skill_gap(student_id, target_role):
         'required': required_skills
     }
 
-def get_placement_stats():
+# ── Cohort skill gap ──────────────────────────────────────────────────
+# Every student's skills become one row of a boolean matrix over the skills
+# any role requires; multiplying by the role/skill matrix gives every
+# student's match against every role in a single pass.
+ROLES       = list(ROLE_SKILLS)
+VOCABULARY  = sorted({s for skills in ROLE_SKILLS.values() for s in skills})
+_VOCAB_POS  = {s: i for i, s in enumerate(VOCABULARY)}
+ROLE_MATRIX = np.zeros((len(VOCABULARY), len(ROLES)), dtype=np.int32)
+for _r, _role in enumerate(ROLES):
+    for _s in ROLE_SKILLS[_role]: ROLE_MATRIX[_VOCAB_POS[_s], _r] = 1
+ROLE_SIZES  = ROLE_MATRIX.sum(axis=0)
+
+def cohort_skill_matrix(branch=None):
+    """(student ids, bool matrix students x VOCABULARY) for every student, optionally one branch."""
+    sql = """SELECT sp.user_id, sp.skills FROM student_profiles sp JOIN users u ON u.id=sp.user_id
+             WHERE u.role='student'"""
+    params = ()
+    if branch: sql += ' AND sp.branch=?'; params = (branch,)
+    conn = get_db()
+    rows = conn.execute(sql + ' ORDER BY sp.user_id', params).fetchall()
+    conn.close()
+    ids = np.fromiter((r['user_id'] for r in rows), dtype=np.int64, count=len(rows))
+    from modules.skills import canonical_skills
+    matrix = np.zeros((len(rows), len(VOCABULARY)), dtype=bool)
+    row_idx, col_idx = [], []
+    for i, r in enumerate(rows):
+        try: skills = json.loads(r['skills'] or '[]')
+        except ValueError: continue
+        for s in canonical_skills(skills):
+            j = _VOCAB_POS.get(s)
+            if j is not None: row_idx.append(i); col_idx.append(j)
+    matrix[row_idx, col_idx] = True
+    return ids, matrix
+
+def match_percentages(matrix):
+    """students x ROLES match %, truncated like get_skill_gap's match_pct."""
+    have = matrix.astype(np.int32) @ ROLE_MATRIX
+    return have * 100 // ROLE_SIZES
+
+def cohort_skill_gap(branch=None, top=5):
+    """Per-role readiness of the whole cohort and the missing skills that hold most students back.
+
+    For each role: the average match, how many students are fully ready, the
+    distribution of match %, and the required skills ranked by how many
+    students lack them. `one_away` counts students for whom that skill is the
+    only thing missing — the cheapest wins for the batch.
+    """
+    ids, matrix = cohort_skill_matrix(branch)
+    pct = match_percentages(matrix)
+    best = pct.argmax(axis=1) if len(ids) else np.zeros(0, dtype=np.int64)
+    roles = []
+    for r, role in enumerate(ROLES):
+        cols = np.flatnonzero(ROLE_MATRIX[:, r])
+        missing = ~matrix[:, cols]
+        n_missing = missing.sum(axis=1)
+        missing_counts = missing.sum(axis=0)
+        one_away = missing[n_missing == 1].sum(axis=0)
+        order = np.lexsort((-one_away, -missing_counts))[:top]
+        roles.append({
+            'role': role,
+            'students': int(len(ids)),
+            'avg_match': round(float(pct[:, r].mean()), 1) if len(ids) else 0.0,
+            'ready': int((n_missing == 0).sum()),
+            'best_fit': int((best == r).sum()),
+            'distribution': np.bincount(np.minimum(pct[:, r] // 20, 4), minlength=5).tolist(),
+            'top_missing': [{
+                'skill': VOCABULARY[cols[j]],
+                'missing': int(missing_counts[j]),
+                'missing_pct': round(100 * float(missing_counts[j]) / len(ids), 1) if len(ids) else 0.0,
+                'one_away': int(one_away[j]),
+                **learning_resource(VOCABULARY[cols[j]]),
+            } for j in order],
+        })
+    return {'students': int(len(ids)), 'branch': branch, 'roles': roles}
+
+def student_skill_gaps(role, branch=None):
+    """Every student's match % and missing skills for one role, weakest match first."""
+    if role not in ROLE_SKILLS: return []
+    ids, matrix = cohort_skill_matrix(branch)
+    r = ROLES.index(role)
+    cols = np.flatnonzero(ROLE_MATRIX[:, r])
+    pct = match_percentages(matrix)[:, r]
+    missing = ~matrix[:, cols]
+    names = np.array([VOCABULARY[c] for c in cols], dtype=object)
+    return [{'user_id': int(ids[i]), 'match_pct': int(pct[i]), 'missing': names[missing[i]].tolist()}
+            for i in np.argsort(pct, kind='stable')]
+
+def score_resume(profile):
+    """Resume completeness score (0-100) and improvement tips for one student_profiles row."""
+    if not profile: return {'score': 0, 'tips': ['Complete your profile first']}
+    def load(key):
+        try: return json.loads(profile[key]) if profile[key] else []
+        except: return []
+    skills, projects, certs = load('skills'), load('projects'), load('certificates')
+    try: linkedin = profile['linkedin'] or ''
+    except: linkedin = ''
+    score = 0; tips = []
+    if profile['cgpa'] and float(profile['cgpa']) > 0: score += 20
+    else: tips.append('Add your CGPA')
+    if profile['branch']: score += 5
+    else: tips.append('Add your branch')
+    if profile['phone']: score += 5
+    else: tips.append('Add phone number')
+    if profile['dob']: score += 5
+    else: tips.append('Add date of birth')
+    if linkedin: score += 5
+    else: tips.append('Add your LinkedIn URL')
+    if len(skills) >= 5: score += 20
+    elif len(skills) >= 3: score += 12; tips.append('Add 2 more skills')
+    elif skills: score += 5; tips.append('Add at least 5 skills')
+    else: tips.append('Add your technical skills')
+    if len(projects) >= 2: score += 25
+    elif len(projects) == 1: score += 15; tips.append('Add one more project to reach 90%+')
+    else: tips.append('Add at least 1 project')
+    if len(certs) >= 2: score += 15
+    elif len(certs) == 1: score += 8; tips.append('Add one more certificate')
+    else: tips.append('Add a certificate (Coursera, NPTEL)')
+    return {'score': score, 'tips': tips}
+
+def score_resumes(profiles):
+    """Scores only, for many profiles at once, in input order."""
+    return [score_resume(p)['score'] for p in profiles]
+
+RESUME_SCORE_BATCH = 2000
+
+def refresh_resume_scores(conn=None, user_ids=None):
+    """Recompute resume_score for stale (NULL) rows, or for `user_ids`. Returns rows updated.
+
+    Runs on the caller's connection when one is given, leaving the commit to
+    the caller; otherwise commits each batch.
+    """
+    own = conn is None
+    conn = conn or get_db()
+    cols = 'id, cgpa, branch, phone, dob, linkedin, skills, projects, certificates'
+    if user_ids is None: where, params = 'resume_score IS NULL', []
+    else: where, params = f'user_id IN ({",".join("?" * len(user_ids))})', list(user_ids)
+    updated, last_id = 0, 0
+    try:
+        while True:
+            rows = conn.execute(f'SELECT {cols} FROM student_profiles WHERE {where} AND id > ? ORDER BY id LIMIT ?',
+                                params + [last_id, RESUME_SCORE_BATCH]).fetchall()
+            if not rows: break
+            profiles = [dict(zip(cols.split(', '), r)) for r in rows]
+            conn.executemany('UPDATE student_profiles SET resume_score=? WHERE id=?',
+                             [(score, p['id']) for p, score in zip(profiles, score_resumes(profiles))])
+            updated += len(profiles); last_id = profiles[-1]['id']
+            if own: conn.commit()
+        return updated
+    finally:
+        if own: conn.close()
+
+# sort key -> (join, ORDER BY). Score sorts walk idx_sp_resume_score from the
+# profile side (CROSS JOIN pins the loop order), so a page costs LIMIT rows.
+STUDENT_SORTS = {
+    'score':     ('CROSS JOIN', 'sp.resume_score DESC, sp.user_id DESC'),
+    'score_asc': ('CROSS JOIN', 'sp.resume_score, sp.user_id'),
+    'cgpa':      ('JOIN', 'sp.cgpa DESC, sp.user_id'),
+    'name':      ('JOIN', 'u.name, u.id'),
+}
+
+def student_directory(branch=None, min_score=None, max_score=None, sort='score', limit=50, offset=0):
+    """One page of students with their stored resume score, filtered and sorted in SQL.
+
+    Only students have a student_profiles row, so the total is counted on the
+    profile table alone.
+    """
+    refresh_resume_scores()
+    where, params = [], []
+    if branch: where.append('sp.branch=?'); params.append(branch)
+    if min_score is not None: where.append('sp.resume_score>=?'); params.append(min_score)
+    if max_score is not None: where.append('sp.resume_score<=?'); params.append(max_score)
+    where = ' AND '.join(where) or '1'
+    join, order = STUDENT_SORTS.get(sort, STUDENT_SORTS['score'])
+    conn = get_db()
+    total = conn.execute(f'SELECT COUNT(*) FROM student_profiles sp WHERE {where}', params).fetchone()[0]
+    rows = conn.execute(f'''SELECT u.id as user_id, u.name, u.email, sp.branch, sp.cgpa, sp.backlogs, sp.resume_score
+        FROM student_profiles sp {join} users u ON u.id=sp.user_id
+        WHERE {where} ORDER BY {order} LIMIT ? OFFSET ?''', params + [limit, offset]).fetchall()
+    conn.close()
+    return {'total': total, 'students': [dict(r) for r in rows]}
+
+@STATS_SECONDS.timed(source='aggregate')
+def compute_placement_stats():
+    """Aggregate the placement statistics from the base tables (the slow path)."""
     conn = get_db()
     total_students = conn.execute("SELECT COUNT(*) as c FROM users WHERE role='student'").fetchone()['c']
     total_drives   = conn.execute("SELECT COUNT(*) as c FROM drives").fetchone()['c']
     total_apps     = conn.execute("SELECT COUNT(*) as c FROM applications").fetchone()['c']
     selected       = conn.execute("SELECT COUNT(*) as c FROM applications WHERE status='selected'").fetchone()['c']
+    placed         = conn.execute("SELECT COUNT(DISTINCT student_id) as c FROM applications WHERE status='selected'").fetchone()['c']
 
     branch_stats = conn.execute('''
         SELECT sp.branch, COUNT(*) as count FROM student_profiles sp GROUP BY sp.branch
@@ -143,7 +325,7 @@ def get_placement_stats():
     top_drives = conn.execute('''
         SELECT d.company, d.role, COUNT(a.id) as applicants
         FROM drives d LEFT JOIN applications a ON d.id=a.drive_id
-        GROUP BY d.id ORDER BY applicants DESC LIMIT 5
+        GROUP BY d.id ORDER BY applicants DESC, d.id LIMIT 5
     ''').fetchall()
 
     status_dist = conn.execute('''
@@ -151,17 +333,91 @@ def get_placement_stats():
     ''').fetchall()
 
     conn.close()
+    return _stats_dict(total_students, total_drives, total_apps, selected, placed,
+        [dict(r) for r in branch_stats], [dict(r) for r in top_drives], [dict(r) for r in status_dist])
+
+def _stats_dict(total_students, total_drives, total_apps, selected, placed, branch_stats, top_drives, status_dist):
     return {
         'total_students': total_students,
         'total_drives': total_drives,
         'total_apps': total_apps,
         'selected': selected,
+        'placed': placed,
         'placement_rate': round(selected/total_students*100, 1) if total_students else 0,
-        'branch_stats': [dict(r) for r in branch_stats],
-        'top_drives': [dict(r) for r in top_drives],
-        'status_dist': [dict(r) for r in status_dist],
+        'branch_stats': branch_stats,
+        'top_drives': top_drives,
+        'status_dist': status_dist,
     }
 
+def get_stat_counters(conn=None):
+    """Scalar counters from stats_counters: students, drives, apps, placed, selected."""
+    own = conn is None
+    conn = conn or get_db()
+    rows = conn.execute("""SELECT metric, value FROM stats_counters
+        WHERE key='' OR (metric='status' AND key='selected')""").fetchall()
+    if own: conn.close()
+    counters = dict.fromkeys(['students', 'drives', 'apps', 'placed', 'selected'], 0)
+    counters.update({r['metric'] if r['metric'] != 'status' else 'selected': r['value'] for r in rows})
+    return counters
+
+def data_version(name, conn=None):
+    """Version of a tracked data set ('profiles' or 'drives'), bumped by triggers on every change."""
+    own = conn is None
+    conn = conn or get_db()
+    row = conn.execute('SELECT version FROM data_versions WHERE name=?', (name,)).fetchone()
+    if own: conn.close()
+    return row[0] if row else 0
+
+def profile_version(user_id, conn=None):
+    """Version of the student's profile, bumped on every edit; None if there is no profile."""
+    own = conn is None
+    conn = conn or get_db()
+    row = conn.execute('SELECT version FROM student_profiles WHERE user_id=?', (user_id,)).fetchone()
+    if own: conn.close()
+    return row[0] if row else None
+
+@STATS_SECONDS.timed(source='counters')
+def get_placement_stats():
+    """Placement statistics read from the trigger-maintained stats_counters table."""
+    conn = get_db()
+    rows = conn.execute("SELECT metric, key, value FROM stats_counters WHERE metric != 'drive_apps' ORDER BY metric, key").fetchall()
+    top_drives = conn.execute('''SELECT d.company, d.role, c.value as applicants
+        FROM stats_counters c JOIN drives d ON d.id = c.key
+        WHERE c.metric = 'drive_apps' ORDER BY c.value DESC, d.id LIMIT 5''').fetchall()
+    conn.close()
+    scalars = {r['metric']: r['value'] for r in rows if r['key'] == ''}
+    status  = {r['key']: r['value'] for r in rows if r['metric'] == 'status' and r['value'] > 0}
+    return _stats_dict(scalars.get('students', 0), scalars.get('drives', 0), scalars.get('apps', 0),
+        status.get('selected', 0), scalars.get('placed', 0),
+        [{'branch': r['key'], 'count': r['value']} for r in rows if r['metric'] == 'branch' and r['value'] > 0],
+        [dict(r) for r in top_drives],
+        [{'status': k, 'count': v} for k, v in status.items()])
+
+@STATS_SECONDS.timed(source='rebuild')
+def rebuild_stats_snapshot(conn=None):
+    """Recompute stats_counters from scratch (migration backfill and admin rebuild)."""
+    own = conn is None
+    conn = conn or get_db()
+    for sql in (
+        "DELETE FROM stats_counters",
+        "INSERT INTO stats_counters SELECT 'students', '', COUNT(*) FROM users WHERE role='student'",
+        "INSERT INTO stats_counters SELECT 'drives', '', COUNT(*) FROM drives",
+        "INSERT INTO stats_counters SELECT 'apps', '', COUNT(*) FROM applications",
+        "INSERT INTO stats_counters SELECT 'placed', '', COUNT(DISTINCT student_id) FROM applications WHERE status='selected'",
+        "INSERT INTO stats_counters SELECT 'branch', COALESCE(branch,''), COUNT(*) FROM student_profiles GROUP BY COALESCE(branch,'')",
+        "INSERT INTO stats_counters SELECT 'status', COALESCE(status,''), COUNT(*) FROM applications GROUP BY COALESCE(status,'')",
+        """INSERT INTO stats_counters SELECT 'drive_apps', d.id, COUNT(a.id)
+            FROM drives d LEFT JOIN applications a ON a.drive_id=d.id GROUP BY d.id""",
+    ):
+        conn.execute(sql)
+    if own:
+        conn.commit(); conn.close()
+
+def verify_stats_snapshot():
+    """Compare the counters with a fresh aggregation; returns {field: (snapshot, fresh)} for mismatches."""
+    snapshot, fresh = get_placement_stats(), compute_placement_stats()
+    return {k: (snapshot[k], fresh[k]) for k in fresh if snapshot[k] != fresh[k]}
+
 def evaluate_profile(student_id):
     conn = get_db()
     profile = conn.execute('SELECT * FROM student_profiles WHERE user_id=?', (student_id,)).fetchone()
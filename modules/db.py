@@ -0,0 +1,113 @@
+import sqlite3, threading
+
+DB = 'placementpro.db'
+
+# One SQLite connection per thread, shared by app.py and every module.
+# Callers keep the get_db() / conn.close() pattern: close() only hands the
+# connection back, and once the outermost caller on this thread has closed
+# it any transaction left uncommitted is rolled back, exactly as a real
+# close would have discarded it.
+JOURNAL_MODE = 'WAL'          # readers never block on a writer (and vice versa)
+PRAGMAS = [
+    'PRAGMA synchronous=NORMAL',      # fsync at checkpoint, not every commit; safe with WAL
+    'PRAGMA mmap_size=268435456',     # 256 MiB memory-mapped reads
+    'PRAGMA cache_size=-65536',       # 64 MiB page cache per connection
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA busy_timeout=30000',
+]
+
+_local = threading.local()
+
+class PooledConnection(sqlite3.Connection):
+    # While a recorder is attached to this thread (see profile()), statements
+    # go through it so it can time them; otherwise this is one attribute check.
+    def execute(self, sql, parameters=(), /):
+        rec = getattr(_local, 'recorder', None)
+        if rec is None: return sqlite3.Connection.execute(self, sql, parameters)
+        return rec.execute(self, sql, parameters)
+
+    def executemany(self, sql, parameters, /):
+        rec = getattr(_local, 'recorder', None)
+        if rec is None: return sqlite3.Connection.executemany(self, sql, parameters)
+        return rec.executemany(self, sql, parameters)
+
+    def close(self):
+        _local.depth = max(0, getattr(_local, 'depth', 1) - 1)
+        if _local.depth == 0 and self.in_transaction:
+            self.rollback()
+
+    def really_close(self):
+        sqlite3.Connection.close(self)
+
+def _connect(path):
+    conn = sqlite3.connect(path, timeout=30, factory=PooledConnection)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA auto_vacuum=INCREMENTAL')   # takes effect on new files only; see incremental_vacuum()
+    conn.execute(f'PRAGMA journal_mode={JOURNAL_MODE}')
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    conn.path = path
+    rec = getattr(_local, 'recorder', None)
+    if rec is not None: rec.connections += 1
+    return conn
+
+def get_db():
+    conn = getattr(_local, 'conn', None)
+    if conn is None or conn.path != DB:
+        if conn is not None: conn.really_close()
+        conn = _local.conn = _connect(DB)
+        _local.depth = 0
+    _local.depth += 1
+    rec = getattr(_local, 'recorder', None)
+    if rec is not None: rec.checkouts += 1
+    return conn
+
+def profile(recorder):
+    """Attach a query recorder to this thread (None detaches). It needs
+    execute(conn, sql, params), executemany(conn, sql, seq) and counters
+    `connections` (real opens) and `checkouts` (get_db calls)."""
+    _local.recorder = recorder
+
+def release():
+    """End-of-request hook: roll back anything left open and reset the nesting count."""
+    conn = getattr(_local, 'conn', None)
+    _local.depth = 0
+    if conn is not None and conn.in_transaction:
+        conn.rollback()
+
+def detach():
+    """Close this thread's connection now. Long-lived requests (the notification
+    stream) call it once their queries are done, so an idle stream does not pin
+    a connection; the next get_db() on the thread opens a fresh one."""
+    conn = getattr(_local, 'conn', None)
+    _local.conn, _local.depth = None, 0
+    if conn is not None: conn.really_close()
+
+VACUUM_STEP = 2000            # pages per incremental_vacuum call; writers get in between steps
+
+def database_bytes(conn):
+    return conn.execute('PRAGMA page_count').fetchone()[0] * conn.execute('PRAGMA page_size').fetchone()[0]
+
+def enable_incremental_vacuum(conn):
+    """Convert a file created before auto_vacuum=INCREMENTAL with one full VACUUM.
+    It rewrites the whole database and holds the write lock throughout, so it is
+    an admin command (flask enable-incremental-vacuum), never a background job.
+    Returns False if the file was already converted."""
+    if conn.in_transaction: conn.commit()
+    if conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2: return False
+    conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+    conn.execute('VACUUM')
+    return True
+
+def incremental_vacuum(conn, step=None):
+    """Hand the database's free pages back to the filesystem and truncate the WAL.
+    Free pages stay in the file (for reuse) until enable_incremental_vacuum() has
+    converted it. step() is called between VACUUM_STEP chunks. Returns bytes reclaimed."""
+    if conn.in_transaction: conn.commit()
+    before = database_bytes(conn)
+    if conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2:
+        while conn.execute('PRAGMA freelist_count').fetchone()[0]:
+            conn.execute(f'PRAGMA incremental_vacuum({VACUUM_STEP})').fetchall()
+            if step: step()
+    conn.execute('PRAGMA wal_checkpoint(TRUNCATE)').fetchall()
+    return max(0, before - database_bytes(conn))
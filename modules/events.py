@@ -0,0 +1,91 @@
+import queue, threading
+from modules.db import get_db
+from modules.metrics import Gauge
+
+# In-process pub/sub for live notifications (the SSE stream in app.py).
+# Each open stream subscribes a small queue for its user. One dispatcher
+# thread per process reads notification rows committed since its cursor and
+# fans them out to the subscribed queues, with each user's unread count, so
+# an idle stream costs a blocked queue.get and no database connection.
+#
+# Writers call publish() after committing, which wakes the dispatcher at once;
+# it also polls every POLL_SECONDS, which picks up rows committed by other
+# worker processes (and by callers that never publish).
+POLL_SECONDS   = 1.0
+BATCH          = 5000
+QUEUE_SIZE     = 100     # events buffered per stream before a slow client starts missing them
+
+_subscribers = {}        # user_id -> set of queue.Queue
+_lock = threading.Lock()
+_wake = threading.Event()
+_started = False
+_start_lock = threading.Lock()
+
+def publish():
+    """Tell the dispatcher new notifications were committed."""
+    _wake.set()
+
+def subscribe(user_id):
+    _start_dispatcher()
+    q = queue.Queue(QUEUE_SIZE)
+    with _lock:
+        _subscribers.setdefault(user_id, set()).add(q)
+    return q
+
+def unsubscribe(user_id, q):
+    with _lock:
+        subs = _subscribers.get(user_id)
+        if subs is not None:
+            subs.discard(q)
+            if not subs: del _subscribers[user_id]
+
+def subscriber_count():
+    with _lock:
+        return sum(len(s) for s in _subscribers.values())
+
+Gauge('placementpro_notification_streams', 'Open notification streams in this process.', subscriber_count)
+
+def _deliver(rows, unread):
+    with _lock:
+        targets = {uid: list(qs) for uid, qs in _subscribers.items()}
+    for r in rows:
+        for q in targets.get(r['user_id'], ()):
+            try: q.put_nowait({**r, 'unread': unread.get(r['user_id'], 0)})
+            except queue.Full: pass   # the client can re-read the feed; never block the dispatcher
+
+def _dispatch(cursor):
+    """Fan out rows with id > cursor; returns the new cursor."""
+    conn = get_db()
+    try:
+        while True:
+            rows = [dict(r) for r in conn.execute('''SELECT n.id, n.user_id, COALESCE(m.body, n.message) AS message,
+                n.is_read, n.created_at FROM notifications n LEFT JOIN notification_messages m ON m.id = n.message_id
+                WHERE n.id > ? ORDER BY n.id LIMIT ?''', (cursor, BATCH))]
+            if not rows: return cursor
+            cursor = rows[-1]['id']
+            with _lock:
+                users = sorted({r['user_id'] for r in rows if r['user_id'] in _subscribers})
+            if users:
+                unread = dict(conn.execute(f'''SELECT user_id, unread FROM notification_unread
+                    WHERE user_id IN ({",".join("?" * len(users))})''', users).fetchall())
+                _deliver(rows, unread)
+    finally:
+        conn.close()
+
+def _dispatcher_loop(cursor):
+    while True:
+        _wake.wait(POLL_SECONDS)
+        _wake.clear()
+        try: cursor = _dispatch(cursor)
+        except Exception: pass   # a locked or busy database: retry on the next tick
+
+def _start_dispatcher():
+    global _started
+    if _started: return
+    with _start_lock:
+        if _started: return
+        conn = get_db()
+        cursor = conn.execute('SELECT COALESCE(MAX(id), 0) FROM notifications').fetchone()[0]
+        conn.close()
+        threading.Thread(target=_dispatcher_loop, args=(cursor,), name='placementpro-events', daemon=True).start()
+        _started = True
@@ -0,0 +1,141 @@
+import os, pickle, random, sqlite3, threading, time
+from collections import OrderedDict
+from modules.db import get_db
+from modules.metrics import FRAGMENT_REQUESTS
+
+# Fragment cache for the dashboards: shared query results (active drives,
+# referral posts, open mentorship slots, the alumni list) and rendered
+# template blocks. A fragment is stored under a key with the tags it was
+# built from, e.g. 'connect_slots' from ('slots', 'alumni'). Writes call
+# invalidate() with the tags they touch, which bumps each tag's generation;
+# an entry is served only while the generations it was built under are
+# still current, so a write that lands while a fragment is being computed
+# leaves that fragment stale instead of caching old data as new. Entries
+# also expire after TTL seconds, which bounds anything derived from the
+# clock (deadline urgency in the student feed).
+#
+# Generations are rows of the database's data_versions table, so every
+# worker sees an invalidation on its next read, as with the eligibility
+# index. A tag that names a trigger-maintained version ('drives') uses that
+# row directly and is bumped by any write to the table, invalidate() or not.
+# Entries live in an LRU in this process by default; set
+# PLACEMENTPRO_FRAGMENT_CACHE to a file path to share them between the
+# workers on one host through a SQLite file.
+TTL         = 60
+MAX_ENTRIES = 1024
+SHARED_PATH = os.environ.get('PLACEMENTPRO_FRAGMENT_CACHE', '')
+PRUNE_EVERY = 100          # shared backend: drop expired rows about once per this many stores
+TRIGGER_VERSIONS = {'drives'}   # data_versions rows the migrations' triggers keep
+
+MISS = object()
+
+class MemoryBackend:
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()     # key -> (expires, value), least recently used first
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None: return MISS
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return MISS
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+class SQLiteBackend:
+    """Entries in a SQLite file shared by every process that opens it.
+    Values are pickled, so fragments must be plain data."""
+    SCHEMA = '''CREATE TABLE IF NOT EXISTS fragments (key TEXT PRIMARY KEY, expires REAL NOT NULL, value BLOB NOT NULL);'''
+
+    def __init__(self, path, max_entries=MAX_ENTRIES):
+        self.path, self.max_entries = path, max_entries
+        self._local = threading.local()
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=OFF')      # a lost entry is only a miss
+            conn.executescript(self.SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._conn().execute('SELECT expires, value FROM fragments WHERE key=?', (key,)).fetchone()
+        if row is None or row[0] < time.time(): return MISS
+        return pickle.loads(row[1])
+
+    def set(self, key, value, ttl):
+        conn = self._conn()
+        conn.execute('INSERT OR REPLACE INTO fragments(key, expires, value) VALUES(?,?,?)',
+                     (key, time.time() + ttl, pickle.dumps(value, pickle.HIGHEST_PROTOCOL)))
+        if random.random() < 1 / PRUNE_EVERY:
+            conn.execute('DELETE FROM fragments WHERE expires < ?', (time.time(),))
+            conn.execute('''DELETE FROM fragments WHERE key IN (SELECT key FROM fragments
+                ORDER BY expires DESC LIMIT -1 OFFSET ?)''', (self.max_entries,))
+
+    def clear(self):
+        self._conn().execute('DELETE FROM fragments')
+
+    def __len__(self):
+        return self._conn().execute('SELECT COUNT(*) FROM fragments').fetchone()[0]
+
+backend = SQLiteBackend(SHARED_PATH) if SHARED_PATH else MemoryBackend()
+
+def _version_name(tag):
+    return tag if tag in TRIGGER_VERSIONS else f'fragment:{tag}'
+
+def generations(tags):
+    """Current generation of each tag, 0 for a tag never invalidated."""
+    if not tags: return ()
+    names = [_version_name(t) for t in tags]
+    conn = get_db()
+    found = dict(conn.execute(f'SELECT name, version FROM data_versions WHERE name IN ({",".join("?" * len(names))})',
+                              names).fetchall())
+    conn.close()
+    return tuple(found.get(n, 0) for n in names)
+
+def cached(key, tags, fn, ttl=None):
+    """fn() through the cache: the stored value while it is younger than `ttl`
+    and none of `tags` has been invalidated since it was computed."""
+    tags = tuple(tags)
+    name = key.split(':', 1)[0]
+    stamp = generations(tags)
+    entry = backend.get(key)
+    if entry is not MISS and entry[0] == stamp:
+        FRAGMENT_REQUESTS.inc(fragment=name, result='hit')
+        return entry[1]
+    FRAGMENT_REQUESTS.inc(fragment=name, result='miss')
+    value = fn()
+    backend.set(key, (stamp, value), TTL if ttl is None else ttl)
+    return value
+
+def invalidate(*tags):
+    """Mark every fragment built from any of `tags` as stale, in every worker.
+    Call it after committing the write: it commits its own bump."""
+    if not tags: return
+    conn = get_db()
+    conn.executemany('''INSERT INTO data_versions(name, version) VALUES(?, 1)
+        ON CONFLICT(name) DO UPDATE SET version = version + 1''', [(_version_name(t),) for t in tags])
+    conn.commit(); conn.close()
+
+def clear():
+    backend.clear()
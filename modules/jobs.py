@@ -0,0 +1,197 @@
+import sqlite3, json, os, threading, time, traceback, uuid
+from modules.db import get_db
+from modules.metrics import Gauge
+
+# SQLite-backed job queue. Jobs are rows in `jobs`; every process that serves
+# requests runs a small pool of worker threads that claim queued rows
+# atomically, so jobs enqueued by one gunicorn worker may run in another.
+# While a handler runs, a ticker thread refreshes the job's heartbeat_at; if
+# the process dies, the lease expires and the job is re-queued and resumed
+# from its last recorded progress. Each claim writes a fresh lease token to
+# `worker`, and heartbeats, progress and the final status only land while
+# that token is still the job's, so a run that lost its lease (and the
+# re-run that took it over) cannot overwrite each other. Kinds registered
+# with every() are enqueued by the workers themselves whenever the previous
+# run is old enough, but not before `first_after` seconds have passed since
+# the workers started.
+WORKERS       = int(os.environ.get('PLACEMENTPRO_JOB_WORKERS', 2))
+LEASE_SECONDS = 60
+HEARTBEAT_SECONDS = LEASE_SECONDS / 4
+POLL_SECONDS  = 2
+MAX_ATTEMPTS  = 3
+SCHEDULE_CHECK_SECONDS = 60
+
+HANDLERS = {}
+SCHEDULE = {}             # kind -> (interval seconds, payload, first_after seconds)
+_WORKER_ID = ''
+_wake = threading.Event()
+_started = False
+_start_lock = threading.Lock()
+_next_schedule_check = 0.0
+_started_at = 0.0
+
+def handler(kind):
+    """Register fn(job) as the runner for jobs of `kind`; its return value is stored as the result."""
+    def register(fn):
+        HANDLERS[kind] = fn
+        return fn
+    return register
+
+def every(kind, seconds, payload=None, first_after=0):
+    """Run `kind` periodically: workers enqueue a job once the last one is `seconds` old,
+    and no sooner than `first_after` seconds after they start."""
+    SCHEDULE[kind] = (seconds, payload or {}, first_after)
+
+class Job:
+    def __init__(self, row):
+        self.id       = row['id']
+        self.kind     = row['kind']
+        self.payload  = json.loads(row['payload'] or '{}')
+        self.progress = row['progress'] or 0
+        self.total    = row['total'] or 0
+        self.lease    = row['worker']
+
+    def set_total(self, total):
+        self.total = total
+        conn = get_db()
+        conn.execute('UPDATE jobs SET total=?, heartbeat_at=? WHERE id=? AND worker=?',
+            (total, time.time(), self.id, self.lease))
+        conn.commit(); conn.close()
+
+    def record_progress(self, conn, progress):
+        """Record progress on the caller's connection so it commits with the work it describes."""
+        self.progress = progress
+        conn.execute('UPDATE jobs SET progress=?, heartbeat_at=? WHERE id=? AND worker=?',
+            (progress, time.time(), self.id, self.lease))
+
+    def heartbeat(self):
+        conn = get_db()
+        conn.execute('UPDATE jobs SET heartbeat_at=? WHERE id=? AND worker=?', (time.time(), self.id, self.lease))
+        conn.commit(); conn.close()
+
+def enqueue(kind, payload, created_by=None):
+    start_workers()
+    conn = get_db()
+    cur = conn.execute('INSERT INTO jobs(kind, payload, created_by) VALUES(?,?,?)',
+        (kind, json.dumps(payload), created_by))
+    conn.commit(); conn.close()
+    _wake.set()
+    return cur.lastrowid
+
+def get_job(job_id):
+    conn = get_db()
+    row = conn.execute('SELECT * FROM jobs WHERE id=?', (job_id,)).fetchone()
+    conn.close()
+    return dict(row) if row else None
+
+def recent_jobs(limit=10):
+    conn = get_db()
+    rows = conn.execute('SELECT * FROM jobs ORDER BY id DESC LIMIT ?', (limit,)).fetchall()
+    conn.close()
+    return [dict(r) for r in rows]
+
+def queue_depth():
+    """{(status,): n} for queued and running jobs."""
+    conn = get_db()
+    rows = conn.execute("SELECT status, COUNT(*) FROM jobs WHERE status IN ('queued','running') GROUP BY status").fetchall()
+    conn.close()
+    return {(r[0],): r[1] for r in rows}
+
+Gauge('placementpro_jobs', 'Background jobs waiting or running.', queue_depth, ['status'])
+
+def wait(job_id, timeout=30):
+    """Block until a job finishes (for scripts and benchmarks); returns the job row."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = get_job(job_id)
+        if job and job['status'] in ('done', 'failed'): return job
+        time.sleep(0.05)
+    return get_job(job_id)
+
+def _requeue_expired(conn):
+    stale = time.time() - LEASE_SECONDS
+    conn.execute('''UPDATE jobs SET status='failed', error='gave up after repeated worker loss',
+        finished_at=CURRENT_TIMESTAMP WHERE status='running' AND heartbeat_at < ? AND attempts >= ?''',
+        (stale, MAX_ATTEMPTS))
+    conn.execute("UPDATE jobs SET status='queued', worker='' WHERE status='running' AND heartbeat_at < ?", (stale,))
+    conn.commit()
+
+def _enqueue_due():
+    global _next_schedule_check
+    if not SCHEDULE or time.monotonic() < _next_schedule_check: return
+    _next_schedule_check = time.monotonic() + SCHEDULE_CHECK_SECONDS
+    conn = get_db()
+    try:
+        for kind, (seconds, payload, first_after) in SCHEDULE.items():
+            if time.monotonic() - _started_at < first_after: continue
+            # A single statement, so workers in two processes checking at once enqueue one job.
+            conn.execute('''INSERT INTO jobs(kind, payload) SELECT ?, ? WHERE NOT EXISTS (
+                SELECT 1 FROM (SELECT status, created_at FROM jobs WHERE kind=? ORDER BY id DESC LIMIT 1)
+                WHERE status IN ('queued','running') OR created_at > datetime('now', ?))''',
+                (kind, json.dumps(payload), kind, f'-{int(seconds)} seconds'))
+        conn.commit()
+    finally:
+        conn.close()
+
+def _claim():
+    conn = get_db()
+    try:
+        _requeue_expired(conn)
+        row = conn.execute('''UPDATE jobs SET status='running', worker=?, attempts=attempts+1, heartbeat_at=?
+            WHERE id = (SELECT id FROM jobs WHERE status='queued' ORDER BY id LIMIT 1) AND status='queued'
+            RETURNING *''', (f'{_WORKER_ID}:{uuid.uuid4().hex[:8]}', time.time())).fetchone()
+        conn.commit()
+        return Job(row) if row else None
+    finally:
+        conn.close()
+
+def _finish(job, status, result='', error=''):
+    conn = get_db()
+    conn.execute('''UPDATE jobs SET status=?, result=?, error=?, finished_at=CURRENT_TIMESTAMP
+        WHERE id=? AND worker=?''', (status, result, error, job.id, job.lease))
+    conn.commit(); conn.close()
+
+def _tick(job, stop):
+    # Steps that record no progress (a VACUUM, a pool starting up) still hold the lease.
+    while not stop.wait(HEARTBEAT_SECONDS):
+        try: job.heartbeat()
+        except sqlite3.Error: pass       # e.g. busy; the next tick retries well within the lease
+
+def _run(job):
+    fn = HANDLERS.get(job.kind)
+    if not fn:
+        _finish(job, 'failed', error=f'no handler for {job.kind!r}'); return
+    stop = threading.Event()
+    threading.Thread(target=_tick, args=(job, stop), name=f'placementpro-job-{job.id}-heartbeat', daemon=True).start()
+    try:
+        result = fn(job)
+        _finish(job, 'done', result=json.dumps(result) if result is not None else '')
+    except Exception:
+        _finish(job, 'failed', error=traceback.format_exc(limit=5))
+    finally:
+        stop.set()
+
+def _worker_loop():
+    while True:
+        try:
+            _enqueue_due()
+            job = _claim()
+        except sqlite3.Error:
+            job = None
+        if job:
+            _run(job); continue
+        _wake.wait(POLL_SECONDS)
+        _wake.clear()
+
+def start_workers():
+    """Start this process's worker threads once. Unfinished jobs left by a dead process are
+    picked up as soon as their lease expires."""
+    global _started, _started_at, _WORKER_ID
+    if _started: return
+    with _start_lock:
+        if _started: return
+        _started_at = time.monotonic()
+        _WORKER_ID = f'{os.getpid()}-{uuid.uuid4().hex[:8]}'  # after any pre-fork import
+        for i in range(WORKERS):
+            threading.Thread(target=_worker_loop, name=f'placementpro-job-{i}', daemon=True).start()
+        _started = True
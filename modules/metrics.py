@@ -0,0 +1,149 @@
+import bisect, functools, math, threading, time
+
+# In-process counters, gauges and histograms, rendered at /metrics in the
+# Prometheus text exposition format (version 0.0.4). No client library or
+# push gateway is needed: the engines record into module-level metrics and
+# the scrape reads them. Values are per process. Under several gunicorn
+# workers each scrape reaches one of them, so scrape every worker or run
+# one worker with threads when the totals matter.
+
+_registry = []
+_lock = threading.Lock()
+
+TIME_BUCKETS  = (.001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 10, 50, 100, 500, 1000, 5000, 10000, 50000, 100000)
+BYTE_BUCKETS  = (2**10, 2**12, 2**14, 2**15, 2**16, 2**17, 2**18, 2**20, 2**22)
+
+def _fmt(v):
+    if v == math.inf: return '+Inf'
+    return repr(float(v)) if isinstance(v, float) and not v.is_integer() else str(int(v))
+
+def _labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs: return ''
+    esc = lambda s: str(s).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+    return '{' + ','.join(f'{k}="{esc(v)}"' for k, v in pairs) + '}'
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name, doc, labels=()):
+        self.name, self.doc, self.labelnames = name, doc, tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        with _lock: _registry.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(n, '')) for n in self.labelnames)
+
+    def samples(self):
+        with self._lock:
+            return [(f'{self.name}{_labels(self.labelnames, k)}', v) for k, v in sorted(self._values.items())]
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.doc}', f'# TYPE {self.name} {self.kind}']
+        return lines + [f'{name} {_fmt(v)}' for name, v in self.samples()]
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock: self._values[key] = self._values.get(key, 0) + amount
+
+class Gauge(_Metric):
+    """A value read at scrape time from fn(), which returns a number or a
+    {label value tuple: number} dict."""
+    kind = 'gauge'
+
+    def __init__(self, name, doc, fn, labels=()):
+        super().__init__(name, doc, labels)
+        self.fn = fn
+
+    def samples(self):
+        try: v = self.fn()
+        except Exception: return []   # a failing source must not break the scrape
+        if not isinstance(v, dict): v = {(): v}
+        return [(f'{self.name}{_labels(self.labelnames, k)}', n) for k, n in sorted(v.items())]
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, doc, labels=(), buckets=TIME_BUCKETS):
+        super().__init__(name, doc, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            h = self._values.get(key)
+            if h is None: h = self._values[key] = [[0] * len(self.buckets), 0, 0.0]
+            i = bisect.bisect_left(self.buckets, value)
+            if i < len(self.buckets): h[0][i] += 1
+            h[1] += 1; h[2] += value
+
+    def time(self, **labels):
+        """Context manager observing the seconds spent in its block."""
+        return _Timer(self, labels)
+
+    def timed(self, **labels):
+        """Decorator form of time()."""
+        def wrap(fn):
+            @functools.wraps(fn)
+            def inner(*args, **kwargs):
+                with _Timer(self, labels): return fn(*args, **kwargs)
+            return inner
+        return wrap
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.doc}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            items = sorted((k, ([*h[0]], h[1], h[2])) for k, h in self._values.items())
+        for key, (counts, count, total) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                lines.append(f'{self.name}_bucket{_labels(self.labelnames, key, [("le", _fmt(bound))])} {cumulative}')
+            lines.append(f'{self.name}_bucket{_labels(self.labelnames, key, [("le", "+Inf")])} {count}')
+            lines.append(f'{self.name}_sum{_labels(self.labelnames, key)} {_fmt(total)}')
+            lines.append(f'{self.name}_count{_labels(self.labelnames, key)} {count}')
+        return lines
+
+class _Timer:
+    def __init__(self, hist, labels):
+        self.hist, self.labels = hist, labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
+        self.hist.observe(self.elapsed, **self.labels)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+def render():
+    """Every registered metric in the Prometheus text format."""
+    with _lock: metrics = list(_registry)
+    return '\n'.join(line for m in metrics for line in m.render()) + '\n'
+
+# ── Engine metrics ────────────────────────────────────────────────────
+ELIGIBILITY_SECONDS = Histogram('placementpro_eligibility_seconds',
+    'Time to compute an eligibility result.', ['query'])
+ELIGIBILITY_RESULTS = Histogram('placementpro_eligibility_results',
+    'Rows in an eligibility result.', ['query'], COUNT_BUCKETS)
+RESUME_RENDER_SECONDS = Histogram('placementpro_resume_render_seconds',
+    'Time to render one resume PDF.', ['mode'], (.01, .025, .05, .1, .25, .5, 1, 2.5, 5))
+RESUME_PDF_BYTES = Histogram('placementpro_resume_pdf_bytes',
+    'Size of a rendered resume PDF.', ['mode'], BYTE_BUCKETS)
+RESUME_REQUESTS = Counter('placementpro_resume_requests_total',
+    'Single resume requests by PDF cache outcome.', ['cache'])
+NOTIFICATION_FANOUT = Histogram('placementpro_notification_fanout',
+    'Recipients per notification write call.', ['path'], COUNT_BUCKETS)
+NOTIFICATIONS_CREATED = Counter('placementpro_notifications_created_total',
+    'Notification rows written.', ['path'])
+STATS_SECONDS = Histogram('placementpro_stats_seconds',
+    'Time to produce placement statistics.', ['source'])
+FRAGMENT_REQUESTS = Counter('placementpro_fragment_cache_total',
+    'Dashboard fragment cache lookups by fragment and outcome.', ['fragment', 'result'])
@@ -0,0 +1,450 @@
+from modules.db import get_db
+
+# Versioned schema migrations. The schema version lives in PRAGMA user_version;
+# migrate() applies every step above it, each in its own transaction together
+# with the version bump, so a failed step leaves the database on the previous
+# version instead of half-upgraded. Steps are a tuple of SQL statements or a
+# callable taking the connection. Append new steps — never edit applied ones.
+
+def add_column(conn, table, column, decl):
+    """ALTER TABLE ... ADD COLUMN, skipped when the column is already there."""
+    cols = {r['name'] for r in conn.execute(f'PRAGMA table_info({table})')}
+    if column not in cols:
+        conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} {decl}')
+
+def _legacy_columns(conn):
+    # Columns that older databases were created without.
+    for table, column, decl in [
+        ("student_profiles","linkedin","TEXT DEFAULT ''"),
+        ("student_profiles","photo_url","TEXT DEFAULT ''"),
+        ("drives","status","TEXT DEFAULT 'active'"),
+        ("drives","package_lpa","REAL DEFAULT 0"),
+        ("drives","location","TEXT DEFAULT ''"),
+        ("drives","job_type","TEXT DEFAULT 'Full-Time'"),
+        ("alumni_referral_posts","package_lpa","REAL DEFAULT 0"),
+        ("alumni_referral_posts","location","TEXT DEFAULT ''"),
+        ("alumni_referral_posts","job_type","TEXT DEFAULT 'Full-Time'"),
+    ]:
+        add_column(conn, table, column, decl)
+
+def _resume_cache(conn):
+    # One resume_meta row per student, keyed by what the PDF was rendered from.
+    for column, decl in [('input_hash', "TEXT DEFAULT ''"), ('template_version', 'INTEGER DEFAULT 0'),
+                         ('content_hash', "TEXT DEFAULT ''")]:
+        add_column(conn, 'resume_meta', column, decl)
+    conn.execute('DELETE FROM resume_meta WHERE id NOT IN (SELECT MAX(id) FROM resume_meta GROUP BY student_id)')
+    conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_resume_meta_student ON resume_meta(student_id)')
+
+def _skill_index(conn):
+    from modules.skills import rebuild_skill_index
+    conn.execute('CREATE TABLE IF NOT EXISTS skills (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE COLLATE NOCASE)')
+    conn.execute('''CREATE TABLE IF NOT EXISTS student_skills (
+        student_id INTEGER REFERENCES users(id),
+        skill_id INTEGER REFERENCES skills(id),
+        PRIMARY KEY (student_id, skill_id)
+    ) WITHOUT ROWID''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_student_skills_skill ON student_skills(skill_id, student_id)')
+    rebuild_skill_index(conn)
+
+def _resume_scores(conn):
+    from modules.analytics import refresh_resume_scores
+    add_column(conn, 'student_profiles', 'resume_score', 'INTEGER')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_sp_resume_score ON student_profiles(resume_score, user_id)')
+    # Any edit to a scored field marks the cached score stale (NULL); it is
+    # recomputed in bulk by analytics.refresh_resume_scores().
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS trg_sp_resume_score_stale
+        AFTER UPDATE OF cgpa, branch, phone, dob, linkedin, skills, projects, certificates ON student_profiles
+        WHEN NEW.resume_score IS NOT NULL AND NEW.resume_score = OLD.resume_score
+        BEGIN UPDATE student_profiles SET resume_score = NULL WHERE id = NEW.id; END''')
+    refresh_resume_scores(conn)
+
+def _interview_panels(conn):
+    # Parallel interview panels: a drive may run several interviews in the same
+    # slot, one per panel, so the slot uniqueness moves to (..., panel). SQLite
+    # cannot change a UNIQUE constraint in place, hence the table rebuild.
+    conn.execute('''CREATE TABLE interview_schedule_new (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        drive_id INTEGER REFERENCES drives(id),
+        student_id INTEGER REFERENCES users(id),
+        interview_date TEXT NOT NULL,
+        time_slot TEXT NOT NULL,
+        panel INTEGER NOT NULL DEFAULT 1,
+        notes TEXT DEFAULT '',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(drive_id, interview_date, time_slot, panel)
+    )''')
+    conn.execute('''INSERT INTO interview_schedule_new(id, drive_id, student_id, interview_date, time_slot, notes, created_at)
+        SELECT id, drive_id, student_id, interview_date, time_slot, notes, created_at FROM interview_schedule''')
+    conn.execute('DROP TABLE interview_schedule')
+    conn.execute('ALTER TABLE interview_schedule_new RENAME TO interview_schedule')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_interview_drive ON interview_schedule(drive_id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_interview_student_date ON interview_schedule(student_id, interview_date)')
+
+def _interview_intervals(conn):
+    # Parsed interview intervals for overlap queries; see modules/scheduler.py.
+    from modules.scheduler import slot_bounds
+    for column, decl in [('venue', "TEXT NOT NULL DEFAULT ''"), ('starts_at', 'TEXT'), ('ends_at', 'TEXT')]:
+        add_column(conn, 'interview_schedule', column, decl)
+    rows = conn.execute('SELECT id, interview_date, time_slot FROM interview_schedule').fetchall()
+    conn.executemany('UPDATE interview_schedule SET starts_at=?, ends_at=? WHERE id=?',
+        [(*slot_bounds(r['interview_date'], r['time_slot']), r['id']) for r in rows])
+    conn.execute('DROP INDEX IF EXISTS idx_interview_student_date')
+    conn.execute('DROP INDEX IF EXISTS idx_interview_drive')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_interview_student_start ON interview_schedule(student_id, starts_at)')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_interview_venue_start ON interview_schedule(venue, starts_at) WHERE venue != ''")
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_interview_drive_start ON interview_schedule(drive_id, starts_at)')
+
+def _unread(delta, row):
+    return (f"INSERT INTO notification_unread(user_id, unread) VALUES({row}.user_id, {delta}) "
+            f"ON CONFLICT(user_id) DO UPDATE SET unread = unread + ({delta});")
+
+def _notification_unread(conn):
+    # Per-user unread count kept by triggers, so the nav badge is one primary
+    # key lookup instead of a COUNT over the user's notifications.
+    conn.execute('''CREATE TABLE IF NOT EXISTS notification_unread (
+        user_id INTEGER PRIMARY KEY REFERENCES users(id),
+        unread INTEGER NOT NULL DEFAULT 0
+    )''')
+    for sql in (
+        f"""CREATE TRIGGER IF NOT EXISTS trg_notif_unread_ins AFTER INSERT ON notifications
+            WHEN NOT COALESCE(NEW.is_read, 0) BEGIN {_unread(1, 'NEW')} END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_notif_unread_del AFTER DELETE ON notifications
+            WHEN NOT COALESCE(OLD.is_read, 0) BEGIN {_unread(-1, 'OLD')} END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_notif_unread_upd AFTER UPDATE OF is_read ON notifications
+            WHEN COALESCE(OLD.is_read, 0) != COALESCE(NEW.is_read, 0)
+            BEGIN {_unread("CASE WHEN COALESCE(NEW.is_read, 0) THEN -1 ELSE 1 END", 'NEW')} END""",
+    ):
+        conn.execute(sql)
+    conn.execute('DELETE FROM notification_unread')
+    conn.execute('''INSERT INTO notification_unread(user_id, unread)
+        SELECT user_id, COUNT(*) FROM notifications WHERE NOT COALESCE(is_read, 0) GROUP BY user_id''')
+    # Keyset feed (user_id, id DESC) and "mark all read" over the unread rows only.
+    conn.execute('DROP INDEX IF EXISTS idx_notifications_user_created')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_notifications_user ON notifications(user_id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_notifications_unread ON notifications(user_id) WHERE is_read=0')
+
+def _notification_retention(conn):
+    # Broadcast bodies stored once and referenced by message_id (the row keeps
+    # message=''), and zlib-compressed batches of archived read notifications.
+    conn.execute('''CREATE TABLE IF NOT EXISTS notification_messages (
+        id INTEGER PRIMARY KEY,
+        body TEXT NOT NULL UNIQUE
+    )''')
+    add_column(conn, 'notifications', 'message_id', 'INTEGER REFERENCES notification_messages(id)')
+    conn.execute('''CREATE TABLE IF NOT EXISTS notification_archive (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        first_id INTEGER NOT NULL,
+        last_id INTEGER NOT NULL,
+        row_count INTEGER NOT NULL,
+        raw_bytes INTEGER NOT NULL,
+        data BLOB NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_kind ON jobs(kind, id)')
+
+# Fields a profile version covers: everything a student edits on the profile form.
+PROFILE_CONTENT = ('cgpa', 'backlogs', 'branch', 'skills', 'projects', 'certificates', 'phone', 'dob', 'linkedin', 'photo_url')
+ELIGIBILITY_FIELDS = ('cgpa', 'backlogs', 'branch')
+
+def _changed(cols):
+    return ' OR '.join(f'NEW.{c} IS NOT OLD.{c}' for c in cols)
+
+def _data_versions(conn):
+    # Versions behind the HTTP validators (ETags) and the in-process indexes:
+    # student_profiles.version per profile, and data_versions rows for the
+    # cohort's eligibility fields ('profiles') and the drive set ('drives').
+    # Triggers bump them only when a covered value really changes. They are
+    # kept out of stats_counters, which rebuild_stats_snapshot() recreates:
+    # a version must never go back to a number a client may have cached.
+    add_column(conn, 'student_profiles', 'version', 'INTEGER NOT NULL DEFAULT 0')
+    conn.execute('''CREATE TABLE IF NOT EXISTS data_versions (
+        name TEXT PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID''')
+    bump = lambda name: (f"INSERT INTO data_versions(name, version) VALUES('{name}', 1) "
+                         f"ON CONFLICT(name) DO UPDATE SET version = version + 1;")
+    for sql in (
+        f"""CREATE TRIGGER IF NOT EXISTS trg_sp_version
+            AFTER UPDATE OF {', '.join(PROFILE_CONTENT)} ON student_profiles WHEN {_changed(PROFILE_CONTENT)}
+            BEGIN UPDATE student_profiles SET version = OLD.version + 1 WHERE id = NEW.id; END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_version_profiles_ins AFTER INSERT ON student_profiles
+            BEGIN {bump('profiles')} END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_version_profiles_upd
+            AFTER UPDATE OF {', '.join(ELIGIBILITY_FIELDS)} ON student_profiles WHEN {_changed(ELIGIBILITY_FIELDS)}
+            BEGIN {bump('profiles')} END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_version_profiles_del AFTER DELETE ON student_profiles
+            BEGIN {bump('profiles')} END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_version_drives_ins AFTER INSERT ON drives
+            BEGIN {bump('drives')} END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_version_drives_upd AFTER UPDATE ON drives
+            BEGIN {bump('drives')} END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_version_drives_del AFTER DELETE ON drives
+            BEGIN {bump('drives')} END""",
+    ): conn.execute(sql)
+
+def _bump(metric, key, delta):
+    """Trigger body statement: add `delta` to stats_counters(metric, key)."""
+    return (f"INSERT INTO stats_counters(metric, key, value) VALUES('{metric}', {key}, {delta}) "
+            f"ON CONFLICT(metric, key) DO UPDATE SET value = value + ({delta});")
+
+_SELECTED_COUNT = "(SELECT COUNT(*) FROM applications WHERE student_id={row}.student_id AND status='selected')"
+
+def _stats_counters(conn):
+    # Placement statistics kept incrementally by triggers, so /tpo/stats and the
+    # TPO dashboard read a handful of counter rows instead of re-aggregating.
+    conn.execute('''CREATE TABLE IF NOT EXISTS stats_counters (
+        metric TEXT NOT NULL,
+        key TEXT NOT NULL DEFAULT '',
+        value INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY(metric, key)
+    ) WITHOUT ROWID''')
+    for sql in (
+        f"""CREATE TRIGGER IF NOT EXISTS trg_stats_user_ins AFTER INSERT ON users WHEN NEW.role='student'
+            BEGIN {_bump('students', "''", 1)} END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_stats_user_del AFTER DELETE ON users WHEN OLD.role='student'
+            BEGIN {_bump('students', "''", -1)} END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_stats_user_role AFTER UPDATE OF role ON users WHEN OLD.role IS NOT NEW.role
+            BEGIN {_bump('students', "''", "(NEW.role='student') - (OLD.role='student')")} END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_stats_profile_ins AFTER INSERT ON student_profiles
+            BEGIN {_bump('branch', "COALESCE(NEW.branch,'')", 1)} END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_stats_profile_del AFTER DELETE ON student_profiles
+            BEGIN {_bump('branch', "COALESCE(OLD.branch,'')", -1)} END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_stats_profile_branch AFTER UPDATE OF branch ON student_profiles
+            WHEN OLD.branch IS NOT NEW.branch
+            BEGIN {_bump('branch', "COALESCE(OLD.branch,'')", -1)} {_bump('branch', "COALESCE(NEW.branch,'')", 1)} END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_stats_drive_ins AFTER INSERT ON drives
+            BEGIN {_bump('drives', "''", 1)} {_bump('drive_apps', 'NEW.id', 0)} END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_stats_drive_del AFTER DELETE ON drives
+            BEGIN {_bump('drives', "''", -1)} DELETE FROM stats_counters WHERE metric='drive_apps' AND key=OLD.id; END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_stats_app_ins AFTER INSERT ON applications
+            BEGIN {_bump('apps', "''", 1)} {_bump('status', "COALESCE(NEW.status,'')", 1)} {_bump('drive_apps', 'NEW.drive_id', 1)}
+                  {_bump('placed', "''", f"NEW.status='selected' AND {_SELECTED_COUNT.format(row='NEW')}=1")} END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_stats_app_del AFTER DELETE ON applications
+            BEGIN {_bump('apps', "''", -1)} {_bump('status', "COALESCE(OLD.status,'')", -1)} {_bump('drive_apps', 'OLD.drive_id', -1)}
+                  {_bump('placed', "''", f"-(OLD.status='selected' AND {_SELECTED_COUNT.format(row='OLD')}=0)")} END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_stats_app_status AFTER UPDATE OF status ON applications
+            WHEN OLD.status IS NOT NEW.status
+            BEGIN {_bump('status', "COALESCE(OLD.status,'')", -1)} {_bump('status', "COALESCE(NEW.status,'')", 1)}
+                  {_bump('placed', "''", f"(NEW.status='selected' AND {_SELECTED_COUNT.format(row='NEW')}=1)"
+                                          f" - (OLD.status='selected' AND {_SELECTED_COUNT.format(row='OLD')}=0)")} END""",
+    ):
+        conn.execute(sql)
+    from modules.analytics import rebuild_stats_snapshot
+    rebuild_stats_snapshot(conn)
+
+MIGRATIONS = [
+    (1, 'base schema', (
+        '''CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            password TEXT NOT NULL,
+            role TEXT NOT NULL CHECK(role IN ('student','tpo','alumni'))
+        )''',
+        '''CREATE TABLE IF NOT EXISTS student_profiles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER UNIQUE REFERENCES users(id),
+            cgpa REAL DEFAULT 0,
+            backlogs INTEGER DEFAULT 0,
+            branch TEXT DEFAULT '',
+            skills TEXT DEFAULT '[]',
+            projects TEXT DEFAULT '[]',
+            certificates TEXT DEFAULT '[]',
+            phone TEXT DEFAULT '',
+            dob TEXT DEFAULT '',
+            linkedin TEXT DEFAULT ''
+        )''',
+        '''CREATE TABLE IF NOT EXISTS alumni_profiles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER UNIQUE REFERENCES users(id),
+            company TEXT DEFAULT '',
+            role TEXT DEFAULT '',
+            batch_year TEXT DEFAULT '',
+            branch TEXT DEFAULT '',
+            linkedin TEXT DEFAULT '',
+            bio TEXT DEFAULT '',
+            open_to_mentor INTEGER DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )''',
+        '''CREATE TABLE IF NOT EXISTS alumni_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            alumni_id INTEGER REFERENCES users(id),
+            company TEXT NOT NULL,
+            role TEXT NOT NULL,
+            location TEXT DEFAULT '',
+            description TEXT DEFAULT '',
+            apply_link TEXT DEFAULT '',
+            posted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )''',
+        '''CREATE TABLE IF NOT EXISTS mentorship_requests (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER REFERENCES users(id),
+            alumni_id INTEGER REFERENCES users(id),
+            message TEXT DEFAULT '',
+            status TEXT DEFAULT 'pending',
+            requested_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(student_id, alumni_id)
+        )''',
+        '''CREATE TABLE IF NOT EXISTS drives (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            company TEXT NOT NULL,
+            role TEXT NOT NULL,
+            min_cgpa REAL NOT NULL,
+            max_backlogs INTEGER NOT NULL,
+            allowed_branches TEXT NOT NULL,
+            description TEXT DEFAULT '',
+            deadline TEXT,
+            status TEXT DEFAULT 'active',
+            package_lpa REAL DEFAULT 0,
+            location TEXT DEFAULT '',
+            job_type TEXT DEFAULT 'Full-Time',
+            created_by INTEGER REFERENCES users(id),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )''',
+        '''CREATE TABLE IF NOT EXISTS applications (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER REFERENCES users(id),
+            drive_id INTEGER REFERENCES drives(id),
+            status TEXT DEFAULT 'applied',
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(student_id, drive_id)
+        )''',
+        '''CREATE TABLE IF NOT EXISTS notifications (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER REFERENCES users(id),
+            message TEXT NOT NULL,
+            is_read INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )''',
+        '''CREATE TABLE IF NOT EXISTS resume_meta (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER REFERENCES users(id),
+            file_path TEXT,
+            generated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )''',
+        '''CREATE TABLE IF NOT EXISTS interview_schedule (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            drive_id INTEGER REFERENCES drives(id),
+            student_id INTEGER REFERENCES users(id),
+            interview_date TEXT NOT NULL,
+            time_slot TEXT NOT NULL,
+            notes TEXT DEFAULT '',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(drive_id, interview_date, time_slot)
+        )''',
+        '''CREATE TABLE IF NOT EXISTS referral_requests (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER REFERENCES users(id),
+            referral_post_id INTEGER REFERENCES alumni_referral_posts(id),
+            alumni_id INTEGER REFERENCES users(id),
+            message TEXT DEFAULT '',
+            status TEXT DEFAULT 'requested',
+            alumni_note TEXT DEFAULT '',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(student_id, referral_post_id)
+        )''',
+        '''CREATE TABLE IF NOT EXISTS alumni_mentorship_slots (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            alumni_id INTEGER REFERENCES users(id),
+            topic TEXT NOT NULL,
+            slot_date TEXT NOT NULL,
+            slot_time TEXT NOT NULL,
+            meet_link TEXT DEFAULT '',
+            status TEXT DEFAULT 'available',
+            booked_by INTEGER REFERENCES users(id),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )''',
+        '''CREATE TABLE IF NOT EXISTS alumni_referral_posts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            alumni_id INTEGER REFERENCES users(id),
+            company TEXT NOT NULL,
+            role TEXT NOT NULL,
+            description TEXT DEFAULT '',
+            jd_link TEXT DEFAULT '',
+            deadline TEXT DEFAULT '',
+            package_lpa REAL DEFAULT 0,
+            location TEXT DEFAULT '',
+            job_type TEXT DEFAULT 'Full-Time',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )''',
+    )),
+    (2, 'legacy columns', _legacy_columns),
+    (3, 'jobs table', (
+        '''CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            payload TEXT NOT NULL DEFAULT '{}',
+            status TEXT NOT NULL DEFAULT 'queued' CHECK(status IN ('queued','running','done','failed')),
+            progress INTEGER DEFAULT 0,
+            total INTEGER DEFAULT 0,
+            result TEXT DEFAULT '',
+            error TEXT DEFAULT '',
+            attempts INTEGER DEFAULT 0,
+            worker TEXT DEFAULT '',
+            heartbeat_at REAL,
+            created_by INTEGER REFERENCES users(id),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            finished_at TIMESTAMP
+        )''',
+        'CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, id)',
+    )),
+    (4, 'hot path indexes', (
+        # eligibility engine
+        'CREATE INDEX IF NOT EXISTS idx_sp_branch_cgpa ON student_profiles(branch, cgpa, backlogs)',
+        'CREATE INDEX IF NOT EXISTS idx_sp_cgpa ON student_profiles(cgpa, backlogs)',
+        'CREATE INDEX IF NOT EXISTS idx_drives_status_created ON drives(status, created_at)',
+        # dashboards
+        'CREATE INDEX IF NOT EXISTS idx_users_role_name ON users(role, name)',
+        'CREATE INDEX IF NOT EXISTS idx_notifications_user_created ON notifications(user_id, created_at)',
+        'CREATE INDEX IF NOT EXISTS idx_applications_drive_status ON applications(drive_id, status)',
+        'CREATE INDEX IF NOT EXISTS idx_applications_student ON applications(student_id, applied_at)',
+        'CREATE INDEX IF NOT EXISTS idx_applications_status_student ON applications(status, student_id)',
+        'CREATE INDEX IF NOT EXISTS idx_interview_drive ON interview_schedule(drive_id)',
+        'CREATE INDEX IF NOT EXISTS idx_alumni_jobs_alumni ON alumni_jobs(alumni_id, posted_at)',
+        'CREATE INDEX IF NOT EXISTS idx_referral_posts_alumni ON alumni_referral_posts(alumni_id, created_at)',
+        'CREATE INDEX IF NOT EXISTS idx_referral_posts_created ON alumni_referral_posts(created_at)',
+        'CREATE INDEX IF NOT EXISTS idx_slots_alumni ON alumni_mentorship_slots(alumni_id, slot_date)',
+        'CREATE INDEX IF NOT EXISTS idx_slots_status_date ON alumni_mentorship_slots(status, slot_date)',
+        'CREATE INDEX IF NOT EXISTS idx_referral_requests_alumni ON referral_requests(alumni_id, created_at)',
+        'CREATE INDEX IF NOT EXISTS idx_mentorship_requests_alumni ON mentorship_requests(alumni_id, requested_at)',
+        'CREATE INDEX IF NOT EXISTS idx_alumni_profiles_batch ON alumni_profiles(batch_year)',
+    )),
+    (5, 'stats counters', _stats_counters),
+    (6, 'resume cache', _resume_cache),
+    (7, 'skill index', _skill_index),
+    (8, 'resume scores', _resume_scores),
+    (9, 'interview panels', _interview_panels),
+    (10, 'interview intervals', _interview_intervals),
+    (11, 'notification unread counts', _notification_unread),
+    (12, 'notification retention', _notification_retention),
+    (13, 'data versions', _data_versions),
+]
+
+LATEST = MIGRATIONS[-1][0]
+
+def migrate(conn=None):
+    """Bring the database up to LATEST. Safe to call from every worker process:
+    the version is re-read under a write lock before each step is applied."""
+    own = conn is None
+    conn = conn or get_db()
+    applied = []
+    try:
+        if conn.execute('PRAGMA user_version').fetchone()[0] >= LATEST:
+            return applied
+        for version, name, step in MIGRATIONS:
+            if conn.in_transaction: conn.commit()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                if conn.execute('PRAGMA user_version').fetchone()[0] >= version:
+                    conn.rollback(); continue
+                if callable(step): step(conn)
+                else:
+                    for sql in step: conn.execute(sql)
+                conn.execute(f'PRAGMA user_version={version}')
+                conn.commit()
+                applied.append(f'{version}: {name}')
+            except Exception:
+                conn.rollback(); raise
+        return applied
+    finally:
+        if own: conn.close()
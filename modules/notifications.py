@@ -1,23 +1,232 @@
-import sqlite3
+import json, os, zlib
+from modules import jobs, events, db
+from modules.db import get_db
+from modules.metrics import NOTIFICATION_FANOUT, NOTIFICATIONS_CREATED
+from modules.placement_engine import get_eligible_students
 
-DB = 'placementpro.db'
+# Fan-outs store their body once in notification_messages and point each row
+# at it (message='', message_id set); one-off notifications keep the text
+# inline. Every read goes through FEED_SQL, which resolves either form.
+FEED_SQL = '''SELECT n.id, n.user_id, COALESCE(m.body, n.message) AS message, n.is_read, n.created_at
+    FROM notifications n LEFT JOIN notification_messages m ON m.id = n.message_id'''
 
-def get_db():
-    conn = sqlite3.connect(DB)
-    conn.row_factory = sqlite3.Row
-    return conn
+def intern_message(conn, body):
+    """Id of `body` in notification_messages, added if new, on the caller's connection."""
+    conn.execute('INSERT INTO notification_messages(body) VALUES(?) ON CONFLICT(body) DO NOTHING', (body,))
+    return conn.execute('SELECT id FROM notification_messages WHERE body=?', (body,)).fetchone()[0]
 
 def create_notification(user_id, message):
     conn = get_db()
     conn.execute('INSERT INTO notifications(user_id, message) VALUES(?,?)', (user_id, message))
     conn.commit()
     conn.close()
+    _count('single', 1)
+    events.publish()
 
-def get_notifications(user_id, limit=10):
+def _count(path, n):
+    NOTIFICATION_FANOUT.observe(n, path=path)
+    NOTIFICATIONS_CREATED.inc(n, path=path)
+
+def create_notifications_bulk(user_ids, message, progress=None, path='bulk'):
+    """Fan one message out to many users in a single transaction (one fsync).
+    `progress(conn)`, if given, runs inside that transaction, so a job's
+    progress commits together with the rows it counts."""
+    if not user_ids: return 0
+    conn = get_db()
+    with conn:
+        mid = intern_message(conn, message)
+        conn.executemany("INSERT INTO notifications(user_id, message, message_id) VALUES(?,'',?)",
+                         [(uid, mid) for uid in user_ids])
+        if progress: progress(conn)
+    conn.close()
+    NOTIFICATIONS_CREATED.inc(len(user_ids), path=path)
+    events.publish()
+    return len(user_ids)
+
+def add_notifications(conn, rows):
+    """Insert (user_id, message) rows on the caller's connection, inside its transaction.
+    Call events.publish() once that transaction commits."""
+    conn.executemany('INSERT INTO notifications(user_id, message) VALUES(?,?)', rows)
+    _count('batch', len(rows))
+    return len(rows)
+
+FEED_MAX_LIMIT = 100
+
+def get_notifications(user_id, limit=10, before_id=None):
+    """Newest-first page of a user's notifications; pass the last id seen as
+    `before_id` for the next page (keyset paging on (user_id, id))."""
+    limit = max(1, min(int(limit), FEED_MAX_LIMIT))
+    conn = get_db()
+    if before_id is None:
+        notifs = conn.execute(f'{FEED_SQL} WHERE n.user_id=? ORDER BY n.id DESC LIMIT ?',
+                              (user_id, limit)).fetchall()
+    else:
+        notifs = conn.execute(f'{FEED_SQL} WHERE n.user_id=? AND n.id<? ORDER BY n.id DESC LIMIT ?',
+                              (user_id, int(before_id), limit)).fetchall()
+    conn.close()
+    return [dict(n) for n in notifs]
+
+def get_notifications_since(user_id, after_id, limit=FEED_MAX_LIMIT):
+    """Notifications newer than `after_id`, oldest first (stream reconnect catch-up)."""
     conn = get_db()
-    notifs = conn.execute(
-        'SELECT * FROM notifications WHERE user_id=? ORDER BY created_at DESC LIMIT ?',
-        (user_id, limit)
-    ).fetchall()
+    notifs = conn.execute(f'{FEED_SQL} WHERE n.user_id=? AND n.id>? ORDER BY n.id LIMIT ?',
+                          (user_id, int(after_id), limit)).fetchall()
     conn.close()
     return [dict(n) for n in notifs]
+
+def unread_notification_count(user_id):
+    """Unread notifications for a user, from the trigger-maintained notification_unread row."""
+    conn = get_db()
+    row = conn.execute('SELECT unread FROM notification_unread WHERE user_id=?', (user_id,)).fetchone()
+    conn.close()
+    return row['unread'] if row else 0
+
+def mark_notifications_read(user_id, ids):
+    """Mark the given notifications of one user read in one statement; returns rows changed."""
+    ids = sorted({int(i) for i in ids})[:FEED_MAX_LIMIT * 10]
+    if not ids: return 0
+    conn = get_db()
+    with conn:
+        changed = conn.execute(f'''UPDATE notifications SET is_read=1
+            WHERE user_id=? AND is_read=0 AND id IN ({",".join("?" * len(ids))})''', (user_id, *ids)).rowcount
+    conn.close()
+    return changed
+
+def mark_all_notifications_read(user_id):
+    conn = get_db()
+    with conn:
+        changed = conn.execute('UPDATE notifications SET is_read=1 WHERE user_id=? AND is_read=0', (user_id,)).rowcount
+    conn.close()
+    return changed
+
+# ── Background broadcasts ─────────────────────────────────────────────
+# TPO announcements run as `notify` jobs: recipients are resolved inside the
+# job and written in chunks, each chunk committed together with the job's
+# progress so a resumed job skips exactly the recipients already notified.
+NOTIFY_CHUNK = 1000
+
+def enqueue_broadcast(audience, drive_id, message, created_by=None):
+    """audience is 'eligible' (students eligible for the drive) or 'applicants'."""
+    return jobs.enqueue('notify', {'audience': audience, 'drive_id': drive_id, 'message': message}, created_by)
+
+def _broadcast_recipients(audience, drive_id):
+    if audience == 'eligible':
+        return sorted(s['user_id'] for s in get_eligible_students(drive_id))
+    conn = get_db()
+    rows = conn.execute('SELECT student_id FROM applications WHERE drive_id=? ORDER BY student_id', (drive_id,)).fetchall()
+    conn.close()
+    return [r['student_id'] for r in rows]
+
+@jobs.handler('notify')
+def _run_broadcast(job):
+    p = job.payload
+    user_ids = _broadcast_recipients(p['audience'], p['drive_id'])
+    job.set_total(len(user_ids))
+    for start in range(job.progress, len(user_ids), NOTIFY_CHUNK):
+        done = min(start + NOTIFY_CHUNK, len(user_ids))
+        create_notifications_bulk(user_ids[start:done], p['message'],
+                                  progress=lambda conn: job.record_progress(conn, done), path='broadcast')
+    NOTIFICATION_FANOUT.observe(len(user_ids), path='broadcast')     # once per broadcast, not per chunk
+    return {'notified': len(user_ids)}
+
+# ── Retention ─────────────────────────────────────────────────────────
+# A daily `notification_retention` job (also startable from the TPO
+# dashboard). It walks the table in id order, which is also created_at
+# order. Repeated inline bodies are moved into notification_messages. Read
+# notifications older than the retention window are packed into
+# zlib-compressed JSON batches in notification_archive and deleted. Then
+# bodies no row references are dropped and the freed pages go back to the
+# filesystem (once `flask enable-incremental-vacuum` has converted a database
+# created before auto_vacuum=INCREMENTAL). Every batch commits on its own, and
+# a batch archives only the rows its own DELETE removed, so an interrupted or
+# overlapping run never archives a row twice. The first scheduled run waits
+# RETENTION_FIRST_RUN after a worker starts, off the deploy's busiest minutes.
+RETENTION_DAYS     = int(os.environ.get('PLACEMENTPRO_NOTIFICATION_RETENTION_DAYS', 90))
+RETENTION_INTERVAL = 24 * 3600
+RETENTION_FIRST_RUN = 3600
+RETENTION_BATCH    = 5000
+DEDUPE_MIN_COPIES  = 3       # an inline body repeated this often is moved to notification_messages
+
+def _dedupe_bodies(conn, job=None):
+    bodies = {r[0] for r in conn.execute('''SELECT message FROM notifications WHERE message_id IS NULL
+        GROUP BY message HAVING COUNT(*) >= ?''', (DEDUPE_MIN_COPIES,))}
+    rows = saved = cursor = 0
+    while bodies:
+        batch = conn.execute('SELECT id, message FROM notifications WHERE id > ? AND message_id IS NULL ORDER BY id LIMIT ?',
+                             (cursor, RETENTION_BATCH)).fetchall()
+        if not batch: break
+        cursor = batch[-1]['id']
+        with conn:
+            ids = {b: intern_message(conn, b) for b in {r['message'] for r in batch} & bodies}
+            moved = [(ids[r['message']], r['id']) for r in batch if r['message'] in ids]
+            conn.executemany("UPDATE notifications SET message='', message_id=? WHERE id=?", moved)
+        rows += len(moved)
+        saved += sum(len(r['message'].encode()) for r in batch if r['message'] in ids)
+        if job: job.heartbeat()
+    return rows, saved
+
+def _pack(rows):
+    messages, index, packed = [], {}, []
+    for r in rows:
+        i = index.get(r['message'])
+        if i is None:
+            i = index[r['message']] = len(messages); messages.append(r['message'])
+        packed.append([r['id'], r['user_id'], i, r['created_at']])
+    return json.dumps({'messages': messages, 'rows': packed}, separators=(',', ':')).encode()
+
+def _archive_read(conn, days, job=None):
+    cutoff = conn.execute("SELECT datetime('now', ?)", (f'-{int(days)} days',)).fetchone()[0]
+    rows = raw = packed = cursor = 0
+    while True:
+        batch = conn.execute(f'{FEED_SQL} WHERE n.id > ? ORDER BY n.id LIMIT ?', (cursor, RETENTION_BATCH)).fetchall()
+        fresh = next((i for i, r in enumerate(batch) if r['created_at'] >= cutoff), None)
+        old = [r for r in batch[:fresh] if r['is_read']]
+        if old:
+            with conn:
+                deleted = {r[0] for r in conn.execute(f'DELETE FROM notifications WHERE id IN ({",".join("?" * len(old))}) RETURNING id',
+                                                      [r['id'] for r in old])}
+                old = [r for r in old if r['id'] in deleted]
+                if old:
+                    data = _pack(old)
+                    blob = zlib.compress(data, 9)
+                    conn.execute('INSERT INTO notification_archive(first_id, last_id, row_count, raw_bytes, data) VALUES(?,?,?,?,?)',
+                                 (old[0]['id'], old[-1]['id'], len(old), len(data), blob))
+                    rows, raw, packed = rows + len(old), raw + len(data), packed + len(blob)
+                if job: job.record_progress(conn, rows)
+        if fresh is not None or len(batch) < RETENTION_BATCH:
+            return rows, raw, packed
+        cursor = batch[-1]['id']
+
+def read_archive(archive_id):
+    """The notifications stored in one notification_archive batch, as feed dicts."""
+    conn = get_db()
+    row = conn.execute('SELECT data FROM notification_archive WHERE id=?', (archive_id,)).fetchone()
+    conn.close()
+    if not row: return []
+    data = json.loads(zlib.decompress(row['data']))
+    return [{'id': i, 'user_id': u, 'message': data['messages'][m], 'is_read': 1, 'created_at': c}
+            for i, u, m, c in data['rows']]
+
+def compact_notifications(days=RETENTION_DAYS, job=None):
+    """Dedupe bodies, archive old read notifications and reclaim the space; returns the report."""
+    conn = get_db()
+    try:
+        before = db.database_bytes(conn)
+        deduped, dedupe_bytes = _dedupe_bodies(conn, job)
+        archived, raw, packed = _archive_read(conn, days, job)
+        with conn:
+            pruned = conn.execute('''DELETE FROM notification_messages WHERE id NOT IN
+                (SELECT message_id FROM notifications WHERE message_id IS NOT NULL)''').rowcount
+        db.incremental_vacuum(conn, job.heartbeat if job else None)
+        after = db.database_bytes(conn)
+        return {'deduplicated': deduped, 'dedupe_bytes': dedupe_bytes, 'archived': archived,
+                'archive_raw_bytes': raw, 'archive_bytes': packed, 'messages_pruned': pruned,
+                'db_bytes_before': before, 'db_bytes_after': after, 'reclaimed_bytes': max(0, before - after)}
+    finally:
+        conn.close()
+
+jobs.every('notification_retention', RETENTION_INTERVAL, first_after=RETENTION_FIRST_RUN)
+
+@jobs.handler('notification_retention')
+def _run_retention(job):
+    return compact_notifications(job.payload.get('days', RETENTION_DAYS), job)
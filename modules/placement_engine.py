@@ -1,51 +1,292 @@
-import sqlite3, json
+import json, bisect, heapq, re, threading, time
+from datetime import date
+import numpy as np
+from modules.db import get_db
+from modules.metrics import ELIGIBILITY_SECONDS, ELIGIBILITY_RESULTS
+from modules.analytics import ROLE_SKILLS, refresh_resume_scores, data_version
+from modules.skills import CANONICAL, canonical_skills
 
-DB = 'placementpro.db'
+# Eligibility runs entirely in SQL: student_profiles is the outer loop, read
+# as a cgpa range on idx_sp_cgpa, and allowed_branches is matched with JSON1
+# json_each instead of decoding the array in Python for every row. The unary
+# + on u.role keeps the planner from starting at users through
+# idx_users_role_name (every student, then a profile lookup each), which it
+# prefers without ANALYZE statistics; benchmarks.check_query_plans pins the plan.
+# An empty allowed_branches array means "all branches".
 
-def get_db():
-    conn = sqlite3.connect(DB)
-    conn.row_factory = sqlite3.Row
-    return conn
+ELIGIBLE_STUDENTS = '''FROM drives d
+        JOIN student_profiles sp ON sp.cgpa >= d.min_cgpa AND sp.backlogs <= d.max_backlogs
+            AND (json_array_length(d.allowed_branches) = 0
+                 OR sp.branch IN (SELECT value FROM json_each(d.allowed_branches)))
+        JOIN users u ON u.id = sp.user_id AND +u.role = 'student' '''
+
+ELIGIBLE_STUDENTS_SQL = f'''SELECT u.id as user_id, u.name, u.email, sp.cgpa, sp.backlogs, sp.branch, sp.skills
+        {ELIGIBLE_STUDENTS}
+        WHERE d.id = ?'''
 
 def get_eligible_students(drive_id):
-    conn = get_db()
-    drive = conn.execute('SELECT * FROM drives WHERE id=?', (drive_id,)).fetchone()
-    if not drive: conn.close(); return []
-    allowed = json.loads(drive['allowed_branches'])
-    students = conn.execute('''SELECT u.id as user_id, u.name, u.email, sp.cgpa, sp.backlogs, sp.branch, sp.skills
-        FROM users u JOIN student_profiles sp ON u.id = sp.user_id WHERE u.role = 'student' ''').fetchall()
-    conn.close()
-    eligible = []
-    for s in students:
-        if (s['cgpa'] >= drive['min_cgpa'] and
-            s['backlogs'] <= drive['max_backlogs'] and
-            (not allowed or s['branch'] in allowed)):
-            eligible.append(dict(s))
-    return eligible
+    with ELIGIBILITY_SECONDS.time(query='students'):
+        conn = get_db()
+        students = conn.execute(ELIGIBLE_STUDENTS_SQL, (drive_id,)).fetchall()
+        conn.close()
+    ELIGIBILITY_RESULTS.observe(len(students), query='students')
+    return [dict(s) for s in students]
 
 def get_eligible_drives(student_id):
-    conn = get_db()
-    profile = conn.execute('SELECT * FROM student_profiles WHERE user_id=?', (student_id,)).fetchone()
-    if not profile: conn.close(); return []
-    # Only active drives
-    drives = conn.execute("SELECT * FROM drives WHERE status='active' ORDER BY created_at DESC").fetchall()
-    conn.close()
-    eligible = []
-    for d in drives:
-        allowed = json.loads(d['allowed_branches'])
-        if (profile['cgpa'] >= d['min_cgpa'] and
-            profile['backlogs'] <= d['max_backlogs'] and
-            (not allowed or profile['branch'] in allowed)):
-            eligible.append(dict(d))
-    return eligible
+    with ELIGIBILITY_SECONDS.time(query='drives'):
+        conn = get_db()
+        # Only active drives
+        drives = conn.execute('''SELECT d.* FROM student_profiles sp
+            JOIN drives d ON d.status = 'active' AND d.min_cgpa <= sp.cgpa AND d.max_backlogs >= sp.backlogs
+                AND (json_array_length(d.allowed_branches) = 0
+                     OR EXISTS (SELECT 1 FROM json_each(d.allowed_branches) WHERE value = sp.branch))
+            WHERE sp.user_id = ?
+            ORDER BY d.created_at DESC''', (student_id,)).fetchall()
+        conn.close()
+    ELIGIBILITY_RESULTS.observe(len(drives), query='drives')
+    return [dict(d) for d in drives]
+
+# ── In-memory eligibility index for the live create-drive preview ─────
+# branch -> {backlogs -> sorted list of cgpa}. Backlog counts take only a
+# handful of distinct values, so a count is one bisect per backlog bucket
+# summed over the buckets <= max_backlogs. The index is rebuilt lazily after
+# invalidate_eligibility_index(), when the cohort's data version moves (a
+# profile edit through any worker process), or INDEX_TTL seconds after a build.
+INDEX_TTL = 60
+
+_index = None
+_index_built_at = 0.0
+_index_version = None
+_index_lock = threading.Lock()
+
+def invalidate_eligibility_index():
+    global _index
+    with _index_lock:
+        _index = None
+
+def _load_index():
+    global _index, _index_built_at, _index_version
+    with _index_lock:
+        conn = get_db()
+        version = data_version('profiles', conn)
+        if _index is not None and _index_version == version and time.monotonic() - _index_built_at < INDEX_TTL:
+            conn.close()
+            return _index
+        rows = conn.execute('SELECT branch, backlogs, cgpa FROM student_profiles ORDER BY cgpa').fetchall()
+        conn.close()
+        index = {}
+        for branch, backlogs, cgpa in rows:
+            index.setdefault(branch or '', {}).setdefault(backlogs or 0, []).append(cgpa or 0)
+        _index, _index_built_at, _index_version = index, time.monotonic(), version
+        return index
+
+def _count_at_least(buckets, min_cgpa, max_backlogs):
+    return sum(len(cgpas) - bisect.bisect_left(cgpas, min_cgpa)
+               for backlogs, cgpas in buckets.items() if backlogs <= max_backlogs)
 
 def count_eligible_preview(min_cgpa, max_backlogs, branches):
+    with ELIGIBILITY_SECONDS.time(query='preview'):
+        index = _load_index()
+        selected = [index[b] for b in set(branches) if b in index] if branches else index.values()
+        count = sum(_count_at_least(buckets, min_cgpa, max_backlogs) for buckets in selected)
+    ELIGIBILITY_RESULTS.observe(count, query='preview')
+    return count
+
+def eligible_histogram(max_backlogs, branches, thresholds):
+    """Eligible-student counts per branch for every cgpa threshold in one pass."""
+    index = _load_index()
+    names = branches or sorted(index)
+    return {b: [_count_at_least(index.get(b, {}), t, max_backlogs) for t in thresholds] for b in names}
+
+# ── Drive ranking for the student feed ────────────────────────────────
+# Each active drive is reduced once to a feature row: a boolean vector of the
+# skills it asks for (ROLE_SKILLS for the role it names, plus any known skill
+# mentioned in the role or description), its package, and its deadline.
+# Ranking a student's eligible drives is then a gather plus one dot product.
+# Same lifecycle as the eligibility index: rebuilt after
+# invalidate_drive_features(), when the drive set's version moves, or
+# FEATURES_TTL seconds (deadline urgency changes with the date).
+FEATURES_TTL = 60
+RANK_WEIGHTS = {'skills': 0.6, 'package': 0.25, 'deadline': 0.15}
+DEADLINE_HORIZON = 14      # days; closing today scores 1, in two weeks or more ~0
+
+ROLE_ALIASES = {
+    'sde': 'Software Engineer', 'software developer': 'Software Engineer', 'backend': 'Software Engineer',
+    'full stack': 'Full Stack Developer', 'frontend': 'Full Stack Developer', 'web developer': 'Full Stack Developer',
+    'devops': 'DevOps Engineer', 'cloud': 'DevOps Engineer', 'site reliability': 'DevOps Engineer',
+    'machine learning': 'ML Engineer', 'data scientist': 'ML Engineer', 'ai engineer': 'ML Engineer',
+    'analyst': 'Data Analyst', 'business intelligence': 'Data Analyst',
+}
+SKILL_VOCAB = sorted(set(CANONICAL.values()))
+_SKILL_POS  = {s: i for i, s in enumerate(SKILL_VOCAB)}
+_WORD = re.compile(r'[A-Za-z0-9+#./-]+')
+# Names only (no aliases): "rest of the team" or "send your CV" must not read as skills.
+_NAMES = {re.sub(r'[\s./\-_]+', '', s.lower()): s for s in SKILL_VOCAB if len(s) > 1}
+
+_features = None
+_features_built_at = 0.0
+_features_version = None
+_features_lock = threading.Lock()
+
+def drive_skills(role, description=''):
+    """Canonical skills a drive is looking for: the ROLE_SKILLS of any role its title
+    names, plus every known skill mentioned in the title or description."""
+    text = f'{role or ""} {description or ""}'
+    lowered = ' '.join((role or '').lower().split())
+    found = []
+    for name, skills in ROLE_SKILLS.items():
+        if name.lower() in lowered: found += skills
+    for alias, name in ROLE_ALIASES.items():
+        if alias in lowered: found += ROLE_SKILLS[name]
+    words = _WORD.findall(text)
+    for n in (1, 2, 3):
+        for i in range(len(words) - n + 1):
+            key = re.sub(r'[./\-]+', '', ''.join(words[i:i + n]).lower())
+            if key not in _NAMES and key.endswith('js'): key = key[:-2]      # React.js
+            if key in _NAMES: found.append(_NAMES[key])
+    return canonical_skills(found)
+
+def skill_vector(skills):
+    vec = np.zeros(len(SKILL_VOCAB), dtype=np.float32)
+    for s in canonical_skills(skills):
+        i = _SKILL_POS.get(s)
+        if i is not None: vec[i] = 1
+    return vec
+
+def invalidate_drive_features():
+    global _features
+    with _features_lock:
+        _features = None
+
+def _deadline_days(deadline, today):
+    try: return (date.fromisoformat(str(deadline)[:10]) - today).days
+    except ValueError: return None
+
+def _load_features():
+    global _features, _features_built_at, _features_version
+    with _features_lock:
+        conn = get_db()
+        version = data_version('drives', conn)
+        if _features is not None and _features_version == version and time.monotonic() - _features_built_at < FEATURES_TTL:
+            conn.close()
+            return _features
+        rows = conn.execute("SELECT id, role, description, package_lpa, deadline FROM drives WHERE status='active'").fetchall()
+        conn.close()
+        today = date.today()
+        skills = np.zeros((len(rows), len(SKILL_VOCAB)), dtype=np.float32)
+        package = np.zeros(len(rows), dtype=np.float32)
+        urgency = np.zeros(len(rows), dtype=np.float32)
+        for i, r in enumerate(rows):
+            for s in drive_skills(r['role'], r['description']): skills[i, _SKILL_POS[s]] = 1
+            package[i] = r['package_lpa'] or 0
+            days = _deadline_days(r['deadline'], today) if r['deadline'] else None
+            if days is not None and days >= 0:
+                urgency[i] = max(0.0, 1 - days / DEADLINE_HORIZON)
+        required = skills.sum(axis=1)
+        _features = {
+            'row': {r['id']: i for i, r in enumerate(rows)},
+            'skills': skills,
+            # fraction of the drive's skills the student has = (skills @ student) / required
+            'inv_required': np.divide(1, required, out=np.zeros_like(required), where=required > 0),
+            'package': package / package.max() if len(rows) and package.max() > 0 else package,
+            'urgency': urgency,
+        }
+        _features_built_at, _features_version = time.monotonic(), version
+        return _features
+
+def rank_drives(student_skills, drives, weights=None):
+    """Sort eligible drives best match first, adding `score`, `skill_match` (%) and `matched_skills`."""
+    if not drives: return drives
+    w = {**RANK_WEIGHTS, **(weights or {})}
+    f = _load_features()
+    rows = np.fromiter((f['row'].get(d['id'], -1) for d in drives), dtype=np.int64, count=len(drives))
+    known = rows >= 0
+    idx = np.where(known, rows, 0)
+    student = skill_vector(student_skills)
+    hits = f['skills'][idx] * student * known[:, None]
+    match = hits.sum(axis=1) * f['inv_required'][idx]
+    score = (w['skills'] * match + w['package'] * f['package'][idx] + w['deadline'] * f['urgency'][idx]) * known
+    matched = [[] for _ in drives]
+    for i, j in zip(*np.nonzero(hits)): matched[i].append(SKILL_VOCAB[j])
+    pct = (match * 100 + 0.5).astype(np.int64).tolist()
+    score = score.astype(np.float64).round(3).tolist()
+    return [dict(drives[i], score=score[i], skill_match=pct[i], matched_skills=matched[i])
+            for i in sorted(range(len(drives)), key=score.__getitem__, reverse=True)]
+
+def get_ranked_drives(student_id, student_skills=None):
+    """get_eligible_drives() for the student, ranked by rank_drives()."""
+    if student_skills is None:
+        conn = get_db()
+        row = conn.execute('SELECT skills FROM student_profiles WHERE user_id=?', (student_id,)).fetchone()
+        conn.close()
+        try: student_skills = json.loads(row['skills'] or '[]') if row else []
+        except ValueError: student_skills = []
+    return rank_drives(student_skills, get_eligible_drives(student_id))
+
+# ── Candidate shortlist for a drive ───────────────────────────────────
+# Per drive, the eligible cohort is turned into parallel arrays (cgpa, skill
+# match against the drive, resume score, application stage), each scaled to
+# 0..1. A shortlist request only applies its weights and pulls the top
+# offset+limit with heapq — the full cohort is never sorted. Arrays are cached
+# per drive until invalidate_shortlists() or SHORTLIST_TTL seconds.
+SHORTLIST_TTL = 60
+SHORTLIST_WEIGHTS = {'cgpa': 0.35, 'skills': 0.35, 'resume': 0.2, 'status': 0.1}
+# How far along the drive's process a candidate already is; rejected
+# applicants are dropped from the shortlist altogether.
+STATUS_SCORE = {None: 0.0, 'applied': 0.4, 'aptitude': 0.6, 'technical': 0.7, 'hr': 0.8,
+                'interview_scheduled': 0.9, 'selected': 1.0}
+
+_shortlists = {}
+_shortlists_lock = threading.Lock()
+
+def invalidate_shortlists(drive_id=None):
+    with _shortlists_lock:
+        if drive_id is None: _shortlists.clear()
+        else: _shortlists.pop(drive_id, None)
+
+SHORTLIST_SQL = f'''SELECT sp.*, u.name, u.email, a.id as app_id, a.status
+        {ELIGIBLE_STUDENTS}
+        LEFT JOIN applications a ON a.drive_id = d.id AND a.student_id = u.id
+        WHERE d.id = ? AND COALESCE(a.status, '') != 'rejected' '''
+
+def _shortlist_features(drive_id):
+    with _shortlists_lock:
+        cached = _shortlists.get(drive_id)
+        if cached and time.monotonic() - cached[0] < SHORTLIST_TTL:
+            return cached[1]
+    refresh_resume_scores()
     conn = get_db()
-    students = conn.execute('SELECT sp.cgpa, sp.backlogs, sp.branch FROM student_profiles sp').fetchall()
+    drive = conn.execute('SELECT role, description FROM drives WHERE id=?', (drive_id,)).fetchone()
+    rows = conn.execute(SHORTLIST_SQL, (drive_id,)).fetchall()
     conn.close()
-    count = 0
-    for s in students:
-        if (s['cgpa'] >= min_cgpa and s['backlogs'] <= max_backlogs and
-            (not branches or s['branch'] in branches)):
-            count += 1
-    return count
+    wanted = set(drive_skills(drive['role'], drive['description'])) if drive else set()
+    skills = np.zeros(len(rows), dtype=np.float32)
+    for i, r in enumerate(rows):
+        try: have = json.loads(r['skills'] or '[]')
+        except ValueError: have = []
+        if wanted: skills[i] = len(wanted.intersection(canonical_skills(have))) / len(wanted)
+    features = {
+        'students': [{'user_id': r['user_id'], 'name': r['name'], 'email': r['email'], 'cgpa': r['cgpa'],
+                      'branch': r['branch'], 'app_id': r['app_id'], 'status': r['status']} for r in rows],
+        'cgpa': np.array([(r['cgpa'] or 0) / 10 for r in rows], dtype=np.float32),
+        'skills': skills,
+        'resume': np.array([(r['resume_score'] or 0) / 100 for r in rows], dtype=np.float32),
+        'status': np.array([STATUS_SCORE.get(r['status'], 0.0) for r in rows], dtype=np.float32),
+    }
+    with _shortlists_lock:
+        _shortlists[drive_id] = (time.monotonic(), features)
+    return features
+
+def shortlist_candidates(drive_id, limit=20, offset=0, weights=None):
+    """Page `offset:offset+limit` of the drive's eligible students, best score first."""
+    w = {**SHORTLIST_WEIGHTS, **(weights or {})}
+    f = _shortlist_features(drive_id)
+    scores = (w['cgpa'] * f['cgpa'] + w['skills'] * f['skills']
+              + w['resume'] * f['resume'] + w['status'] * f['status']).astype(np.float64)
+    scores = scores.tolist()
+    top = heapq.nlargest(offset + limit, range(len(scores)), key=scores.__getitem__)[offset:]
+    candidates = []
+    for rank, i in enumerate(top, start=offset + 1):
+        candidates.append({**f['students'][i], 'rank': rank, 'score': round(scores[i], 3),
+            'skill_match': int(f['skills'][i] * 100 + 0.5), 'resume_score': int(f['resume'][i] * 100 + 0.5)})
+    return {'total': len(scores), 'offset': offset, 'limit': limit, 'weights': w, 'candidates': candidates}
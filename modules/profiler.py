@@ -0,0 +1,165 @@
+import json, logging, os, random, sqlite3, sys, threading, time
+from collections import deque
+from modules import db
+
+# Per-request query profiling on top of the shared connection. A profiled
+# request attaches a RequestProfile to its thread (db.profile), which times
+# every execute/executemany plus the fetches on the cursors they return, and
+# counts connections opened and get_db() checkouts. finish() turns it into a
+# record that goes to the `placementpro.perf` log as one JSON line, to the
+# ring buffer behind /debug/perf, and into per-route aggregates.
+#
+# Which requests are profiled: a fraction SAMPLE_RATE of them
+# (PLACEMENTPRO_PROFILE_SAMPLE, default 0), plus any request carrying
+# ?profile=1. An unsampled request costs one random() call, and each of its
+# statements one thread-local lookup.
+SAMPLE_RATE     = float(os.environ.get('PLACEMENTPRO_PROFILE_SAMPLE', 0))
+SLOW_REQUEST_MS = 250      # logged at WARNING above this
+SLOWEST         = 5        # statements kept per request
+N_PLUS_ONE      = 10       # one statement run this many times in a request is flagged
+RECENT_SIZE     = 200
+ROUTE_WINDOW    = 500      # request times kept per route for percentiles
+
+log = logging.getLogger('placementpro.perf')
+
+_recent = deque(maxlen=RECENT_SIZE)
+_routes = {}               # endpoint -> {'count', 'queries', 'sql_ms', 'max_queries', 'ms': deque}
+_lock = threading.Lock()
+_HERE = (os.path.abspath(__file__), os.path.abspath(db.__file__))
+_ROOT = os.path.dirname(os.path.dirname(_HERE[0]))
+
+def _call_site():
+    """Innermost caller outside the db layer, and the route frame in app.py above it."""
+    f, inner, route = sys._getframe(1), None, None
+    while f is not None:
+        path = os.path.abspath(f.f_code.co_filename)
+        if path not in _HERE and 'sqlite3' not in path:
+            where = f'{os.path.relpath(path, _ROOT)}:{f.f_lineno} {f.f_code.co_name}'
+            if inner is None: inner = where
+            if os.path.basename(path) == 'app.py':
+                route = where; break
+        f = f.f_back
+    return inner if route in (None, inner) else f'{inner} <- {route}'
+
+class TimedCursor(sqlite3.Cursor):
+    """Adds row-fetch time to the statement that produced the cursor."""
+    def _add(self, t):
+        self.stat[1] += time.perf_counter() - t
+
+    def fetchone(self):
+        t = time.perf_counter()
+        try: return super().fetchone()
+        finally: self._add(t)
+
+    def fetchmany(self, *args):
+        t = time.perf_counter()
+        try: return super().fetchmany(*args)
+        finally: self._add(t)
+
+    def fetchall(self):
+        t = time.perf_counter()
+        try: return super().fetchall()
+        finally: self._add(t)
+
+    def __next__(self):
+        t = time.perf_counter()
+        try: return super().__next__()
+        finally: self._add(t)
+
+class RequestProfile:
+    def __init__(self, route, method='', path=''):
+        self.route, self.method, self.path = route, method, path
+        self.started = time.perf_counter()
+        self.connections = self.checkouts = 0
+        self.stats = {}        # normalised sql -> [count, seconds, slowest, call site]
+
+    def _stat(self, sql):
+        key = ' '.join(sql.split())
+        stat = self.stats.get(key)
+        if stat is None:
+            stat = self.stats[key] = [0, 0.0, 0.0, _call_site()]
+        stat[0] += 1
+        return stat
+
+    def _run(self, method, conn, sql, params):
+        stat = self._stat(sql)
+        cur = conn.cursor(TimedCursor)
+        cur.stat = stat
+        t = time.perf_counter()
+        try: return method(cur, sql, params)
+        finally:
+            dt = time.perf_counter() - t
+            stat[1] += dt
+            stat[2] = max(stat[2], dt)
+
+    def execute(self, conn, sql, params):
+        return self._run(sqlite3.Cursor.execute, conn, sql, params)
+
+    def executemany(self, conn, sql, seq):
+        return self._run(sqlite3.Cursor.executemany, conn, sql, seq)
+
+    def summary(self, status=None):
+        ms = lambda s: round(s * 1000, 2)
+        stats = self.stats.items()
+        return {
+            'route': self.route, 'method': self.method, 'path': self.path, 'status': status,
+            'ms': ms(time.perf_counter() - self.started),
+            'queries': sum(s[0] for _, s in stats),
+            'distinct': len(self.stats),
+            'sql_ms': ms(sum(s[1] for _, s in stats)),
+            'connections': self.connections, 'checkouts': self.checkouts,
+            'slowest': [{'sql': sql[:200], 'count': s[0], 'ms': ms(s[1]), 'max_ms': ms(s[2]), 'where': s[3]}
+                        for sql, s in sorted(stats, key=lambda kv: -kv[1][1])[:SLOWEST]],
+            'n_plus_one': [{'sql': sql[:200], 'count': s[0], 'ms': ms(s[1]), 'where': s[3]}
+                           for sql, s in stats if s[0] >= N_PLUS_ONE],
+        }
+
+def start(route, method='', path='', force=False):
+    """Profile this thread's current request if forced or sampled; returns the profile or None."""
+    if not force and (SAMPLE_RATE <= 0 or random.random() >= SAMPLE_RATE): return None
+    prof = RequestProfile(route, method, path)
+    db.profile(prof)
+    return prof
+
+def stop():
+    db.profile(None)
+
+def finish(prof, status=None):
+    """Detach the profile, record it and return its summary."""
+    stop()
+    rec = prof.summary(status)
+    with _lock:
+        _recent.append(rec)
+        r = _routes.get(rec['route'])
+        if r is None:
+            r = _routes[rec['route']] = {'count': 0, 'queries': 0, 'sql_ms': 0.0, 'max_queries': 0,
+                                         'n_plus_one': 0, 'ms': deque(maxlen=ROUTE_WINDOW)}
+        r['count'] += 1
+        r['queries'] += rec['queries']
+        r['sql_ms'] += rec['sql_ms']
+        r['max_queries'] = max(r['max_queries'], rec['queries'])
+        r['n_plus_one'] += bool(rec['n_plus_one'])
+        r['ms'].append(rec['ms'])
+    slow = rec['ms'] >= SLOW_REQUEST_MS or rec['n_plus_one']
+    log.log(logging.WARNING if slow else logging.INFO, json.dumps(rec, ensure_ascii=False))
+    return rec
+
+def _pct(values, p):
+    return values[min(len(values) - 1, int(len(values) * p))] if values else 0
+
+def report(recent=50):
+    """Per-route aggregates (slowest p95 first) and the most recent profiled requests."""
+    with _lock:
+        routes = []
+        for route, r in _routes.items():
+            ms = sorted(r['ms'])
+            routes.append({'route': route, 'requests': r['count'], 'p50_ms': _pct(ms, .5), 'p95_ms': _pct(ms, .95),
+                           'max_ms': ms[-1], 'avg_queries': round(r['queries'] / r['count'], 1),
+                           'max_queries': r['max_queries'], 'avg_sql_ms': round(r['sql_ms'] / r['count'], 2),
+                           'n_plus_one_requests': r['n_plus_one']})
+        last = list(_recent)[-recent:][::-1]
+    return {'sample_rate': SAMPLE_RATE, 'routes': sorted(routes, key=lambda r: -r['p95_ms']), 'recent': last}
+
+def reset():
+    with _lock:
+        _recent.clear(); _routes.clear()
@@ -1,4 +1,9 @@
-import json, os
+import json, os, io, zipfile, hashlib, tempfile, time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import multiprocessing
+from modules import jobs
+from modules.db import get_db
+from modules.metrics import RESUME_RENDER_SECONDS, RESUME_PDF_BYTES, RESUME_REQUESTS
 from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
 from reportlab.lib.units import mm
@@ -28,11 +33,155 @@ def safe(row, key, default=''):
         return val if val is not None else default
     except: return default
 
+# ── Rendered-PDF cache ────────────────────────────────────────────────
+# Files are content-addressed (<sha256>.pdf), so identical resumes share one
+# file and a finished file is never rewritten in place. resume_meta records,
+# per student, the hash of the inputs the PDF was rendered from; bump
+# TEMPLATE_VERSION whenever the layout below changes to invalidate every entry.
+# A file's mtime is when it was rendered (served as Last-Modified) and its
+# atime when it was last served (what eviction goes by). The files carry each
+# student's contact details, so they live outside static/ and are served only
+# through the session-checked resume_file route.
+TEMPLATE_VERSION = 1
+CACHE_DIR        = 'instance/resume_cache'
+CACHE_MAX_BYTES  = int(os.environ.get('PLACEMENTPRO_RESUME_CACHE_MB', 200)) * 1024 * 1024
+USER_FIELDS      = ('name', 'email')
+PROFILE_FIELDS   = ('skills', 'projects', 'certificates', 'phone', 'linkedin', 'branch', 'cgpa', 'dob')
+
+def resume_input_hash(user, profile):
+    """Hash of exactly the fields render_resume_pdf reads, plus the template version."""
+    fields = {'v': TEMPLATE_VERSION,
+              'user': [safe(user, k) for k in USER_FIELDS],
+              'profile': [safe(profile, k) for k in PROFILE_FIELDS]}
+    return hashlib.sha256(json.dumps(fields, sort_keys=True, default=str).encode()).hexdigest()
+
+def _cache_path(content_hash):
+    return os.path.join(CACHE_DIR, f'{content_hash}.pdf')
+
+def _touch(path):
+    """Mark as recently served without moving mtime. False if the file is gone;
+    eviction may delete it at any moment, so callers never check first."""
+    try:
+        os.utime(path, (time.time(), os.stat(path).st_mtime))
+        return True
+    except FileNotFoundError:
+        return False
+
+def _write_atomic(path, data):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as f: f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp): os.remove(tmp)
+        raise
+
+def evict_resume_cache(max_bytes=None):
+    """Delete least-recently-served PDFs until the cache fits in max_bytes. Returns files removed."""
+    max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    if not os.path.isdir(CACHE_DIR): return 0
+    entries = []
+    for entry in os.scandir(CACHE_DIR):
+        if entry.name.endswith('.pdf'):
+            st = entry.stat()
+            entries.append((st.st_atime, st.st_size, entry.path))
+    used, removed = sum(e[1] for e in entries), 0
+    for _, size, path in sorted(entries):
+        if used <= max_bytes: break
+        try: os.remove(path)
+        except FileNotFoundError: pass
+        used -= size; removed += 1
+    return removed
+
 def generate_resume_pdf(user, profile):
-    os.makedirs('static/resumes', exist_ok=True)
-    uid = user['id'] if user else 'unknown'
-    filepath = f"static/resumes/resume_{uid}.pdf"
+    """Path to the student's resume PDF, rendering it only if the inputs changed."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    uid = user['id']
+    input_hash = resume_input_hash(user, profile)
+    conn = get_db()
+    meta = conn.execute('SELECT input_hash, template_version, content_hash FROM resume_meta WHERE student_id=?',
+        (uid,)).fetchone()
+    conn.close()
+    if meta and meta['input_hash'] == input_hash and meta['template_version'] == TEMPLATE_VERSION:
+        path = _cache_path(meta['content_hash'])
+        if _touch(path):
+            RESUME_REQUESTS.inc(cache='hit')
+            return path
+
+    RESUME_REQUESTS.inc(cache='miss')
+    with RESUME_RENDER_SECONDS.time(mode='single'):
+        pdf = render_resume_pdf(user, profile)
+    RESUME_PDF_BYTES.observe(len(pdf), mode='single')
+    content_hash = hashlib.sha256(pdf).hexdigest()
+    path = _cache_path(content_hash)
+    if not _touch(path): _write_atomic(path, pdf)
+
+    conn = get_db()
+    conn.execute('''INSERT INTO resume_meta(student_id, file_path, input_hash, template_version, content_hash)
+        VALUES(?,?,?,?,?) ON CONFLICT(student_id) DO UPDATE SET file_path=excluded.file_path,
+        input_hash=excluded.input_hash, template_version=excluded.template_version,
+        content_hash=excluded.content_hash, generated_at=CURRENT_TIMESTAMP''',
+        (uid, path, input_hash, TEMPLATE_VERSION, content_hash))
+    conn.commit(); conn.close()
+    evict_resume_cache()
+    return path
+
+def resume_content_hash(path):
+    """The content hash a cached PDF is stored under (its file name)."""
+    return os.path.basename(path)[:-len('.pdf')]
+
+def cached_resume_path(student_id, content_hash):
+    """Path of the student's current resume if its content hash is `content_hash`
+    and the file is still cached, else None."""
+    conn = get_db()
+    meta = conn.execute('SELECT content_hash FROM resume_meta WHERE student_id=?', (student_id,)).fetchone()
+    conn.close()
+    if not meta or meta['content_hash'] != content_hash: return None
+    path = _cache_path(content_hash)
+    return path if _touch(path) else None
 
+# ── Styles: built once per process and shared by every render ─────────
+LM = RM = TM = BM = 18*mm
+TW = W - LM - RM   # total usable width  ≈ 159 mm
+
+STYLES = {
+    'hname':    ps('hname', fontName='Helvetica-Bold', fontSize=22, textColor=BLACK, leading=26, alignment=TA_LEFT),
+    'hcontact': ps('hcontact', fontSize=9.5, textColor=MUTED, leading=13),
+    'sh':       ps('sh', fontName='Helvetica-Bold', fontSize=9, textColor=BLACK, leading=12, letterSpacing=1.5),
+    'ab':       ps('ab', fontSize=9.5, textColor=TEXT, leading=14.5, alignment=TA_JUSTIFY),
+    'pname':    ps('pname', fontName='Helvetica-Bold', fontSize=10, textColor=DARK, leading=13),
+    'ptype':    ps('ptype', fontSize=9, textColor=MUTED, leading=13, alignment=TA_RIGHT),
+    'purl':     ps('purl', fontSize=8.5, textColor=MUTED, leading=11),
+    'pdesc':    ps('pdesc', fontSize=9.5, textColor=TEXT, leading=14, leftIndent=4*mm),
+    'edeg':     ps('edeg', fontName='Helvetica-Bold', fontSize=10, textColor=DARK, leading=13),
+    'eyear':    ps('eyear', fontSize=9.5, textColor=MUTED, leading=13, alignment=TA_RIGHT),
+    'euni':     ps('euni', fontSize=9.5, textColor=MUTED, leading=13),
+    'ecgpa':    ps('ecgpa', fontSize=9.5, textColor=TEXT, leading=13),
+    'ctitle':   ps('ctitle', fontName='Helvetica-Bold', fontSize=10, textColor=DARK, leading=13),
+    'cyear':    ps('cyear', fontSize=9, textColor=MUTED, leading=13, alignment=TA_RIGHT),
+    'ciss':     ps('ciss', fontSize=9.5, textColor=MUTED, leading=12),
+    'skline':   ps('skline', fontSize=9.5, textColor=TEXT, leading=14.5),
+    'decl':     ps('decl', fontSize=8, textColor=MUTED, leading=11),
+    's1':       ps('s1', fontSize=8.5, textColor=MUTED),
+    's2':       ps('s2', fontSize=8.5, textColor=MUTED, alignment=TA_CENTER),
+    's3':       ps('s3', fontSize=8.5, textColor=DARK, alignment=TA_RIGHT),
+}
+
+# Two-column "title ........ date" rows: no padding, vertically centred
+ROW_STYLE = TableStyle([
+    ('VALIGN',(0,0),(-1,-1),'MIDDLE'),
+    ('LEFTPADDING',(0,0),(-1,-1),0),
+    ('RIGHTPADDING',(0,0),(-1,-1),0),
+    ('TOPPADDING',(0,0),(-1,-1),0),
+    ('BOTTOMPADDING',(0,0),(-1,-1),0),
+])
+SIGNATURE_STYLE = TableStyle([
+    ('LEFTPADDING',(0,0),(-1,-1),0),
+    ('RIGHTPADDING',(0,0),(-1,-1),0),
+])
+
+def resume_fields(user, profile):
+    """Everything the template reads, pulled out of the user/profile rows once."""
     def load_json(key):
         try:
             raw = profile[key] if profile else None
@@ -40,211 +189,261 @@ def generate_resume_pdf(user, profile):
         except: pass
         return []
 
-    skills   = load_json('skills')
-    projects = load_json('projects')
-    certs    = load_json('certificates')
+    return {
+        'skills':   load_json('skills'),
+        'projects': load_json('projects'),
+        'certs':    load_json('certificates'),
+        'name':     safe(user,    'name',    'Student Name'),
+        'email':    safe(user,    'email',   ''),
+        'phone':    safe(profile, 'phone',   ''),
+        'linkedin': safe(profile, 'linkedin',''),
+        'branch':   safe(profile, 'branch',  ''),
+        'cgpa':     safe(profile, 'cgpa',    ''),
+        'dob':      safe(profile, 'dob',     ''),
+    }
 
-    name     = safe(user,    'name',    'Student Name')
-    email    = safe(user,    'email',   '')
-    phone    = safe(profile, 'phone',   '')
-    linkedin = safe(profile, 'linkedin','')
-    branch   = safe(profile, 'branch',  '')
-    cgpa     = safe(profile, 'cgpa',    '')
-    dob      = safe(profile, 'dob',     '')
-
-    LM = 18*mm; RM = 18*mm; TM = 18*mm; BM = 18*mm
-    doc = SimpleDocTemplate(filepath, pagesize=A4,
-        leftMargin=LM, rightMargin=RM, topMargin=TM, bottomMargin=BM)
-    TW = W - LM - RM   # total usable width  ≈ 159 mm
-
-    story = []
-
-    # ══════════════════════════════════════════════════════════════════
-    # HEADER — Name large, then contact line below (matches sample)
-    # ══════════════════════════════════════════════════════════════════
-    story.append(Paragraph(name,
-        ps('hname', fontName='Helvetica-Bold', fontSize=22,
-           textColor=BLACK, leading=26, alignment=TA_LEFT)))
-    story.append(Spacer(1, 1.5*mm))
+# ── helper: section heading ────────────────────────────────────────
+def sec(title):
+    return [
+        Paragraph(title.upper(), STYLES['sh']),
+        HRFlowable(width='100%', thickness=0.7, color=LINE, spaceAfter=3),
+        Spacer(1, 1*mm),
+    ]
 
+# ══════════════════════════════════════════════════════════════════════
+# HEADER — Name large, then contact line below (matches sample)
+# ══════════════════════════════════════════════════════════════════════
+def header_section(r):
+    story = [Paragraph(r['name'], STYLES['hname']), Spacer(1, 1.5*mm)]
     # Contact line: email   phone   linkedin
-    contact_parts = []
-    if email:    contact_parts.append(email)
-    if phone:    contact_parts.append(phone)
-    if linkedin: contact_parts.append(linkedin)
-    contact_str = '   '.join(contact_parts)
+    contact_str = '   '.join(p for p in (r['email'], r['phone'], r['linkedin']) if p)
     if contact_str:
-        story.append(Paragraph(contact_str,
-            ps('hcontact', fontSize=9.5, textColor=MUTED, leading=13)))
-    story.append(Spacer(1, 2*mm))
-    story.append(HRFlowable(width='100%', thickness=0.8, color=LINE))
-    story.append(Spacer(1, 3*mm))
-
-    # ── helper: section heading ────────────────────────────────────
-    def sec(title):
-        return [
-            Paragraph(title.upper(),
-                ps('sh', fontName='Helvetica-Bold', fontSize=9,
-                   textColor=BLACK, leading=12, letterSpacing=1.5)),
-            HRFlowable(width='100%', thickness=0.7, color=LINE, spaceAfter=3),
-            Spacer(1, 1*mm),
-        ]
-
-    # ══════════════════════════════════════════════════════════════════
-    # SUMMARY
-    # ══════════════════════════════════════════════════════════════════
-    about = ''
-    if branch:
-        about = (f"{branch} undergraduate with strong foundations in programming, "
+        story.append(Paragraph(contact_str, STYLES['hcontact']))
+    story += [Spacer(1, 2*mm), HRFlowable(width='100%', thickness=0.8, color=LINE), Spacer(1, 3*mm)]
+    return story
+
+# ══════════════════════════════════════════════════════════════════════
+# SUMMARY
+# ══════════════════════════════════════════════════════════════════════
+def summary_section(r):
+    if r['branch']:
+        about = (f"{r['branch']} undergraduate with strong foundations in programming, "
                  f"data analysis, and software development. Experienced in building "
                  f"projects and applying analytical skills to solve real-world problems.")
     else:
         about = ("Computer Science undergraduate with strong programming and analytical skills. "
                  "Experienced in building academic and personal projects using modern tools and technologies.")
+    return sec('Summary') + [Paragraph(about, STYLES['ab']), Spacer(1, 5*mm)]
 
-    story += sec('Summary')
-    story.append(Paragraph(about,
-        ps('ab', fontSize=9.5, textColor=TEXT, leading=14.5, alignment=TA_JUSTIFY)))
-    story.append(Spacer(1, 5*mm))
+# ══════════════════════════════════════════════════════════════════════
+# PROJECTS
+# ══════════════════════════════════════════════════════════════════════
+def projects_section(r):
+    if not r['projects']: return []
+    story = sec('Project')
+    for p in r['projects']:
+        if not isinstance(p, dict): continue
+        pname = p.get('name', '').strip()
+        pdesc = p.get('desc', '').strip()
+        purl  = p.get('url',  '').strip()
+        if not pname: continue
+
+        # Project title row
+        story.append(Table([[
+            Paragraph(f'<b>{pname}</b>', STYLES['pname']),
+            Paragraph('Academic Project', STYLES['ptype']),
+        ]], colWidths=[TW*0.70, TW*0.30], style=ROW_STYLE))
 
-    # ══════════════════════════════════════════════════════════════════
-    # PROJECTS
-    # ══════════════════════════════════════════════════════════════════
-    if projects:
-        story += sec('Project')
-        for p in projects:
-            if not isinstance(p, dict): continue
-            pname = p.get('name', '').strip()
-            pdesc = p.get('desc', '').strip()
-            purl  = p.get('url',  '').strip()
-            if not pname: continue
-
-            # Project title row
-            title_row = Table([[
-                Paragraph(f'<b>{pname}</b>',
-                    ps('pname', fontName='Helvetica-Bold', fontSize=10,
-                       textColor=DARK, leading=13)),
-                Paragraph('Academic Project',
-                    ps('ptype', fontSize=9, textColor=MUTED, leading=13,
-                       alignment=TA_RIGHT)),
-            ]], colWidths=[TW*0.70, TW*0.30])
-            title_row.setStyle(TableStyle([
-                ('VALIGN',(0,0),(-1,-1),'MIDDLE'),
-                ('LEFTPADDING',(0,0),(-1,-1),0),
-                ('RIGHTPADDING',(0,0),(-1,-1),0),
-                ('TOPPADDING',(0,0),(-1,-1),0),
-                ('BOTTOMPADDING',(0,0),(-1,-1),0),
-            ]))
-            story.append(title_row)
-
-            # Tech / URL sub-line
-            sub_parts = []
-            if purl: sub_parts.append(purl)
-            if sub_parts:
-                story.append(Paragraph(' • '.join(sub_parts),
-                    ps('purl', fontSize=8.5, textColor=MUTED, leading=11)))
-
-            # Description as bullet
-            if pdesc:
-                story.append(Paragraph(f'• {pdesc}',
-                    ps('pdesc', fontSize=9.5, textColor=TEXT,
-                       leading=14, leftIndent=4*mm)))
-            story.append(Spacer(1, 3.5*mm))
-        story.append(Spacer(1, 2*mm))
-
-    # ══════════════════════════════════════════════════════════════════
-    # EDUCATION
-    # ══════════════════════════════════════════════════════════════════
-    story += sec('Education')
+        # Tech / URL sub-line
+        if purl:
+            story.append(Paragraph(purl, STYLES['purl']))
+
+        # Description as bullet
+        if pdesc:
+            story.append(Paragraph(f'• {pdesc}', STYLES['pdesc']))
+        story.append(Spacer(1, 3.5*mm))
+    story.append(Spacer(1, 2*mm))
+    return story
+
+# ══════════════════════════════════════════════════════════════════════
+# EDUCATION
+# ══════════════════════════════════════════════════════════════════════
+def education_section(r):
+    branch = r['branch']
     deg_label = f'Bachelor of Technology (B.Tech) – {branch}' if branch else "Bachelor's Programme"
-    edu_block = KeepTogether([
+    story = sec('Education')
+    story.append(KeepTogether([
         Table([[
-            Paragraph(f'<b>{deg_label}</b>',
-                ps('edeg', fontName='Helvetica-Bold', fontSize=10, textColor=DARK, leading=13)),
-            Paragraph('2020 – 2024',
-                ps('eyear', fontSize=9.5, textColor=MUTED, leading=13, alignment=TA_RIGHT)),
-        ]], colWidths=[TW*0.72, TW*0.28],
-        style=TableStyle([
-            ('VALIGN',(0,0),(-1,-1),'MIDDLE'),
-            ('LEFTPADDING',(0,0),(-1,-1),0),
-            ('RIGHTPADDING',(0,0),(-1,-1),0),
-            ('TOPPADDING',(0,0),(-1,-1),0),
-            ('BOTTOMPADDING',(0,0),(-1,-1),0),
-        ])),
-        Paragraph('University / College Name, India',
-            ps('euni', fontSize=9.5, textColor=MUTED, leading=13)),
-    ])
-    story.append(edu_block)
-    if cgpa:
-        story.append(Paragraph(f'CGPA: {cgpa} / 10',
-            ps('ecgpa', fontSize=9.5, textColor=TEXT, leading=13)))
+            Paragraph(f'<b>{deg_label}</b>', STYLES['edeg']),
+            Paragraph('2020 – 2024', STYLES['eyear']),
+        ]], colWidths=[TW*0.72, TW*0.28], style=ROW_STYLE),
+        Paragraph('University / College Name, India', STYLES['euni']),
+    ]))
+    if r['cgpa']:
+        story.append(Paragraph(f"CGPA: {r['cgpa']} / 10", STYLES['ecgpa']))
     story.append(Spacer(1, 5*mm))
+    return story
 
-    # ══════════════════════════════════════════════════════════════════
-    # CERTIFICATIONS
-    # ══════════════════════════════════════════════════════════════════
-    if certs:
-        story += sec('Certifications')
-        for c in certs:
-            if not isinstance(c, dict): continue
-            title  = c.get('title',  '').strip()
-            issuer = c.get('issuer', '').strip()
-            year   = c.get('year',   '').strip()
-            if not title: continue
-            cert_block = KeepTogether([
-                Table([[
-                    Paragraph(f'<b>{title}</b>',
-                        ps('ctitle', fontName='Helvetica-Bold', fontSize=10,
-                           textColor=DARK, leading=13)),
-                    Paragraph(year,
-                        ps('cyear', fontSize=9, textColor=MUTED, leading=13,
-                           alignment=TA_RIGHT)),
-                ]], colWidths=[TW*0.80, TW*0.20],
-                style=TableStyle([
-                    ('VALIGN',(0,0),(-1,-1),'MIDDLE'),
-                    ('LEFTPADDING',(0,0),(-1,-1),0),
-                    ('RIGHTPADDING',(0,0),(-1,-1),0),
-                    ('TOPPADDING',(0,0),(-1,-1),0),
-                    ('BOTTOMPADDING',(0,0),(-1,-1),0),
-                ])),
-                Paragraph(issuer,
-                    ps('ciss', fontSize=9.5, textColor=MUTED, leading=12)),
-            ])
-            story.append(cert_block)
-            story.append(Spacer(1, 3*mm))
-        story.append(Spacer(1, 2*mm))
-
-    # ══════════════════════════════════════════════════════════════════
-    # SKILLS
-    # ══════════════════════════════════════════════════════════════════
-    if skills:
-        story += sec('Skills')
-        # Group into categories if they follow "Category: skill1, skill2" pattern
-        # Otherwise just output as single line like sample resume
-        skill_line = ' | '.join(str(s) for s in skills)
-        story.append(Paragraph(skill_line,
-            ps('skline', fontSize=9.5, textColor=TEXT, leading=14.5)))
+# ══════════════════════════════════════════════════════════════════════
+# CERTIFICATIONS
+# ══════════════════════════════════════════════════════════════════════
+def certifications_section(r):
+    if not r['certs']: return []
+    story = sec('Certifications')
+    for c in r['certs']:
+        if not isinstance(c, dict): continue
+        title  = c.get('title',  '').strip()
+        issuer = c.get('issuer', '').strip()
+        year   = c.get('year',   '').strip()
+        if not title: continue
+        story.append(KeepTogether([
+            Table([[
+                Paragraph(f'<b>{title}</b>', STYLES['ctitle']),
+                Paragraph(year, STYLES['cyear']),
+            ]], colWidths=[TW*0.80, TW*0.20], style=ROW_STYLE),
+            Paragraph(issuer, STYLES['ciss']),
+        ]))
         story.append(Spacer(1, 3*mm))
-
-    # ══════════════════════════════════════════════════════════════════
-    # DECLARATION
-    # ══════════════════════════════════════════════════════════════════
-    story.append(Spacer(1, 4*mm))
-    story.append(HRFlowable(width='100%', thickness=0.5, color=LINE))
     story.append(Spacer(1, 2*mm))
-    story.append(Paragraph(
-        'I hereby declare that all information furnished above is true and correct to the best of my knowledge.',
-        ps('decl', fontSize=8, textColor=MUTED, leading=11)))
-    story.append(Spacer(1, 3*mm))
-    story.append(Table([[
-        Paragraph('Place: _______________', ps('s1', fontSize=8.5, textColor=MUTED)),
-        Paragraph('Date: _______________',  ps('s2', fontSize=8.5, textColor=MUTED, alignment=TA_CENTER)),
-        Paragraph(f'({name})', ps('s3', fontSize=8.5, textColor=DARK, alignment=TA_RIGHT)),
-    ]], colWidths=[TW/3]*3,
-    style=TableStyle([
-        ('LEFTPADDING',(0,0),(-1,-1),0),
-        ('RIGHTPADDING',(0,0),(-1,-1),0),
-    ])))
-
-    doc.build(story)
-    return filepath
+    return story
+
+# ══════════════════════════════════════════════════════════════════════
+# SKILLS
+# ══════════════════════════════════════════════════════════════════════
+def skills_section(r):
+    if not r['skills']: return []
+    # Output as single line like sample resume
+    skill_line = ' | '.join(str(s) for s in r['skills'])
+    return sec('Skills') + [Paragraph(skill_line, STYLES['skline']), Spacer(1, 3*mm)]
+
+# ══════════════════════════════════════════════════════════════════════
+# DECLARATION
+# ══════════════════════════════════════════════════════════════════════
+def declaration_section(r):
+    return [
+        Spacer(1, 4*mm),
+        HRFlowable(width='100%', thickness=0.5, color=LINE),
+        Spacer(1, 2*mm),
+        Paragraph('I hereby declare that all information furnished above is true and correct to the best of my knowledge.',
+            STYLES['decl']),
+        Spacer(1, 3*mm),
+        Table([[
+            Paragraph('Place: _______________', STYLES['s1']),
+            Paragraph('Date: _______________',  STYLES['s2']),
+            Paragraph(f"({r['name']})", STYLES['s3']),
+        ]], colWidths=[TW/3]*3, style=SIGNATURE_STYLE),
+    ]
+
+# Rendered top to bottom; benchmarks time each entry separately.
+SECTIONS = [
+    ('header',         header_section),
+    ('summary',        summary_section),
+    ('projects',       projects_section),
+    ('education',      education_section),
+    ('certifications', certifications_section),
+    ('skills',         skills_section),
+    ('declaration',    declaration_section),
+]
+
+def build_story(user, profile):
+    r = resume_fields(user, profile)
+    story = []
+    for _, section in SECTIONS:
+        story += section(r)
+    return story
+
+def render_resume_pdf(user, profile):
+    """Build the resume for one student and return the PDF bytes."""
+    buf = io.BytesIO()
+    doc = SimpleDocTemplate(buf, pagesize=A4,
+        leftMargin=LM, rightMargin=RM, topMargin=TM, bottomMargin=BM,
+        invariant=1)   # no timestamp or random document ID: same inputs, same bytes
+    doc.build(build_story(user, profile))
+    return buf.getvalue()
+
+# ══════════════════════════════════════════════════════════════════════
+# BATCH MODE — render many resumes across a process pool into one zip
+# ══════════════════════════════════════════════════════════════════════
+# Packs hold every applicant's resume, so they are kept out of static/ and
+# served only through the TPO download route.
+BATCH_DIR = 'instance/resume_batches'
+
+def load_resume_inputs(student_ids):
+    """(user, profile) dict pairs for the given students, ready to ship to worker processes."""
+    if not student_ids: return []
+    conn = get_db()
+    marks = ','.join('?' * len(student_ids))
+    users = {r['id']: dict(r) for r in conn.execute(f'SELECT * FROM users WHERE id IN ({marks})', list(student_ids))}
+    profiles = {r['user_id']: dict(r) for r in conn.execute(
+        f'SELECT * FROM student_profiles WHERE user_id IN ({marks})', list(student_ids))}
+    conn.close()
+    return [(users[i], profiles.get(i, {})) for i in student_ids if i in users]
+
+def drive_applicant_ids(drive_id):
+    conn = get_db()
+    rows = conn.execute('SELECT student_id FROM applications WHERE drive_id=? ORDER BY student_id', (drive_id,)).fetchall()
+    conn.close()
+    return [r['student_id'] for r in rows]
+
+def _render_entry(user, profile):
+    name = safe(user, 'name', 'Student').replace(' ', '_')
+    t = time.perf_counter()
+    pdf = render_resume_pdf(user, profile)
+    return f"Resume_{name}_{user['id']}.pdf", pdf, time.perf_counter() - t
+
+def _record_batch_entry(pdf, seconds):
+    # Workers are separate processes; their timings are recorded here, in the parent.
+    RESUME_RENDER_SECONDS.observe(seconds, mode='batch')
+    RESUME_PDF_BYTES.observe(len(pdf), mode='batch')
+
+def generate_resumes_batch(inputs, out_path, workers=None, progress=None):
+    """Render every (user, profile) pair into a single zip at out_path.
+
+    Rendering is CPU-bound ReportLab work, so it is spread over a
+    ProcessPoolExecutor (spawned, not forked — callers may hold threads and
+    SQLite connections). progress(done, total) is called as each PDF lands.
+    Returns the number of resumes written.
+    """
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(os.path.dirname(out_path) or '.', exist_ok=True)
+    total, done = len(inputs), 0
+    tmp_path = out_path + '.part'
+    with zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_STORED) as zf:   # PDFs are already compressed
+        if workers == 1 or total <= 1:
+            results = (_render_entry(u, p) for u, p in inputs)
+            for arcname, pdf, seconds in results:
+                _record_batch_entry(pdf, seconds)
+                zf.writestr(arcname, pdf); done += 1
+                if progress: progress(done, total)
+        else:
+            ctx = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+                futures = [pool.submit(_render_entry, u, p) for u, p in inputs]
+                for fut in as_completed(futures):
+                    arcname, pdf, seconds = fut.result()
+                    _record_batch_entry(pdf, seconds)
+                    zf.writestr(arcname, pdf); done += 1
+                    if progress: progress(done, total)
+    os.replace(tmp_path, out_path)
+    return done
+
+@jobs.handler('resume_batch')
+def _batch_job(job):
+    p = job.payload
+    ids = p.get('student_ids') or drive_applicant_ids(p['drive_id'])
+    inputs = load_resume_inputs(ids)
+    job.set_total(len(inputs))
+    label = f"drive_{p['drive_id']}" if p.get('drive_id') else 'students'
+    out_path = os.path.join(BATCH_DIR, f'{label}_job{job.id}.zip')
+
+    def progress(done, total):
+        if done % 10 and done != total: return
+        conn = get_db()
+        job.record_progress(conn, done)
+        conn.commit(); conn.close()
+
+    count = generate_resumes_batch(inputs, out_path, progress=progress)
+    return {'path': os.path.abspath(out_path), 'count': count}
+
+def enqueue_resume_batch(drive_id=None, student_ids=None, created_by=None):
+    return jobs.enqueue('resume_batch', {'drive_id': drive_id, 'student_ids': student_ids}, created_by)
@@ -0,0 +1,247 @@
+import re
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+from modules.db import get_db
+from modules import events
+from modules.notifications import add_notifications
+
+# Bulk interview scheduling. A drive's open applicants are packed into a grid
+# of (date, start time, panel) slots. Every booking the same students hold for
+# other drives on those dates goes into a per-student IntervalIndex, and a
+# slot is only offered to a student it does not overlap. Students with the
+# most outside commitments are placed first (they have the fewest feasible
+# slots), each into the earliest slot that still has a free panel.
+#
+# time_slot is free text: the single-booking form stores a start time
+# ("10:00"), the auto-scheduler stores a range ("10:00-10:30"). A bare start
+# time is taken to last DEFAULT_SLOT_MINUTES. Every write also stores the
+# parsed interval as starts_at / ends_at ('YYYY-MM-DD HH:MM'), and no interval
+# is longer than MAX_SLOT_MINUTES, so "what overlaps [s, e) for this student
+# (or venue)" is a bounded range scan on (student_id, starts_at) or
+# (venue, starts_at): starts_at in (s - MAX_SLOT_MINUTES, e), then ends_at > s.
+
+DEFAULT_SLOT_MINUTES = 30
+MAX_SLOT_MINUTES = 240
+TS_FORMAT = '%Y-%m-%d %H:%M'
+DAY_START, DAY_END = '09:30', '17:30'
+OPEN_STATUSES = ('applied', 'aptitude', 'technical', 'hr')
+_TIME = re.compile(r'(\d{1,2})[:.](\d{2})\s*([ap]\.?m\.?)?', re.I)
+
+def _clock(match):
+    hour, minute, ampm = int(match.group(1)), int(match.group(2)), (match.group(3) or '').lower()
+    if ampm.startswith('p') and hour < 12: hour += 12
+    if ampm.startswith('a') and hour == 12: hour = 0
+    return hour, minute
+
+def parse_slot(interview_date, time_slot, default_minutes=DEFAULT_SLOT_MINUTES):
+    """(start, end) datetimes for a booking, or None when the date or time cannot be read."""
+    try: day = datetime.strptime(interview_date.strip(), '%Y-%m-%d')
+    except (AttributeError, ValueError): return None
+    times = [_clock(m) for m in _TIME.finditer(time_slot or '')]
+    if not times: return None
+    start = day.replace(hour=times[0][0] % 24, minute=times[0][1] % 60)
+    end = day.replace(hour=times[1][0] % 24, minute=times[1][1] % 60) if len(times) > 1 else None
+    if end is None or end <= start: end = start + timedelta(minutes=default_minutes)
+    return start, min(end, start + timedelta(minutes=MAX_SLOT_MINUTES))
+
+def slot_bounds(interview_date, time_slot):
+    """(starts_at, ends_at) column values for a booking; (None, None) when it cannot be parsed."""
+    span = parse_slot(interview_date, time_slot)
+    return (span[0].strftime(TS_FORMAT), span[1].strftime(TS_FORMAT)) if span else (None, None)
+
+def format_slot(start, end):
+    return f"{start:%H:%M}-{end:%H:%M}"
+
+class IntervalIndex:
+    """Busy intervals per key. Starts are kept sorted next to a running max of
+    ends, so "does [start, end) overlap anything" is one bisect."""
+
+    def __init__(self):
+        self._items = {}   # key -> [sorted (start, end, tag)], running max end
+
+    def add(self, key, start, end, tag=0):
+        items, max_end = self._items.setdefault(key, ([], []))
+        insort(items, (start, end, tag))
+        i = bisect_left(items, (start, end, tag))
+        del max_end[i:]
+        for s, e, _ in items[i:]:
+            max_end.append(max(e, max_end[-1]) if max_end else e)
+
+    def overlaps(self, key, start, end):
+        if key not in self._items: return False
+        items, max_end = self._items[key]
+        i = bisect_left(items, (end,))          # intervals starting before `end`
+        return i > 0 and max_end[i - 1] > start
+
+    def find(self, key, start, end):
+        """Tags of the intervals overlapping [start, end), latest start first."""
+        if key not in self._items: return []
+        items, max_end = self._items[key]
+        tags, i = [], bisect_left(items, (end,)) - 1
+        while i >= 0 and max_end[i] > start:    # nothing earlier can reach past `start`
+            if items[i][1] > start: tags.append(items[i][2])
+            i -= 1
+        return tags
+
+    def count(self, key):
+        return len(self._items[key][0]) if key in self._items else 0
+
+def slot_grid(dates, slot_minutes, day_start=DAY_START, day_end=DAY_END):
+    """[(start, end)] for every slot on the given dates, in time order."""
+    slots, step = [], timedelta(minutes=slot_minutes)
+    for d in sorted(set(dates)):
+        opens, closes = parse_slot(d, day_start), parse_slot(d, day_end)
+        if not (opens and closes): raise ValueError(f'bad interview date or hours: {d!r} {day_start}-{day_end}')
+        t, close = opens[0], closes[0]
+        while t + step <= close:
+            slots.append((t, t + step)); t += step
+    return slots
+
+def _chunks(seq, n=500):
+    for i in range(0, len(seq), n): yield seq[i:i + n]
+
+def _candidates(conn, drive_id):
+    return [r['student_id'] for r in conn.execute(f'''SELECT a.student_id FROM applications a
+        WHERE a.drive_id=? AND a.status IN ({",".join("?" * len(OPEN_STATUSES))})
+          AND NOT EXISTS (SELECT 1 FROM interview_schedule i WHERE i.drive_id=a.drive_id AND i.student_id=a.student_id)
+        ORDER BY a.applied_at, a.id''', (drive_id, *OPEN_STATUSES))]
+
+def _span(row):
+    return datetime.strptime(row['starts_at'], TS_FORMAT), datetime.strptime(row['ends_at'], TS_FORMAT)
+
+def plan_interviews(conn, drive_id, dates, slot_minutes=DEFAULT_SLOT_MINUTES, panels=1,
+                    day_start=DAY_START, day_end=DAY_END, venues=None):
+    """Assign the drive's open applicants to slots without writing anything.
+
+    `venues`, if given, names the room of each panel; a panel is not used in a
+    slot where its room is already booked (by any drive).
+    Returns (bookings, unplaced): bookings are (student_id, date, time_slot,
+    panel, venue) tuples, unplaced the students no free slot could take.
+    """
+    if not 0 < slot_minutes <= MAX_SLOT_MINUTES:
+        raise ValueError(f'slot length must be 1-{MAX_SLOT_MINUTES} minutes')
+    venues = [v.strip() for v in venues or []]
+    if venues and len(venues) != panels:
+        raise ValueError(f'give one venue per panel ({panels})')
+    slots = slot_grid(dates, slot_minutes, day_start, day_end)
+    students = _candidates(conn, drive_id)
+    if not slots or not students: return [], students
+    window = ((slots[0][0] - timedelta(minutes=MAX_SLOT_MINUTES)).strftime(TS_FORMAT), slots[-1][1].strftime(TS_FORMAT))
+
+    busy = IntervalIndex()
+    for chunk in _chunks(students):
+        for r in conn.execute(f'''SELECT student_id, starts_at, ends_at FROM interview_schedule
+                WHERE student_id IN ({",".join("?" * len(chunk))}) AND starts_at > ? AND starts_at < ? AND drive_id != ?''',
+                (*chunk, *window, drive_id)):
+            busy.add(r['student_id'], *_span(r))
+
+    # Panels this drive already uses, and rooms anyone has booked, per grid slot.
+    taken = IntervalIndex()
+    for r in conn.execute('SELECT panel, starts_at, ends_at FROM interview_schedule WHERE drive_id=? AND starts_at > ? AND starts_at < ?',
+                          (drive_id, *window)):
+        taken.add(r['panel'], *_span(r))
+    rooms = IntervalIndex()
+    for v in set(filter(None, venues)):
+        # venue != '' lets SQLite use the partial idx_interview_venue_start
+        for r in conn.execute('''SELECT starts_at, ends_at FROM interview_schedule
+                WHERE venue=? AND venue != '' AND starts_at > ? AND starts_at < ?''', (v, *window)):
+            rooms.add(v, *_span(r))
+    venue = lambda p: venues[p - 1] if venues else ''
+    free = [[p for p in range(1, panels + 1) if not taken.overlaps(p, s, e) and not rooms.overlaps(venue(p), s, e)]
+            for s, e in slots]
+
+    bookings, unplaced, first_open = [], [], 0
+    for sid in sorted(students, key=busy.count, reverse=True):   # stable: ties keep application order
+        while first_open < len(slots) and not free[first_open]: first_open += 1
+        for i in range(first_open, len(slots)):
+            start, end = slots[i]
+            if free[i] and not busy.overlaps(sid, start, end):
+                panel = free[i].pop(0)
+                bookings.append((sid, start.strftime('%Y-%m-%d'), format_slot(start, end), panel, venue(panel)))
+                busy.add(sid, start, end)
+                break
+        else:
+            unplaced.append(sid)
+    return bookings, unplaced
+
+def insert_bookings(conn, drive_id, bookings, notes=''):
+    """Write (student_id, date, time_slot, panel, venue) rows with their parsed interval."""
+    conn.executemany('''INSERT INTO interview_schedule(drive_id, student_id, interview_date, time_slot, panel, venue,
+            starts_at, ends_at, notes) VALUES(?,?,?,?,?,?,?,?,?)''',
+        [(drive_id, sid, d, slot, panel, venue, *slot_bounds(d, slot), notes) for sid, d, slot, panel, venue in bookings])
+
+def panel_conflict(conn, drive_id, panel, starts_at, ends_at):
+    """The drive's booking on `panel` that overlaps [starts_at, ends_at), or None."""
+    lower = (datetime.strptime(starts_at, TS_FORMAT) - timedelta(minutes=MAX_SLOT_MINUTES)).strftime(TS_FORMAT)
+    return conn.execute('''SELECT * FROM interview_schedule WHERE drive_id=? AND starts_at > ? AND starts_at < ?
+        AND ends_at > ? AND panel=? ORDER BY starts_at LIMIT 1''', (drive_id, lower, ends_at, starts_at, panel)).fetchone()
+
+def find_conflicts(bookings, conn=None):
+    """Every clash for a batch of proposed bookings, checked in one pass.
+
+    `bookings` are dicts with student_id, interview_date, time_slot and
+    optionally venue. Each proposal is checked against the stored
+    schedule (same student, or same non-empty venue, at an overlapping time)
+    and against the other proposals in the batch. Returns a list of
+    {'index', 'kind': 'student' | 'venue' | 'invalid', 'with': row or {'index': j}}.
+    """
+    own = conn is None
+    conn = conn or get_db()
+    conflicts, proposed, batch = [], [], {'student': IntervalIndex(), 'venue': IntervalIndex()}
+    for i, b in enumerate(bookings):
+        starts_at, ends_at = slot_bounds(b.get('interview_date') or '', str(b.get('time_slot') or ''))
+        if starts_at is None:
+            conflicts.append({'index': i, 'kind': 'invalid', 'with': None}); continue
+        keys = {'student': int(b['student_id']), 'venue': (b.get('venue') or '').strip()}
+        start, end = datetime.strptime(starts_at, TS_FORMAT), datetime.strptime(ends_at, TS_FORMAT)
+        for kind, key in keys.items():
+            if not key: continue
+            conflicts += [{'index': i, 'kind': kind, 'with': {'index': j}} for j in reversed(batch[kind].find(key, start, end))]
+            batch[kind].add(key, start, end, i)
+        lower = (start - timedelta(minutes=MAX_SLOT_MINUTES)).strftime(TS_FORMAT)
+        proposed.append((i, keys['student'], keys['venue'], lower, starts_at, ends_at))
+    try:
+        for chunk in _chunks(proposed, 150):
+            values = ','.join('(?,?,?,?,?,?)' for _ in chunk)
+            params = [v for row in chunk for v in row]
+            for kind, column in (('student', 'student_id'), ('venue', 'venue')):
+                rows = conn.execute(f'''WITH p(i, student_id, venue, lower, starts_at, ends_at) AS (VALUES {values})
+                    SELECT p.i, x.id, x.drive_id, x.student_id, x.venue, x.interview_date, x.time_slot, x.starts_at, x.ends_at
+                    FROM p JOIN interview_schedule x ON x.{column}=p.{column} AND x.{column} != ''
+                     AND x.starts_at > p.lower AND x.starts_at < p.ends_at AND x.ends_at > p.starts_at
+                    ORDER BY p.i, x.starts_at''', params).fetchall()
+                conflicts += [{'index': r['i'], 'kind': kind, 'with': {k: r[k] for k in r.keys() if k != 'i'}} for r in rows]
+    finally:
+        if own: conn.close()
+    conflicts.sort(key=lambda c: (c['index'], c['kind']))
+    return conflicts
+
+def auto_schedule(drive_id, dates, slot_minutes=DEFAULT_SLOT_MINUTES, panels=1, notes='',
+                  day_start=DAY_START, day_end=DAY_END, venues=None):
+    """Plan and book every open applicant of a drive in one transaction.
+
+    Writes the interview rows, moves the applications to interview_scheduled
+    and queues one notification per student, all-or-nothing.
+    Returns {'scheduled': n, 'unplaced': [student ids]}.
+    """
+    conn = get_db()
+    try:
+        drive = conn.execute('SELECT company FROM drives WHERE id=?', (drive_id,)).fetchone()
+        if drive is None: raise ValueError('Drive not found')
+        company = drive['company']
+        if conn.in_transaction: conn.commit()
+        conn.execute('BEGIN IMMEDIATE')   # plan against bookings no other writer can change meanwhile
+        bookings, unplaced = plan_interviews(conn, drive_id, dates, slot_minutes, panels, day_start, day_end, venues)
+        insert_bookings(conn, drive_id, bookings, notes)
+        conn.executemany("UPDATE applications SET status='interview_scheduled' WHERE student_id=? AND drive_id=?",
+                         [(sid, drive_id) for sid, *_ in bookings])
+        add_notifications(conn, [(sid, f"📅 Interview scheduled for {company} on {d} at {slot}"
+                                       + (f" ({venue})" if venue else f" (panel {panel})" if panels > 1 else ''))
+                                 for sid, d, slot, panel, venue in bookings])
+        conn.commit()
+    except Exception:
+        conn.rollback(); raise
+    finally:
+        conn.close()
+    events.publish()
+    return {'scheduled': len(bookings), 'unplaced': unplaced}
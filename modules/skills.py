@@ -0,0 +1,120 @@
+import json, re
+from functools import lru_cache
+from modules.db import get_db
+from modules.analytics import RESOURCES, FALLBACK_URLS
+
+# Normalized skill index. student_profiles.skills keeps the JSON list the
+# student typed (it is what the profile page and resume show); every save
+# also writes the canonical form of each skill into `skills` /
+# `student_skills`, so "students with X and Y" is an indexed join instead of a
+# json_each over every profile.
+#
+# The canonical vocabulary is RESOURCES plus FALLBACK_URLS. A raw skill is
+# matched on its compact key — lowercase with spaces, dots, dashes, slashes
+# and underscores removed, then with a trailing version number or "js"
+# dropped — so "python", "Python3" and "PYTHON " are all Python, "NodeJS" is
+# Node.js and "react.js" is React.
+
+DISPLAY_NAMES = {'r': 'R', 'gcp': 'GCP', 'graphql': 'GraphQL', 'matlab': 'MATLAB'}
+
+ALIASES = {
+    'py': 'Python', 'js': 'JavaScript', 'ts': 'TypeScript', 'node': 'Node.js', 'cpp': 'C++',
+    'oops': 'OOP', 'object oriented programming': 'OOP',
+    'data structures': 'DSA', 'data structures and algorithms': 'DSA', 'algorithms': 'DSA',
+    'rest': 'REST API', 'restful api': 'REST API', 'rest apis': 'REST API',
+    'power bi': 'PowerBI', 'ms excel': 'Excel', 'microsoft excel': 'Excel',
+    'ml': 'Machine Learning', 'dl': 'Deep Learning', 'tf': 'TensorFlow', 'sklearn': 'Scikit-learn',
+    'natural language processing': 'NLP', 'cv': 'Computer Vision',
+    'k8s': 'Kubernetes', 'amazon web services': 'AWS', 'shell scripting': 'Bash',
+    'postgres': 'PostgreSQL', 'mongo': 'MongoDB', 'operating systems': 'OS', 'cn': 'Computer Networks',
+    'spring': 'spring boot', 'google cloud': 'gcp', 'microsoft azure': 'azure',
+}
+
+_COMPACT = re.compile(r'[\s./\-_]+')
+_VERSION = re.compile(r'v?\d+(\.\d+)*$')
+
+def _compact(s):
+    return _COMPACT.sub('', s.strip().lower())
+
+def _display(name):
+    return DISPLAY_NAMES.get(name, name if name in RESOURCES else name.title())
+
+def _build_lookup():
+    lookup = {}
+    for name in list(RESOURCES) + list(FALLBACK_URLS):
+        lookup[_compact(name)] = _display(name)
+    for alias, target in ALIASES.items():
+        lookup[_compact(alias)] = lookup[_compact(target)]
+    return lookup
+
+CANONICAL = _build_lookup()
+
+@lru_cache(maxsize=4096)
+def canonical_skill(raw):
+    """Canonical name for a free-text skill; unknown skills are only trimmed and whitespace-collapsed."""
+    raw = ' '.join(str(raw).split())
+    if not raw: return ''
+    key = _compact(raw)
+    if key in CANONICAL: return CANONICAL[key]
+    for stem in (_VERSION.sub('', key), key[:-2] if key.endswith('js') else ''):   # "Python3", "ReactJS"
+        if stem in CANONICAL: return CANONICAL[stem]
+    return raw
+
+def canonical_skills(raw_skills):
+    """Canonical, de-duplicated skills in first-seen order."""
+    seen, out = set(), []
+    for raw in raw_skills:
+        name = canonical_skill(str(raw))
+        if name and name.lower() not in seen:
+            seen.add(name.lower()); out.append(name)
+    return out
+
+def _skill_ids(conn, names):
+    """skills.id for each name, creating missing rows. Names are matched case-insensitively."""
+    if not names: return []
+    conn.executemany('INSERT OR IGNORE INTO skills(name) VALUES(?)', [(n,) for n in names])
+    marks = ','.join('?' * len(names))
+    return [r[0] for r in conn.execute(f'SELECT id FROM skills WHERE name IN ({marks})', names)]
+
+def sync_student_skills(conn, student_id, raw_skills):
+    """Replace a student's rows in student_skills. Runs on the caller's connection and transaction."""
+    ids = _skill_ids(conn, canonical_skills(raw_skills))
+    conn.execute('DELETE FROM student_skills WHERE student_id=?', (student_id,))
+    conn.executemany('INSERT OR IGNORE INTO student_skills(student_id, skill_id) VALUES(?,?)',
+        [(student_id, i) for i in ids])
+
+def rebuild_skill_index(conn):
+    """Re-derive student_skills from every profile's skills JSON in one pass."""
+    per_student = []
+    for user_id, raw in conn.execute('SELECT user_id, skills FROM student_profiles').fetchall():
+        try: raw = json.loads(raw or '[]')
+        except ValueError: raw = []
+        if isinstance(raw, list): per_student.append((user_id, canonical_skills(raw)))
+    conn.executemany('INSERT OR IGNORE INTO skills(name) VALUES(?)',
+        {(n,) for _, names in per_student for n in names})
+    ids = {name.lower(): i for i, name in conn.execute('SELECT id, name FROM skills')}
+    conn.execute('DELETE FROM student_skills')
+    conn.executemany('INSERT OR IGNORE INTO student_skills(student_id, skill_id) VALUES(?,?)',
+        ((uid, ids[n.lower()]) for uid, names in per_student for n in names))
+
+def students_with_skills(names, limit=None):
+    """Students who have every one of the given skills (aliases allowed), best CGPA first."""
+    wanted = canonical_skills(names)
+    if not wanted: return []
+    conn = get_db()
+    marks = ','.join('?' * len(wanted))
+    ids = [r['id'] for r in conn.execute(f'SELECT id FROM skills WHERE name IN ({marks})', wanted)]
+    if len(ids) < len(wanted):
+        conn.close(); return []
+    marks = ','.join('?' * len(ids))
+    sql = f'''SELECT u.id as user_id, u.name, u.email, sp.cgpa, sp.branch
+        FROM (SELECT student_id FROM student_skills WHERE skill_id IN ({marks})
+              GROUP BY student_id HAVING COUNT(*)=?) m
+        JOIN users u ON u.id=m.student_id
+        JOIN student_profiles sp ON sp.user_id=m.student_id
+        ORDER BY sp.cgpa DESC, u.id'''
+    params = ids + [len(ids)]
+    if limit: sql += ' LIMIT ?'; params.append(limit)
+    rows = conn.execute(sql, params).fetchall()
+    conn.close()
+    return [dict(r) for r in rows]